@@ -1,10 +1,11 @@
 # core/admin.py
 from django.contrib import admin
+from .utils import schedule_certificate
 from .models import( Course,
     Enrollment, Lesson,
     Certificate,    TeacherProfile,
     DirectorProfile,StudentGroup,
-    JournalEntry,VideoLesson,
+    JournalEntry,VideoLesson,Job,
 )
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
@@ -18,6 +19,13 @@ class LessonAdmin(admin.ModelAdmin):
 @admin.register(Enrollment)
 class EnrollmentAdmin(admin.ModelAdmin):
     list_display = ("student","course","active","purchased_at")
+    actions = ["issue_certificates"]
+
+    @admin.action(description="Выдать сертификаты (в фоне)")
+    def issue_certificates(self, request, queryset):
+        for enrollment in queryset.filter(certificate__isnull=True):
+            schedule_certificate(enrollment)
+        self.message_user(request, "Сертификаты поставлены в очередь")
 
 @admin.register(Certificate)
 class CertificateAdmin(admin.ModelAdmin):
@@ -50,7 +58,15 @@ class JournalEntryAdmin(admin.ModelAdmin):
 # --- Видео уроки ---
 @admin.register(VideoLesson)
 class VideoLessonAdmin(admin.ModelAdmin):
-    list_display = ('title', 'course', 'teacher', 'created_at')
-    list_filter = ('course', 'teacher')
+    list_display = ('title', 'course', 'teacher', 'hls_status', 'created_at')
+    list_filter = ('course', 'teacher', 'hls_status')
     search_fields = ('title',)
 
+# --- Фоновые задачи ---
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'key', 'status', 'attempts', 'run_after', 'finished_at')
+    list_filter = ('status', 'name')
+    search_fields = ('key',)
+    readonly_fields = ('error',)
+
@@ -0,0 +1,215 @@
+# core/analytics.py
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from .grades import GRADE_BUCKETS, grade_bucket, normalize_grade
+from .models import JournalEntry, GroupGradeStat, StudentGradeStat
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+# =========================
+# ИНКРЕМЕНТАЛЬНЫЕ СВОДКИ
+# =========================
+# Каждая запись журнала вносит в сводки (группа, месяц) и
+# (группа, студент, месяц) +1 к count, +value к total и +1 к корзине n1..n5.
+# Изменение записи — это пара состояний grade_state() (старое, новое):
+# старое вычитаем, новое прибавляем.
+
+STAT_FIELDS = ["count", "total"] + [f"n{grade}" for grade in GRADE_BUCKETS]
+
+
+def _stat_key(row):
+    return (row.group_id, getattr(row, "student_id", None), row.period)
+
+
+def apply_grade_changes(changes):
+    """`changes` — пары (old_state, new_state) из grade_state(); None — нет вклада.
+
+    Число запросов не зависит от числа изменений: на каждую сводку один
+    SELECT ... FOR UPDATE, вставка недостающих строк и один bulk_update.
+    """
+    deltas = {GroupGradeStat: defaultdict(lambda: defaultdict(int)),
+              StudentGradeStat: defaultdict(lambda: defaultdict(int))}
+    for old, new in changes:
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            group_id, student_id, day, value = state
+            period = month_start(day)
+            for model, key in ((GroupGradeStat, (group_id, None, period)),
+                               (StudentGradeStat, (group_id, student_id, period))):
+                delta = deltas[model][key]
+                delta["count"] += sign
+                delta["total"] += sign * value
+                delta[f"n{grade_bucket(value)}"] += sign
+
+    with transaction.atomic():
+        for model, by_key in deltas.items():
+            by_key = {key: delta for key, delta in by_key.items() if any(delta.values())}
+            if not by_key:
+                continue
+            lookup = {
+                "group_id__in": {key[0] for key in by_key},
+                "period__in": {key[2] for key in by_key},
+            }
+            if model is StudentGradeStat:
+                lookup["student_id__in"] = {key[1] for key in by_key}
+
+            def locked_rows():
+                return {_stat_key(row): row for row in model.objects.select_for_update().filter(**lookup)}
+
+            rows = locked_rows()
+            missing = [key for key in by_key if key not in rows]
+            if missing:
+                model.objects.bulk_create(
+                    [model(group_id=g, period=p, **({"student_id": s} if s is not None else {}))
+                     for g, s, p in missing],
+                    ignore_conflicts=True,
+                )
+                rows = locked_rows()
+
+            for key, delta in by_key.items():
+                row = rows[key]
+                for field, diff in delta.items():
+                    setattr(row, field, getattr(row, field) + diff)
+            model.objects.bulk_update([rows[key] for key in by_key], STAT_FIELDS)
+
+
+def bucket_counts():
+    edges = [Decimal(grade) - Decimal("0.5") for grade in GRADE_BUCKETS]
+    counts = {}
+    for i, grade in enumerate(GRADE_BUCKETS):
+        condition = Q(grade_value__isnull=False)
+        if i > 0:
+            condition &= Q(grade_value__gte=edges[i])
+        if i < len(GRADE_BUCKETS) - 1:
+            condition &= Q(grade_value__lt=edges[i + 1])
+        counts[f"n{grade}"] = Count("id", filter=condition)
+    return counts
+
+
+def rebuild_grade_stats(batch_size=2000):
+    """Пересчитывает grade_value и обе сводки с нуля."""
+    with transaction.atomic():
+        changed = []
+        for entry in JournalEntry.objects.only("id", "grade", "grade_value").iterator(chunk_size=batch_size):
+            value = normalize_grade(entry.grade)
+            if value != entry.grade_value:
+                entry.grade_value = value
+                changed.append(entry)
+            if len(changed) >= batch_size:
+                JournalEntry.objects.bulk_update(changed, ["grade_value"])
+                changed = []
+        JournalEntry.objects.bulk_update(changed, ["grade_value"])
+
+        graded = (
+            JournalEntry.objects.filter(grade_value__isnull=False)
+            .annotate(period=TruncMonth("date"))
+            .order_by()
+        )
+        totals = {"count": Count("id"), "total": Sum("grade_value"), **bucket_counts()}
+
+        GroupGradeStat.objects.all().delete()
+        GroupGradeStat.objects.bulk_create(
+            [GroupGradeStat(group_id=row.pop("group"), **row)
+             for row in graded.values("group", "period").annotate(**totals)],
+            batch_size=batch_size,
+        )
+        StudentGradeStat.objects.all().delete()
+        StudentGradeStat.objects.bulk_create(
+            [StudentGradeStat(group_id=row.pop("group"), student_id=row.pop("student"), **row)
+             for row in graded.values("group", "student", "period").annotate(**totals)],
+            batch_size=batch_size,
+        )
+
+
+# =========================
+# ОТЧЁТЫ
+# =========================
+# Все отчёты читают только сводки: строк в них O(групп × месяцев),
+# а не O(записей журнала).
+
+def _average(total, count):
+    return round(total / count, 2) if count else None
+
+
+def _filter_period(queryset, since=None, until=None):
+    if since:
+        queryset = queryset.filter(period__gte=month_start(since))
+    if until:
+        queryset = queryset.filter(period__lte=month_start(until))
+    return queryset
+
+
+def group_averages(since=None, until=None):
+    rows = (
+        _filter_period(GroupGradeStat.objects.all(), since, until)
+        .values("group", "group__name")
+        .annotate(entries=Sum("count"), total_sum=Sum("total"))
+        .order_by("group__name")
+    )
+    return [
+        {"group_id": r["group"], "group": r["group__name"], "entries": r["entries"],
+         "average": _average(r["total_sum"], r["entries"])}
+        for r in rows
+    ]
+
+
+def student_averages(group_id, since=None, until=None):
+    rows = (
+        _filter_period(StudentGradeStat.objects.filter(group_id=group_id), since, until)
+        .values("student", "student__username")
+        .annotate(entries=Sum("count"), total_sum=Sum("total"))
+        .order_by("student__username")
+    )
+    return [
+        {"student_id": r["student"], "student": r["student__username"], "entries": r["entries"],
+         "average": _average(r["total_sum"], r["entries"])}
+        for r in rows
+    ]
+
+
+def grade_distribution(group_id=None, since=None, until=None):
+    queryset = _filter_period(GroupGradeStat.objects.all(), since, until)
+    if group_id:
+        queryset = queryset.filter(group_id=group_id)
+    sums = queryset.aggregate(**{f"n{grade}": Sum(f"n{grade}") for grade in GRADE_BUCKETS})
+    return {str(grade): sums[f"n{grade}"] or 0 for grade in GRADE_BUCKETS}
+
+
+def grade_trend(group_id=None, since=None, until=None):
+    queryset = _filter_period(GroupGradeStat.objects.all(), since, until)
+    if group_id:
+        queryset = queryset.filter(group_id=group_id)
+    rows = queryset.values("period").annotate(entries=Sum("count"), total_sum=Sum("total")).order_by("period")
+    return [
+        {"period": r["period"].strftime("%Y-%m"), "entries": r["entries"],
+         "average": _average(r["total_sum"], r["entries"])}
+        for r in rows
+    ]
+
+
+def at_risk_students(since, threshold=Decimal("3"), min_entries=3):
+    rows = (
+        StudentGradeStat.objects.filter(period__gte=month_start(since))
+        .values("student", "student__username", "group", "group__name")
+        .annotate(entries=Sum("count"), total_sum=Sum("total"))
+        .filter(
+            entries__gte=min_entries,
+            total_sum__lt=ExpressionWrapper(F("entries") * threshold, output_field=DecimalField()),
+        )
+        .order_by("group__name", "student__username")
+    )
+    return [
+        {"student_id": r["student"], "student": r["student__username"],
+         "group_id": r["group"], "group": r["group__name"], "entries": r["entries"],
+         "average": _average(r["total_sum"], r["entries"])}
+        for r in rows
+    ]
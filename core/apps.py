@@ -5,6 +5,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     name = 'core'
 
-
-def ready(self):
-    import core.signals
\ No newline at end of file
+    def ready(self):
+        import core.signals
+        # модули с @task: воркер должен знать все задачи очереди
+        import core.covers
+        import core.notifications
+        import core.transcode
+        import core.utils
@@ -0,0 +1,242 @@
+# core/auth.py
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import Profile, TeacherProfile, DirectorProfile, TokenRevocation
+
+ROLE_RELATIONS = ("profile", "teacher_profile", "director_profile")
+
+
+# =========================
+# ПОЛЬЗОВАТЕЛЬ + РОЛЬ ОДНИМ ЗАПРОСОМ
+# =========================
+# Права проверяют user.profile.role, а вьюхи — user.teacher_profile.
+# Без подготовки это 1 запрос на пользователя и ещё по запросу на каждую
+# связь. Оба способа входа (JWT и сессия) загружают пользователя сразу с
+# профилями через select_related; отсутствующая связь тоже кэшируется,
+# так что hasattr(user, 'teacher_profile') больше не ходит в БД.
+
+def users_with_roles():
+    return get_user_model().objects.select_related(*ROLE_RELATIONS)
+
+
+def get_role(user):
+    """Роль из Profile ('admin', 'teacher', 'director') или None."""
+    if not user.is_authenticated:
+        return None
+    if not hasattr(user, "_role"):
+        profile = getattr(user, "profile", None)
+        user._role = profile.role if profile else None
+    return user._role
+
+
+class RoleModelBackend(ModelBackend):
+    """Сессионный вход: request.user приходит уже с профилями."""
+
+    def get_user(self, user_id):
+        user = users_with_roles().filter(pk=user_id).first()
+        return user if self.user_can_authenticate(user) else None
+
+
+class RoleJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication, загружающий пользователя вместе с профилями."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = users_with_roles().filter(**{jwt_settings.USER_ID_FIELD: user_id}).first()
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if jwt_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            jwt_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+
+# =========================
+# РОЛИ В ТОКЕНЕ
+# =========================
+# В access-токен кладутся is_staff, роль и id профилей, и
+# StatelessJWTAuthentication собирает пользователя из claims без запроса.
+# Пользователь — обычный User из from_db(): поля, которых нет в токене,
+# отложены (deferred) и подгрузятся из БД при первом обращении, профили
+# уже лежат в кэше связей. Токены без claims (выданные до этого) идут
+# старым путём через БД.
+#
+# Claims обновляются при каждом refresh, а смена роли или блокировка
+# отзывает уже выданные токены (TokenRevocation ниже).
+
+ROLE_CLAIMS = ("username", "is_staff", "is_superuser", "role",
+               "profile_id", "teacher_profile_id", "director_profile_id")
+
+
+def set_role_claims(token, user):
+    profile = getattr(user, "profile", None)
+    teacher = getattr(user, "teacher_profile", None)
+    director = getattr(user, "director_profile", None)
+    token["username"] = user.get_username()
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+    token["role"] = profile.role if profile else None
+    token["profile_id"] = profile.pk if profile else None
+    token["teacher_profile_id"] = teacher.pk if teacher else None
+    token["director_profile_id"] = director.pk if director else None
+
+
+class RoleRefreshToken(RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token._user = user
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        # при refresh роль перечитывается из БД, а не копируется из старого токена
+        user = getattr(self, "_user", None) or users_with_roles().filter(
+            **{jwt_settings.USER_ID_FIELD: self[jwt_settings.USER_ID_CLAIM]}
+        ).first()
+        if user is not None:
+            set_role_claims(access, user)
+        return access
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = RoleRefreshToken
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RoleRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if is_revoked(refresh):
+            raise AuthenticationFailed(_("Token is revoked"), code="token_revoked")
+        return super().validate(attrs)
+
+
+def _related_instance(model, field_names, values, user):
+    instance = model.from_db(DEFAULT_DB_ALIAS, field_names, values)
+    model._meta.get_field("user").set_cached_value(instance, user)
+    return instance
+
+
+def user_from_claims(token):
+    User = get_user_model()
+    user = User.from_db(
+        DEFAULT_DB_ALIAS,
+        ["id", "username", "is_staff", "is_superuser", "is_active"],
+        [int(token[jwt_settings.USER_ID_CLAIM]), token["username"],
+         token["is_staff"], token["is_superuser"], True],
+    )
+    relations = (
+        ("profile", Profile, token["profile_id"], ["id", "user_id", "role"], [token["role"]]),
+        ("teacher_profile", TeacherProfile, token["teacher_profile_id"], ["id", "user_id"], []),
+        ("director_profile", DirectorProfile, token["director_profile_id"], ["id", "user_id"], []),
+    )
+    for name, model, pk, field_names, extra in relations:
+        related = None
+        if pk is not None:
+            related = _related_instance(model, field_names, [pk, user.pk, *extra], user)
+        User._meta.get_field(name).set_cached_value(user, related)
+    user._role = token["role"]
+    return user
+
+
+class StatelessJWTAuthentication(RoleJWTAuthentication):
+    def get_user(self, validated_token):
+        if is_revoked(validated_token):
+            raise AuthenticationFailed(_("Token is revoked"), code="token_revoked")
+        if all(claim in validated_token for claim in ROLE_CLAIMS):
+            return user_from_claims(validated_token)
+        return super().get_user(validated_token)
+
+
+# =========================
+# ОТЗЫВ ТОКЕНОВ
+# =========================
+# Список отзывов маленький (живёт не дольше токенов), поэтому каждый
+# процесс держит его в памяти и перечитывает раз в
+# JWT_REVOCATION_REFRESH_SECONDS; отзыв в этом же процессе виден сразу.
+
+class _RevocationList:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loaded_at = None
+        self.jtis = set()
+        self.users = {}
+
+    def invalidate(self):
+        self.loaded_at = None
+
+    def snapshot(self):
+        with self.lock:
+            age = settings.JWT_REVOCATION_REFRESH_SECONDS
+            if self.loaded_at is None or time.monotonic() - self.loaded_at > age:
+                jtis, users = set(), {}
+                rows = TokenRevocation.objects.filter(expires_at__gt=timezone.now())
+                for jti, user_id, revoked_at in rows.values_list("jti", "user_id", "revoked_at"):
+                    if jti:
+                        jtis.add(jti)
+                    else:
+                        users[user_id] = max(users.get(user_id, revoked_at), revoked_at)
+                self.jtis, self.users, self.loaded_at = jtis, users, time.monotonic()
+            return self.jtis, self.users
+
+
+revocations = _RevocationList()
+
+
+def is_revoked(token):
+    jtis, users = revocations.snapshot()
+    if token.get(jwt_settings.JTI_CLAIM) in jtis:
+        return True
+    cutoff = users.get(int(token.get(jwt_settings.USER_ID_CLAIM, 0) or 0))
+    if cutoff is None:
+        return False
+    # iat — целые секунды, поэтому отзываются и токены, выданные в ту же секунду
+    issued_at = datetime.fromtimestamp(token.get("iat", 0), tz=dt_timezone.utc)
+    return issued_at <= cutoff
+
+
+def _forget_expired():
+    TokenRevocation.objects.filter(expires_at__lte=timezone.now()).delete()
+
+
+def revoke_token(token):
+    _forget_expired()
+    TokenRevocation.objects.get_or_create(
+        jti=token[jwt_settings.JTI_CLAIM],
+        defaults={"expires_at": datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc)},
+    )
+    revocations.invalidate()
+
+
+def revoke_user_tokens(user_id):
+    """Отзывает все уже выданные токены пользователя (и refresh тоже)."""
+    _forget_expired()
+    lifetime = max(jwt_settings.ACCESS_TOKEN_LIFETIME, jwt_settings.REFRESH_TOKEN_LIFETIME)
+    now = timezone.now()
+    TokenRevocation.objects.create(user_id=user_id, revoked_at=now, expires_at=now + lifetime)
+    revocations.invalidate()
@@ -0,0 +1,124 @@
+# core/benchmark.py
+import math
+import statistics
+import time
+from contextlib import ExitStack
+
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import Client
+
+from .auth import RoleRefreshToken
+from .models import Course, Lesson, Enrollment, Certificate, StudentGroup, JournalEntry
+from .queryplan import QueryCounter
+from .seeding import seed_database
+
+BENCH_PREFIX = "bench"
+
+
+# =========================
+# ДАННЫЕ
+# =========================
+# Данные — core/seeding.py с фиксированным seed; учитель из его результата
+# всегда ведёт 5 групп, так что растёт только объём чужих данных вокруг.
+
+def generate_dataset(counts, seed=0):
+    return seed_database(counts, seed=seed, prefix=BENCH_PREFIX)
+
+
+def row_counts():
+    models = (User, Course, Lesson, Enrollment, Certificate, StudentGroup,
+              StudentGroup.students.through, JournalEntry)
+    return {model._meta.label: model.objects.count() for model in models}
+
+
+# =========================
+# ЗАМЕРЫ
+# =========================
+# Каждый эндпоинт запрашивается `requests` раз через тестовый клиент
+# (весь стек Django, без сети). {i} в URL — номер запроса: так каталог
+# обходит кэш ответов и меряется «холодный» путь до БД.
+
+ENDPOINTS = (
+    # имя, URL, от чьего имени
+    ("courses", "/api/courses/", None),
+    ("courses_uncached", "/api/courses/?bench={i}", None),
+    ("course_detail", "/api/courses/{course}/", None),
+    ("lessons", "/api/lessons/", None),
+    ("search", "/api/search/?q=python&bench={i}", None),
+    ("enrollments", "/api/enrollments/", "student"),
+    ("groups", "/api/groups/", "teacher"),
+    ("journal", "/api/journal/", "teacher"),
+    ("journal_page_100", "/api/journal/?page_size=100", "teacher"),
+    ("analytics_groups", "/api/analytics/groups/", "director"),
+    ("analytics_at_risk", "/api/analytics/at-risk/", "director"),
+)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an unsorted list."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def measure(client, url, headers, requests=50, warmup=5):
+    timings, queries, sizes, statuses = [], [], [], set()
+    for i in range(-warmup, requests):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(counter))
+            started = time.perf_counter()
+            response = client.get(url.format(i=i), **headers)
+            elapsed = time.perf_counter() - started
+        if i < 0:
+            continue
+        timings.append(elapsed * 1000)
+        queries.append(counter.count)
+        sizes.append(len(response.content))
+        statuses.add(response.status_code)
+    return {
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "queries": max(queries),
+        "bytes": round(statistics.fmean(sizes)),
+        "status": sorted(statuses),
+    }
+
+
+def run_endpoints(fixtures, requests=50, warmup=5, endpoints=ENDPOINTS):
+    client = Client()
+    headers = {None: {}}
+    for role in ("teacher", "student", "director"):
+        if fixtures.get(role) is not None:
+            access = RoleRefreshToken.for_user(fixtures[role]).access_token
+            headers[role] = {"HTTP_AUTHORIZATION": f"Bearer {access}"}
+    slug = fixtures["course"].slug if fixtures.get("course") else "missing"
+    return {
+        name: measure(client, url.replace("{course}", slug), headers.get(role, {}), requests, warmup)
+        for name, url, role in endpoints
+    }
+
+
+# =========================
+# СРАВНЕНИЕ ПРОГОНОВ
+# =========================
+
+def compare_results(old, new, threshold=1.25):
+    """Регрессии new относительно old: p95 выросла больше чем в threshold раз или запросов стало больше."""
+    regressions = []
+    for scale, result in new["scales"].items():
+        before_scale = old.get("scales", {}).get(scale)
+        if not before_scale:
+            continue
+        for name, after in result["endpoints"].items():
+            before = before_scale["endpoints"].get(name)
+            if not before:
+                continue
+            if after["p95_ms"] > before["p95_ms"] * threshold:
+                regressions.append((scale, name, "p95_ms", before["p95_ms"], after["p95_ms"]))
+            if before["queries"] < after["queries"]:
+                regressions.append((scale, name, "queries", before["queries"], after["queries"]))
+    return regressions
@@ -0,0 +1,156 @@
+# core/catalogue_cache.py
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import Http404
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from .dbrouters import primary_position, primary_reads, replica_caught_up, replica_reads
+from .models import Course
+
+
+# =========================
+# ВЕРСИИ КАТАЛОГА
+# =========================
+# Версия — время последнего изменения в наносекундах. Она растёт при каждом
+# bump и годится как Last-Modified; если ключ версии вытеснен из кэша,
+# выдаётся новая версия, поэтому старые ответы никогда не всплывут.
+# Версию курса ставит запись; чтение выдаёт её заново только существующему
+# курсу, иначе случайные slug'и плодили бы ключи в кэше. У удалённого
+# (или переименованного) slug'а версия стирается. При bump рядом с версией
+# кладётся позиция WAL основной базы — по ней видно, догнала ли её реплика
+# (core/dbrouters.py); у версии, выданной чтением, позиции нет.
+
+LIST_VERSION_KEY = "catalogue:list:version"
+
+
+def get_cache():
+    return caches[settings.CATALOGUE_CACHE_ALIAS]
+
+
+def course_version_key(slug):
+    return f"catalogue:course:{slug}:version"
+
+
+def position_key(version):
+    return f"catalogue:position:{version}"
+
+
+def get_version(key):
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(keys):
+    """get_version для многих ключей одним походом в кэш (кроме отсутствующих)."""
+    versions = get_cache().get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = get_version(key)
+    return versions
+
+
+def set_versions(keys):
+    cache = get_cache()
+    version = time.time_ns()
+    position = primary_position()
+    # позиция раньше версии: увидевший версию найдёт и её позицию
+    if position is not None:
+        cache.set(position_key(version), position, settings.CATALOGUE_CACHE_TIMEOUT)
+    cache.set_many(dict.fromkeys(keys, version), None)
+
+
+def bump_list():
+    set_versions([LIST_VERSION_KEY])
+
+
+def bump_course(slug):
+    set_versions([course_version_key(slug), LIST_VERSION_KEY])
+
+
+def forget_course(slug):
+    get_cache().delete(course_version_key(slug))
+    bump_list()
+
+
+def bump_course_by_id(course_id):
+    slug = Course.objects.filter(pk=course_id).values_list("slug", flat=True).first()
+    if slug:
+        bump_course(slug)
+    else:
+        bump_list()
+
+
+# =========================
+# HTTP-КЭШ ОТВЕТОВ
+# =========================
+
+class CatalogueCacheMixin:
+    """Serves list/retrieve from the catalogue cache with ETag/Last-Modified.
+
+    A hit (or a 304) touches only the cache, never the database:
+    authentication is left lazy so anonymous and token requests alike skip
+    the user lookup.
+    """
+
+    cached_actions = ("list", "retrieve")
+
+    def perform_authentication(self, request):
+        if self.action not in self.cached_actions:
+            super().perform_authentication(request)
+
+    def list(self, request, *args, **kwargs):
+        version = get_version(LIST_VERSION_KEY)
+        return self.cached_response(request, "list", version, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        slug = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        key = course_version_key(slug)
+        if get_cache().get(key) is None:
+            with primary_reads():
+                if not Course.objects.filter(slug=slug).exists():
+                    raise Http404("Курс не найден")
+        version = get_version(key)
+        return self.cached_response(request, "course", version, super().retrieve, *args, **kwargs)
+
+    def cached_response(self, request, scope, version, render, *args, **kwargs):
+        variant = "|".join([
+            request.get_host(), request.get_full_path(), request.accepted_renderer.format
+        ])
+        key = "catalogue:%s:%s:%s" % (scope, version, hashlib.md5(variant.encode()).hexdigest())
+        headers = {
+            "ETag": '"%s"' % hashlib.md5(key.encode()).hexdigest(),
+            "Last-Modified": http_date(version // 10**9),
+            "Cache-Control": "no-cache",
+        }
+
+        if self.not_modified(request, headers["ETag"], version):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        cache = get_cache()
+        data = cache.get(key)
+        if data is None:
+            # с реплики — только если она догнала запись этой версии
+            caught_up = replica_caught_up(cache.get(position_key(version)))
+            with replica_reads() if caught_up else primary_reads():
+                response = render(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = response.data
+            cache.set(key, data, settings.CATALOGUE_CACHE_TIMEOUT)
+        return Response(data, headers=headers)
+
+    def not_modified(self, request, etag, version):
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match == "*"
+        since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+        return since is not None and since >= version // 10**9
@@ -0,0 +1,141 @@
+# core/catalogue_filters.py
+from datetime import datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+from .models import Course
+
+
+# =========================
+# ФИЛЬТРЫ КАТАЛОГА
+# =========================
+# Параметры списка курсов:
+#   level=BEG,MID                 — один или несколько уровней
+#   price_min=, price_max=        — цена, обе границы включительно
+#   created_from=, created_to=    — дата создания YYYY-MM-DD, включительно
+#   ordering=-created_at|created_at|-price|price
+#
+# Каждое измерение — отдельный Q: фасеты считают уровни без фильтра по
+# уровню, а цены без фильтра по цене, иначе выбранное значение обнуляло бы
+# соседние. Даты переводятся в границы суток, а не created_at__date —
+# функция над колонкой не дала бы пройти по индексу.
+
+ORDERINGS = {
+    "-created_at": ("-created_at", "-id"),
+    "created_at": ("created_at", "id"),
+    "-price": ("-price", "-id"),
+    "price": ("price", "id"),
+}
+DEFAULT_ORDERING = "-created_at"
+
+# (ключ, от, до) включительно; у цены два знака после запятой
+PRICE_BUCKETS = (
+    ("free", Decimal("0"), Decimal("0")),
+    ("under_10000", Decimal("0.01"), Decimal("9999.99")),
+    ("10000_25000", Decimal("10000"), Decimal("24999.99")),
+    ("from_25000", Decimal("25000"), None),
+)
+PRICE_LABELS = {
+    "free": "Бесплатно",
+    "under_10000": "До 10 000 ₸",
+    "10000_25000": "10 000 – 25 000 ₸",
+    "from_25000": "От 25 000 ₸",
+}
+
+
+def _price_q(low, high):
+    q = Q()
+    if low is not None:
+        q &= Q(price__gte=low)
+    if high is not None:
+        q &= Q(price__lte=high)
+    return q
+
+
+def _decimal_param(params, name):
+    raw = params.get(name)
+    if not raw:
+        return None
+    try:
+        value = Decimal(raw)
+    except InvalidOperation:
+        value = None
+    if value is None or not value.is_finite():  # NaN, Infinity
+        raise ValidationError({name: "ожидается число"})
+    return value
+
+
+def _day_start(params, name, shift=0):
+    raw = params.get(name)
+    if not raw:
+        return None
+    try:
+        value = parse_date(raw)
+    except ValueError:  # формат верный, а даты нет: 2026-02-30
+        value = None
+    if value is None:
+        raise ValidationError({name: "ожидается дата YYYY-MM-DD"})
+    return timezone.make_aware(datetime.combine(value + timedelta(days=shift), time.min))
+
+
+def parse_filters(params):
+    """{"level": Q, "price": Q, "created": Q} из query-параметров."""
+    levels = [code for code in params.get("level", "").split(",") if code]
+    unknown = set(levels) - {code for code, _ in Course.LEVELS}
+    if unknown:
+        raise ValidationError({"level": f"один из: {', '.join(code for code, _ in Course.LEVELS)}"})
+
+    created = Q()
+    since = _day_start(params, "created_from")
+    if since is not None:
+        created &= Q(created_at__gte=since)
+    until = _day_start(params, "created_to", shift=1)
+    if until is not None:
+        created &= Q(created_at__lt=until)
+
+    return {
+        "level": Q(level__in=levels) if levels else Q(),
+        "price": _price_q(_decimal_param(params, "price_min"), _decimal_param(params, "price_max")),
+        "created": created,
+    }
+
+
+def parse_ordering(params):
+    value = params.get("ordering") or DEFAULT_ORDERING
+    if value not in ORDERINGS:
+        raise ValidationError({"ordering": f"один из: {', '.join(ORDERINGS)}"})
+    return ORDERINGS[value]
+
+
+def apply_filters(queryset, filters):
+    return queryset.filter(filters["level"], filters["price"], filters["created"])
+
+
+# =========================
+# ФАСЕТЫ
+# =========================
+
+def course_facets(filters):
+    """Число курсов по уровням и ценовым корзинам — одним агрегирующим запросом."""
+    aggregates = {"total": Count("id", filter=filters["level"] & filters["price"])}
+    for code, _ in Course.LEVELS:
+        aggregates[f"level_{code}"] = Count("id", filter=Q(level=code) & filters["price"])
+    for key, low, high in PRICE_BUCKETS:
+        aggregates[f"price_{key}"] = Count("id", filter=_price_q(low, high) & filters["level"])
+    counts = Course.objects.filter(filters["created"]).aggregate(**aggregates)
+    return {
+        "total": counts["total"],
+        "level": [
+            {"value": code, "label": label, "count": counts[f"level_{code}"]}
+            for code, label in Course.LEVELS
+        ],
+        "price": [
+            {"key": key, "label": PRICE_LABELS[key], "min": str(low),
+             "max": None if high is None else str(high), "count": counts[f"price_{key}"]}
+            for key, low, high in PRICE_BUCKETS
+        ],
+    }
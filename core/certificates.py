@@ -0,0 +1,170 @@
+# core/certificates.py
+import re
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+
+from .models import Certificate, CertificateRecord, Enrollment, NumberSequence
+
+CERTIFICATE_SEQUENCE = "certificate"
+CERTIFICATE_PREFIX = "TS"
+ISSUE_BATCH_SIZE = 1000
+
+
+# =========================
+# НОМЕРА СЕРТИФИКАТОВ
+# =========================
+# Номер — TS-<9 цифр>-<контрольная цифра Луна>, например TS-000001234-4.
+# Цифры берутся из NumberSequence блоками: один UPDATE ... SET last_value =
+# last_value + n резервирует сразу n номеров, поэтому коллизий нет даже
+# при параллельной выдаче, а уникальный индекс остаётся страховкой.
+# Контрольная цифра ловит опечатки при проверке номера без запроса к БД.
+
+def luhn_digit(digits):
+    total = 0
+    for i, ch in enumerate(reversed(digits)):
+        n = int(ch)
+        if i % 2 == 0:
+            n *= 2
+            if n > 9:
+                n -= 9
+        total += n
+    return str((10 - total % 10) % 10)
+
+
+def format_number(value):
+    digits = f"{value:09d}"
+    return f"{CERTIFICATE_PREFIX}-{digits}-{luhn_digit(digits)}"
+
+
+# номера до перехода на NumberSequence: 12 символов uuid4 в верхнем регистре
+LEGACY_NUMBER = re.compile(r"^[0-9A-F]{12}$")
+
+
+def is_valid_number(number):
+    parts = number.split("-")
+    if len(parts) != 3 or parts[0] != CERTIFICATE_PREFIX or not (parts[1].isascii() and parts[1].isdecimal()):
+        return False
+    return parts[2] == luhn_digit(parts[1])
+
+
+def reserve_numbers(count, sequence=CERTIFICATE_SEQUENCE):
+    """Резервирует `count` подряд идущих значений и возвращает их номера."""
+    if count <= 0:
+        return []
+    with transaction.atomic():
+        NumberSequence.objects.get_or_create(name=sequence)
+        NumberSequence.objects.filter(name=sequence).update(last_value=F("last_value") + count)
+        last = NumberSequence.objects.values_list("last_value", flat=True).get(name=sequence)
+    return [format_number(value) for value in range(last - count + 1, last + 1)]
+
+
+# =========================
+# ПАКЕТНАЯ ВЫДАЧА
+# =========================
+
+def issue_certificates(enrollments, batch_size=ISSUE_BATCH_SIZE):
+    """Выдаёт сертификаты всем `enrollments` без сертификата.
+
+    Возвращает (выдано, пропущено). Всё в одной транзакции; запросов —
+    O(число пачек по batch_size), а не O(число записей).
+    """
+    with transaction.atomic():
+        ids = list(enrollments.order_by("pk").values_list("pk", "certificate__id"))
+        pending = [pk for pk, cert_id in ids if cert_id is None]
+        if not pending:
+            return 0, len(ids)
+        numbers = reserve_numbers(len(pending))
+        # параллельная выдача могла успеть раньше — такие строки пропускаются
+        Certificate.objects.bulk_create(
+            [Certificate(enrollment_id=pk, cert_number=number) for pk, number in zip(pending, numbers)],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        # номера блока одной длины и идут подряд — хватает диапазона по индексу
+        issued = Certificate.objects.filter(cert_number__gte=numbers[0], cert_number__lte=numbers[-1])
+        created = build_records(issued, batch_size=batch_size)
+    return created, len(ids) - created
+
+
+def course_enrollments(course):
+    return Enrollment.objects.filter(course=course, active=True)
+
+
+# =========================
+# ПУБЛИЧНАЯ ПРОВЕРКА
+# =========================
+# Работодатель проверяет номер через /api/certificates/verify/<номер>/.
+# Ответ собирается из CertificateRecord — снимка на момент выдачи, как и
+# бумажный сертификат: переименование курса его не меняет. Ответы
+# кэшируются, отсутствующие номера тоже (короче), чтобы перебор номерами
+# не доходил до БД; номер с неверной контрольной цифрой отсекается сразу.
+
+VERIFY_SALT = "core.certificates.verify"
+
+
+def verify_cache():
+    return caches[settings.CERTIFICATE_VERIFY_CACHE_ALIAS]
+
+
+def verify_cache_key(number):
+    return f"certverify:{number}"
+
+
+def build_records(certificates, batch_size=ISSUE_BATCH_SIZE):
+    """Создаёт CertificateRecord для `certificates`; возвращает их число."""
+    rows = certificates.values(
+        "pk", "cert_number", "issued_at",
+        "enrollment__student__username", "enrollment__student__first_name",
+        "enrollment__student__last_name", "enrollment__course__title",
+    )
+    records = []
+    for row in rows:
+        full_name = f"{row['enrollment__student__first_name']} {row['enrollment__student__last_name']}".strip()
+        payload = {
+            "number": row["cert_number"],
+            "student": full_name or row["enrollment__student__username"],
+            "course": row["enrollment__course__title"],
+            "issued_at": row["issued_at"].date().isoformat(),
+        }
+        records.append(CertificateRecord(
+            certificate_id=row["pk"], cert_number=row["cert_number"], payload=payload,
+            token=signing.dumps(payload, salt=VERIFY_SALT, compress=True),
+        ))
+    CertificateRecord.objects.bulk_create(records, batch_size=batch_size, ignore_conflicts=True)
+    # номер мог быть запрошен до выдачи и закэширован как отсутствующий
+    numbers = [record.cert_number for record in records]
+    transaction.on_commit(lambda: verify_cache().delete_many([verify_cache_key(n) for n in numbers]))
+    return len(records)
+
+
+def verify_number(number):
+    """Ответ проверки или None, если сертификата нет."""
+    if not (is_valid_number(number) or LEGACY_NUMBER.match(number)):
+        return None
+    cache = verify_cache()
+    key = verify_cache_key(number)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached or None
+    record = CertificateRecord.objects.filter(cert_number=number).values("payload", "token").first()
+    if record is None:
+        cache.set(key, {}, settings.CERTIFICATE_VERIFY_NEGATIVE_TIMEOUT)
+        return None
+    result = {"valid": True, "certificate": record["payload"], "signature": record["token"]}
+    cache.set(key, result, settings.CERTIFICATE_VERIFY_CACHE_TIMEOUT)
+    return result
+
+
+def verify_signature(token):
+    try:
+        return signing.loads(token, salt=VERIFY_SALT)
+    except signing.BadSignature:
+        return None
+
+
+def forget_certificate(number):
+    verify_cache().delete(verify_cache_key(number))
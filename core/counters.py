@@ -0,0 +1,61 @@
+# core/counters.py
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Course, Lesson, Enrollment
+
+
+# =========================
+# СЧЁТЧИКИ КУРСА
+# =========================
+# Course.lessons_count и Course.active_enrollments_count обновляются
+# сигналами (core/signals.py) атомарным UPDATE ... SET x = x + 1 в той же
+# транзакции, что и сама запись. bulk_create/update() сигналы обходят —
+# после них нужен `manage.py rebuild_course_counters`.
+
+def adjust_lessons_count(course_id, delta):
+    Course.objects.filter(pk=course_id).update(lessons_count=F("lessons_count") + delta)
+
+
+def adjust_active_enrollments_count(course_id, delta):
+    Course.objects.filter(pk=course_id).update(
+        active_enrollments_count=F("active_enrollments_count") + delta
+    )
+
+
+def _count_subquery(queryset):
+    counted = (
+        queryset.filter(course=OuterRef("pk"))
+        .order_by()
+        .values("course")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def actual_counts():
+    return {
+        "lessons_count": _count_subquery(Lesson.objects.all()),
+        "active_enrollments_count": _count_subquery(Enrollment.objects.filter(active=True)),
+    }
+
+
+def find_counter_drift():
+    """Returns (course, field, stored, actual) for every counter that is off."""
+    counts = actual_counts()
+    courses = Course.objects.annotate(**{f"actual_{name}": expr for name, expr in counts.items()})
+    drift = []
+    for course in courses.filter(
+        ~Q(lessons_count=F("actual_lessons_count"))
+        | ~Q(active_enrollments_count=F("actual_active_enrollments_count"))
+    ):
+        for name in counts:
+            stored, actual = getattr(course, name), getattr(course, f"actual_{name}")
+            if stored != actual:
+                drift.append((course, name, stored, actual))
+    return drift
+
+
+def rebuild_course_counters():
+    return Course.objects.update(**actual_counts())
@@ -0,0 +1,129 @@
+# core/covers.py
+import hashlib
+import posixpath
+import re
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from PIL import Image, ImageOps
+
+from .catalogue_cache import bump_course
+from .models import Course
+from .tasks import task
+
+WIDTHS = (320, 640, 960, 1280)
+FORMATS = (
+    # формат, параметры Pillow
+    ("webp", {"format": "WEBP", "quality": 80, "method": 6}),
+    ("jpeg", {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True}),
+)
+# ширина картинки по умолчанию (src) — карточка каталога
+DEFAULT_WIDTH = 640
+
+# <имя>.<ширина>w.<хэш>.<расширение> — такие файлы никогда не меняются
+RENDITION_NAME = re.compile(r"\.\d+w\.[0-9a-f]{12}\.(?:webp|jpeg)$")
+
+
+# =========================
+# ВЕРСИИ ОБЛОЖКИ КУРСА
+# =========================
+# Задача render_cover (очередь core/tasks.py) режет Course.cover на
+# несколько ширин в WebP и JPEG и кладёт рядом с оригиналом:
+#
+#   course_covers/python.jpg                      — оригинал
+#   course_covers/python.640w.3f1c9a0b7d2e.webp   — версия
+#
+# Хэш в имени — от содержимого версии, поэтому файл можно кэшировать
+# навсегда (serve_public_media отдаёт их с Cache-Control: immutable),
+# а новая обложка получает новые URL. Ширины больше оригинала
+# пропускаются, самая младшая делается всегда.
+#
+# Course.cover_renditions пишет только задача; "source" — имя обложки,
+# из которой нарезаны версии. Сигнал ставит задачу, когда source
+# расходится с текущей обложкой (в том числе когда обложку убрали).
+
+def plan_widths(source_width):
+    planned = [width for width in WIDTHS if width <= source_width]
+    return planned or list(WIDTHS[:1])
+
+
+def _encode(image, options):
+    if options["format"] == "JPEG" and image.mode != "RGB":
+        # у JPEG нет прозрачности — подкладываем белый фон
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A") if "A" in image.getbands() else None)
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, **options)
+    return buffer.getvalue()
+
+
+def _save(base, width, ext, data):
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    name = f"{base}.{width}w.{digest}.{ext}"
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(data))
+    return name
+
+
+def build_renditions(source):
+    """Нарезает версии файла `source` (имя в хранилище), возвращает их описание."""
+    with default_storage.open(source) as f, Image.open(f) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            alpha = "A" in image.getbands() or "transparency" in image.info
+            image = image.convert("RGBA" if alpha else "RGB")
+        width, height = image.size
+        base = posixpath.splitext(source)[0]
+        renditions = {"source": source, "width": width, "height": height}
+        for ext, _ in FORMATS:
+            renditions[ext] = []
+        for target in plan_widths(width):
+            resized = image.resize((target, max(1, round(height * target / width))), Image.LANCZOS)
+            for ext, options in FORMATS:
+                name = _save(base, target, ext, _encode(resized, options))
+                renditions[ext].append({"width": target, "height": resized.height, "name": name})
+    return renditions
+
+
+def rendition_names(renditions):
+    return {item["name"] for ext, _ in FORMATS for item in renditions.get(ext, ())}
+
+
+def _delete(names):
+    for name in names:
+        default_storage.delete(name)
+
+
+@task("render_cover", max_attempts=3)
+def render_cover(course_id, source):
+    course = Course.objects.filter(pk=course_id).only("slug", "cover", "cover_renditions").first()
+    if course is None or (course.cover.name or "") != source:
+        return  # обложку уже сменили — её версии сделает следующая задача
+    renditions = build_renditions(source) if source else {}
+    current = Q(cover=source) if source else Q(cover="") | Q(cover__isnull=True)
+    if not Course.objects.filter(current, pk=course_id).update(cover_renditions=renditions):
+        _delete(rendition_names(renditions))
+        return
+    _delete(rendition_names(course.cover_renditions) - rendition_names(renditions))
+    bump_course(course.slug)
+
+
+# =========================
+# SRCSET
+# =========================
+
+def srcset_map(renditions):
+    """{"webp": srcset, "jpeg": srcset, "src", "width", "height"} или None, пока версий нет."""
+    if not renditions.get("jpeg"):
+        return None
+    url = default_storage.url
+    fallback = min(renditions["jpeg"], key=lambda item: abs(item["width"] - DEFAULT_WIDTH))
+    result = {
+        ext: ", ".join(f"{url(item['name'])} {item['width']}w" for item in renditions[ext])
+        for ext, _ in FORMATS
+    }
+    result.update(src=url(fallback["name"]), width=renditions["width"], height=renditions["height"])
+    return result
@@ -0,0 +1,98 @@
+# core/dbrouters.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA_DB_ALIAS = "replica"
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+# =========================
+# ЧТЕНИЕ С РЕПЛИКИ
+# =========================
+# Реплика (settings.DATABASES["replica"], если задан POSTGRES_REPLICA_HOST)
+# отстаёт от основной базы, поэтому на неё уходят не все SELECT, а только
+# явно помеченные: публичный каталог, где задержка в доли секунды не видна.
+# Всё остальное, включая чтение сразу после записи, идёт в default.
+#
+#     with replica_reads():
+#         Course.objects.all()           # -> replica
+#         with primary_reads():
+#             Course.objects.all()       # -> default
+#
+# Кэш каталога заполняется с реплики, только если она уже догнала запись,
+# поднявшую версию: вместе с версией запоминается позиция WAL основной базы
+# (primary_position), и пока реплика её не воспроизвела (replica_caught_up),
+# заполнение идёт с default. Иначе отстающая реплика положила бы под новую
+# версию старые данные на весь CATALOGUE_CACHE_TIMEOUT.
+# Без реплики роутер ничего не меняет.
+
+def has_replica():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def primary_position():
+    """Текущая позиция WAL основной базы; None, если реплики нет."""
+    if not has_replica():
+        return None
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute("SELECT pg_current_wal_lsn()::text")
+        return cursor.fetchone()[0]
+
+
+def replica_caught_up(position):
+    if position is None or not has_replica():
+        return False
+    with connections[REPLICA_DB_ALIAS].cursor() as cursor:
+        # NULL, если реплика не в режиме восстановления — тогда не доверяем
+        cursor.execute("SELECT pg_last_wal_replay_lsn() >= %s::pg_lsn", [position])
+        return bool(cursor.fetchone()[0])
+
+
+@contextmanager
+def replica_reads():
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and has_replica():
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # реплика — копия default, объекты из обеих баз совместимы
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    """Serves safe (GET/HEAD/OPTIONS) requests of the viewset from the replica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,166 @@
+# core/exports.py
+import csv
+import datetime
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+# =========================
+# ПОТОКОВАЯ ЗАПИСЬ
+# =========================
+# Строки берутся из queryset.iterator(chunk_size=...) и уходят клиенту
+# сразу, в памяти воркера держится только текущая пачка.
+
+class _Pipe:
+    """File-like sink that hands written bytes back to the generator."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data if isinstance(data, bytes) else data.encode("utf-8"))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _as_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime("%Y-%m-%d %H:%M")
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value)
+
+
+# Заявки приходят из публичной формы: ячейку «=HYPERLINK(...)» Excel
+# выполнил бы как формулу. Такие строки получают ведущий апостроф.
+# В XLSX ячейки — inline-строки, формулами они не становятся.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value):
+    text = _as_text(value)
+    if isinstance(value, str) and text.startswith(FORMULA_PREFIXES):
+        return "'" + text
+    return text
+
+
+def stream_csv(header, rows):
+    pipe = _Pipe()
+    writer = csv.writer(pipe)
+    pipe.write("\ufeff")  # BOM, чтобы Excel открыл кириллицу
+    writer.writerow(header)
+    yield pipe.drain()
+    for row in rows:
+        writer.writerow([_csv_cell(value) for value in row])
+        if len(pipe.chunks) >= 500:
+            yield pipe.drain()
+    yield pipe.drain()
+
+
+# =========================
+# XLSX БЕЗ ЗАВИСИМОСТЕЙ
+# =========================
+# Минимальная книга из одного листа: строки пишутся inline-строками
+# (без sharedStrings), zip пишется в непрерывный поток.
+
+_XLSX_STATIC = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+# управляющие символы запрещены в XML — Excel не откроет такой файл
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xlsx_cell(value):
+    if isinstance(value, bool):
+        return '<c t="b"><v>%d</v></c>' % value
+    if isinstance(value, (int, float)) or hasattr(value, "as_tuple"):
+        return "<c><v>%s</v></c>" % value
+    return '<c t="inlineStr"><is><t xml:space="preserve">%s</t></is></c>' % escape(_XML_ILLEGAL.sub("", _as_text(value)))
+
+
+def _xlsx_row(values):
+    return "<row>%s</row>" % "".join(_xlsx_cell(value) for value in values)
+
+
+def stream_xlsx(header, rows):
+    pipe = _Pipe()
+    with zipfile.ZipFile(pipe, "w", zipfile.ZIP_DEFLATED) as book:
+        for name, content in _XLSX_STATIC.items():
+            book.writestr(name, content)
+        yield pipe.drain()
+
+        with book.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                "<sheetData>" + _xlsx_row(header)
+            ).encode("utf-8"))
+            for i, row in enumerate(rows, 1):
+                sheet.write(_xlsx_row(row).encode("utf-8"))
+                if i % 500 == 0:
+                    yield pipe.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield pipe.drain()
+
+
+EXPORT_FORMATS = {
+    "csv": (stream_csv, "text/csv; charset=utf-8"),
+    "xlsx": (stream_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def export_response(name, output, columns, queryset):
+    """`columns` — пары (заголовок, поле для values_list)."""
+    stream, content_type = EXPORT_FORMATS[output]
+    header = [label for label, _ in columns]
+    rows = queryset.values_list(*[field for _, field in columns]).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    response = StreamingHttpResponse(stream(header, rows), content_type=content_type)
+    filename = "%s-%s.%s" % (name, timezone.localdate().isoformat(), output)
+    response["Content-Disposition"] = 'attachment; filename="%s"' % filename
+    return response
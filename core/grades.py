@@ -0,0 +1,49 @@
+# core/grades.py
+from decimal import Decimal, InvalidOperation
+
+# =========================
+# НОРМАЛИЗАЦИЯ ОЦЕНОК
+# =========================
+# JournalEntry.grade — свободный текст. Для аналитики он приводится к
+# пятибалльной шкале: "5", "4+", "3-", "4,5", буквы A–F, проценты (0–100).
+# Всё остальное ("н", "зач") в средние не попадает.
+
+LETTER_GRADES = {"A": 5, "B": 4, "C": 3, "D": 2, "E": 1, "F": 1}
+GRADE_MODIFIERS = {"+": Decimal("0.25"), "-": Decimal("-0.25")}
+GRADE_BUCKETS = (1, 2, 3, 4, 5)
+
+
+def normalize_grade(raw):
+    text = (raw or "").strip().upper().replace(",", ".")
+    modifier = Decimal(0)
+    if len(text) > 1 and text[-1] in GRADE_MODIFIERS:
+        modifier = GRADE_MODIFIERS[text[-1]]
+        text = text[:-1]
+    if not text:
+        return None
+
+    if text in LETTER_GRADES:
+        value = Decimal(LETTER_GRADES[text])
+    else:
+        try:
+            value = Decimal(text)
+        except InvalidOperation:
+            return None
+        if not value.is_finite() or value < 0 or value > 100:
+            return None
+        if value > 5:
+            value = value / 20
+
+    value = min(max(value + modifier, Decimal(0)), Decimal(5))
+    return value.quantize(Decimal("0.01"))
+
+
+def grade_bucket(value):
+    return min(5, max(1, int(value + Decimal("0.5"))))
+
+
+def grade_state(entry):
+    """Вклад записи журнала в сводки: (group_id, student_id, date, value) или None."""
+    if entry.grade_value is None:
+        return None
+    return (entry.group_id, entry.student_id, entry.date, entry.grade_value)
@@ -0,0 +1,110 @@
+import json
+import subprocess
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from core.benchmark import compare_results, generate_dataset, row_counts, run_endpoints
+from core.seeding import SCALES
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет задержку (p50/p95/p99), число запросов к БД и размер ответа "
+        "API на синтетических данных разного объёма. Работает во временной "
+        "тестовой базе, рабочая не трогается."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", default="small,medium",
+                            help=f"через запятую: {', '.join(SCALES)}")
+        parser.add_argument("--counts", default="",
+                            help="переопределить объёмы, например courses=500,journal_entries=100000")
+        parser.add_argument("--requests", type=int, default=50, help="запросов на эндпоинт")
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="JSON с результатами (по умолчанию benchmarks/<дата>-<коммит>.json)")
+        parser.add_argument("--compare", help="JSON прошлого прогона: регрессии завершают команду с ошибкой")
+        parser.add_argument("--threshold", type=float, default=1.25,
+                            help="регрессия — p95 больше прошлой во столько раз")
+
+    def parse_counts(self, raw):
+        overrides = {}
+        for item in filter(None, raw.split(",")):
+            name, _, value = item.partition("=")
+            if name not in SCALES["small"] or not value.isdigit():
+                raise CommandError(f"неизвестный объём {item!r}")
+            overrides[name] = int(value)
+        return overrides
+
+    def handle(self, *args, **options):
+        scales = [name.strip() for name in options["scales"].split(",") if name.strip()]
+        unknown = set(scales) - set(SCALES)
+        if unknown:
+            raise CommandError(f"неизвестные масштабы: {', '.join(sorted(unknown))}")
+        overrides = self.parse_counts(options["counts"])
+        previous = None
+        if options["compare"]:
+            previous = json.loads(Path(options["compare"]).read_text())
+
+        commit = git_commit()
+        report = {
+            "commit": commit,
+            "created_at": timezone.now().isoformat(timespec="seconds"),
+            "database": connection.vendor,
+            "requests": options["requests"],
+            "seed": options["seed"],
+            "scales": {},
+        }
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            for scale in scales:
+                counts = {**SCALES[scale], **overrides}
+                call_command("flush", interactive=False, verbosity=0)
+                for cache in caches.all():
+                    cache.clear()
+                self.stdout.write(f"{scale}: генерация данных {counts}")
+                fixtures = generate_dataset(counts, seed=options["seed"])
+                endpoints = run_endpoints(fixtures, options["requests"], options["warmup"])
+                report["scales"][scale] = {"counts": counts, "rows": row_counts(), "endpoints": endpoints}
+                for name, result in endpoints.items():
+                    self.stdout.write(
+                        f"  {name:<18} p50 {result['p50_ms']:>8.2f} мс  p95 {result['p95_ms']:>8.2f} мс  "
+                        f"p99 {result['p99_ms']:>8.2f} мс  запросов {result['queries']}  "
+                        f"{result['bytes']} Б  {result['status']}"
+                    )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = Path(options["output"] or Path(settings.BASE_DIR) / "benchmarks" /
+                      f"{timezone.localdate():%Y%m%d}-{commit}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"результаты: {output}"))
+
+        if previous is not None:
+            regressions = compare_results(previous, report, options["threshold"])
+            for scale, name, metric, before, after in regressions:
+                self.stdout.write(self.style.WARNING(f"{scale} {name}: {metric} {before} -> {after}"))
+            if regressions:
+                raise CommandError(f"регрессий: {len(regressions)} (сравнение с {previous['commit']})")
+            self.stdout.write(self.style.SUCCESS(f"регрессий нет (сравнение с {previous['commit']})"))
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import VideoUpload
+from core.uploads import discard_upload
+
+
+class Command(BaseCommand):
+    help = "Удаляет незавершённые загрузки видео старше --days дней вместе с их .part-файлами"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        purged = 0
+        for upload in VideoUpload.objects.filter(created_at__lt=cutoff).iterator():
+            discard_upload(upload)
+            purged += 1
+        self.stdout.write(self.style.SUCCESS(f"удалено загрузок: {purged}"))
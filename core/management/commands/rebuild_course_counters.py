@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.catalogue_cache import bump_course
+from core.counters import find_counter_drift, rebuild_course_counters
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает Course.lessons_count и Course.active_enrollments_count"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="только проверить счётчики, ничего не менять (код выхода 1 при расхождении)",
+        )
+
+    def handle(self, *args, **options):
+        drift = find_counter_drift()
+        for course, field, stored, actual in drift:
+            self.stdout.write(f"{course.slug}: {field} = {stored}, на самом деле {actual}")
+
+        if options["check"]:
+            if drift:
+                raise CommandError(f"расхождений: {len(drift)}")
+            self.stdout.write(self.style.SUCCESS("счётчики в порядке"))
+            return
+
+        updated = rebuild_course_counters()
+        for slug in {course.slug for course, *_ in drift}:
+            bump_course(slug)
+        self.stdout.write(self.style.SUCCESS(f"пересчитано курсов: {updated}, исправлено: {len(drift)}"))
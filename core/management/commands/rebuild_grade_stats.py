@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.analytics import rebuild_grade_stats
+from core.models import GroupGradeStat, StudentGradeStat
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает JournalEntry.grade_value и сводки по оценкам с нуля"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rebuild_grade_stats(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"сводок групп: {GroupGradeStat.objects.count()}, "
+            f"сводок студентов: {StudentGradeStat.objects.count()}"
+        ))
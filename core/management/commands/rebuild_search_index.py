@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.catalogue_cache import bump_list
+from core.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Пересобирает поисковый индекс курсов и уроков (нужно после bulk_create и загрузки дампов)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        total = rebuild_search_index(batch_size=options["batch_size"])
+        bump_list()
+        self.stdout.write(self.style.SUCCESS(f"проиндексировано документов: {total}"))
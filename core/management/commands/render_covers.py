@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Course
+from core.tasks import enqueue
+
+
+class Command(BaseCommand):
+    help = "Ставит в очередь нарезку версий обложек курсов, у которых их ещё нет"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="нарезать заново все обложки")
+
+    def handle(self, *args, **options):
+        courses = Course.objects.exclude(cover="").exclude(cover__isnull=True)
+        queued = 0
+        with transaction.atomic():
+            for course_id, cover, renditions in courses.values_list("pk", "cover", "cover_renditions"):
+                if options["all"] or renditions.get("source") != cover:
+                    enqueue("render_cover", course_id=course_id, source=cover)
+                    queued += 1
+        self.stdout.write(self.style.SUCCESS(f"поставлено в очередь: {queued}"))
@@ -0,0 +1,73 @@
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.tasks import claim_jobs, run_job
+
+
+def run_job_in_thread(job_id):
+    # у каждого потока своё соединение с БД, закрываем его после задачи
+    try:
+        return run_job(job_id)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Выполняет фоновые задачи из очереди core.Job в пуле процессов или потоков"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2,
+                            help="размер пула; 0 — выполнять в текущем процессе")
+        parser.add_argument("--pool", choices=["process", "thread"], default="process",
+                            help="thread — для задач, которые в основном ждут сеть (почта)")
+        parser.add_argument("--poll", type=float, default=2.0, help="пауза при пустой очереди, сек")
+        parser.add_argument("--once", action="store_true", help="выполнить готовые задачи и выйти")
+
+    def handle(self, *args, **options):
+        if options["workers"] <= 0:
+            return self.run_inline(options)
+
+        done = 0
+        running = set()
+        if options["pool"] == "thread":
+            pool, target = ThreadPoolExecutor(max_workers=options["workers"]), run_job_in_thread
+        else:
+            # spawn, а не fork: форк унаследовал бы открытое соединение с БД
+            pool, target = ProcessPoolExecutor(
+                max_workers=options["workers"],
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            ), run_job
+        with pool:
+            while True:
+                free = options["workers"] - len(running)
+                ids = claim_jobs(free) if free else []
+                running.update(pool.submit(target, job_id) for job_id in ids)
+                if not running:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll"])
+                    continue
+                finished, running = wait(running, timeout=options["poll"], return_when=FIRST_COMPLETED)
+                for future in finished:
+                    future.result()
+                    done += 1
+        self.stdout.write(self.style.SUCCESS(f"выполнено задач: {done}"))
+
+    def run_inline(self, options):
+        done = 0
+        while True:
+            ids = claim_jobs(1)
+            if not ids:
+                if options["once"]:
+                    break
+                time.sleep(options["poll"])
+                continue
+            run_job(ids[0])
+            done += 1
+        self.stdout.write(self.style.SUCCESS(f"выполнено задач: {done}"))
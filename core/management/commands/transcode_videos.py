@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import VideoLesson
+from core.tasks import enqueue
+
+
+class Command(BaseCommand):
+    help = "Ставит в очередь HLS-перекодирование видеоуроков без готовой HLS-версии"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--failed", action="store_true", help="повторить и упавшие")
+        parser.add_argument("--all", action="store_true", help="перекодировать все видео заново")
+
+    def handle(self, *args, **options):
+        videos = VideoLesson.objects.exclude(video_file="")
+        if not options["all"]:
+            statuses = ["pending", "failed"] if options["failed"] else ["pending"]
+            videos = videos.filter(hls_status__in=statuses)
+        with transaction.atomic():
+            ids = list(videos.values_list("pk", flat=True))
+            videos.filter(pk__in=ids).update(hls_status="pending")
+            for video_id in ids:
+                enqueue("transcode_video", video_id=video_id)
+        self.stdout.write(self.style.SUCCESS(f"поставлено в очередь: {len(ids)}"))
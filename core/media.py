@@ -0,0 +1,161 @@
+# core/media.py
+import mimetypes
+import posixpath
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+
+from .covers import RENDITION_NAME
+
+READ_BLOCK = 256 * 1024
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PROTECTED_DIRS = ("video_lessons/", "video_hls/")
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+# =========================
+# ОТДАЧА ФАЙЛОВ ПО ДИАПАЗОНАМ
+# =========================
+# Плеер при перемотке запрашивает `Range: bytes=N-`, и без ответа 206 он
+# качает файл заново с начала. Поддерживается один диапазон на запрос;
+# несколько диапазонов (multipart/byteranges) RFC 9110 разрешает
+# игнорировать — тогда отдаём файл целиком.
+#
+# settings.MEDIA_SENDFILE переносит отдачу на фронт-сервер:
+#   "nginx"  — X-Accel-Redirect на MEDIA_SENDFILE_PREFIX + путь, в nginx:
+#              location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+#   "apache" — X-Sendfile с абсолютным путём (mod_xsendfile)
+# Range и условные запросы фронт-сервер тогда обрабатывает сам. Путь в
+# заголовке percent-кодируется: заголовки латинские, а имена загрузок
+# бывают кириллическими. nginx декодирует X-Accel-Redirect как URI,
+# mod_xsendfile — при XSendFileUnescape On (по умолчанию).
+
+def file_etag(stat):
+    return '"%x-%x"' % (stat.st_size, stat.st_mtime_ns)
+
+
+def parse_range(header, size):
+    """(start, end) включительно; None — отдать файл целиком; ValueError — 416."""
+    match = _RANGE.match(header.replace(" ", ""))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError("empty suffix range")
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("unsatisfiable range")
+    return start, end
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or "W/" + etag in tags
+    since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+    return since is not None and int(mtime) <= since
+
+
+def _range_applies(request, etag, mtime):
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(mtime)
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            block = f.read(min(READ_BLOCK, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def _sendfile_response(name, path, content_type):
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SENDFILE == "nginx":
+        response["X-Accel-Redirect"] = quote(settings.MEDIA_SENDFILE_PREFIX + name)
+    else:
+        response["X-Sendfile"] = quote(str(path))
+    return response
+
+
+def serve_file(request, name, cache_control="private"):
+    """Отдаёт MEDIA_ROOT/<name> с поддержкой Range, ETag и If-Modified-Since."""
+    try:
+        path = Path(safe_join(settings.MEDIA_ROOT, name))
+        stat = path.stat()
+    except (OSError, SuspiciousFileOperation):
+        raise Http404("Файл не найден")
+    if not path.is_file():
+        raise Http404("Файл не найден")
+
+    content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if getattr(settings, "MEDIA_SENDFILE", None):
+        response = _sendfile_response(name, path, content_type)
+        response["Cache-Control"] = cache_control
+        return response
+
+    size, mtime, etag = stat.st_size, stat.st_mtime, file_etag(stat)
+    if _not_modified(request, etag, mtime):
+        response = HttpResponseNotModified()
+    else:
+        byte_range = None
+        header = request.META.get("HTTP_RANGE")
+        if header and _range_applies(request, etag, mtime):
+            try:
+                byte_range = parse_range(header, size)
+            except ValueError:
+                response = HttpResponse(status=416)
+                response["Content-Range"] = "bytes */%d" % size
+                return response
+
+        start, end = byte_range or (0, size - 1)
+        length = end - start + 1 if size else 0
+        response = StreamingHttpResponse(_read_range(path, start, length), content_type=content_type)
+        response["Content-Length"] = str(length)
+        if byte_range:
+            response.status_code = 206
+            response["Content-Range"] = "bytes %d-%d/%d" % (start, end, size)
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(mtime)
+    response["Cache-Control"] = cache_control
+    return response
+
+
+def serve_public_media(request, path):
+    """Замена django.views.static.serve для DEBUG: то же, но с Range.
+
+    Защищённые каталоги (видеоуроки) отдаются только через
+    /api/videos/<id>/stream/ с проверкой доступа. Версии обложек с хэшем
+    в имени не меняются и кэшируются навсегда.
+    """
+    name = posixpath.normpath(path).lstrip("/")
+    if name.startswith(PROTECTED_DIRS) or any(part.startswith(".") for part in name.split("/")):
+        raise Http404("Файл не найден")
+    if RENDITION_NAME.search(name):
+        return serve_file(request, name, IMMUTABLE_CACHE_CONTROL)
+    return serve_file(request, name)
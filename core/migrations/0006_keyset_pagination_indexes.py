@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-18 11:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_alter_journalentry_grade_alter_journalentry_group_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['-created_at', '-id'], name='application_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['-issued_at', '-id'], name='certificate_issued_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['-created_at', '-id'], name='course_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['-purchased_at', '-id'], name='enrollment_purchased_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['student', '-purchased_at', '-id'], name='enrollment_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journalentry',
+            index=models.Index(fields=['-date', '-id'], name='journal_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='videolesson',
+            index=models.Index(fields=['-created_at', '-id'], name='videolesson_created_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 6.0 on 2026-10-18 11:16
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Course = apps.get_model('core', 'Course')
+    Lesson = apps.get_model('core', 'Lesson')
+    Enrollment = apps.get_model('core', 'Enrollment')
+
+    def counted(queryset):
+        subquery = (
+            queryset.filter(course=OuterRef('pk')).order_by()
+            .values('course').annotate(n=Count('pk')).values('n')
+        )
+        return Coalesce(Subquery(subquery, output_field=IntegerField()), Value(0))
+
+    Course.objects.update(
+        lessons_count=counted(Lesson.objects.all()),
+        active_enrollments_count=counted(Enrollment.objects.filter(active=True)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='active_enrollments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='lessons_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
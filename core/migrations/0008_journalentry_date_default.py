@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 11:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_course_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='journalentry',
+            name='date',
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+    ]
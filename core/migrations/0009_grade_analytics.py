@@ -0,0 +1,97 @@
+# Generated by Django 6.0 on 2026-10-18 11:22
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from core.grades import grade_bucket, normalize_grade
+
+
+def fill_grade_stats(apps, schema_editor):
+    JournalEntry = apps.get_model('core', 'JournalEntry')
+    GroupGradeStat = apps.get_model('core', 'GroupGradeStat')
+    StudentGradeStat = apps.get_model('core', 'StudentGradeStat')
+
+    groups, students, changed = defaultdict(list), defaultdict(list), []
+    for entry in JournalEntry.objects.only('id', 'grade', 'group_id', 'student_id', 'date').iterator(chunk_size=2000):
+        entry.grade_value = normalize_grade(entry.grade)
+        if entry.grade_value is None:
+            continue
+        changed.append(entry)
+        period = entry.date.replace(day=1)
+        groups[(entry.group_id, period)].append(entry.grade_value)
+        students[(entry.group_id, entry.student_id, period)].append(entry.grade_value)
+    JournalEntry.objects.bulk_update(changed, ['grade_value'], batch_size=2000)
+
+    def totals(values):
+        buckets = [0] * 5
+        for value in values:
+            buckets[grade_bucket(value) - 1] += 1
+        return dict(count=len(values), total=sum(values),
+                    **{f'n{i + 1}': n for i, n in enumerate(buckets)})
+
+    GroupGradeStat.objects.bulk_create(
+        [GroupGradeStat(group_id=g, period=p, **totals(v)) for (g, p), v in groups.items()],
+        batch_size=2000,
+    )
+    StudentGradeStat.objects.bulk_create(
+        [StudentGradeStat(group_id=g, student_id=s, period=p, **totals(v)) for (g, s, p), v in students.items()],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_journalentry_date_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journalentry',
+            name='grade_value',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=4, null=True),
+        ),
+        migrations.CreateModel(
+            name='GroupGradeStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('n1', models.PositiveIntegerField(default=0)),
+                ('n2', models.PositiveIntegerField(default=0)),
+                ('n3', models.PositiveIntegerField(default=0)),
+                ('n4', models.PositiveIntegerField(default=0)),
+                ('n5', models.PositiveIntegerField(default=0)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grade_stats', to='core.studentgroup')),
+            ],
+            options={
+                'unique_together': {('group', 'period')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentGradeStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('n1', models.PositiveIntegerField(default=0)),
+                ('n2', models.PositiveIntegerField(default=0)),
+                ('n3', models.PositiveIntegerField(default=0)),
+                ('n4', models.PositiveIntegerField(default=0)),
+                ('n5', models.PositiveIntegerField(default=0)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_grade_stats', to='core.studentgroup')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grade_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period', 'student'], name='studentgradestat_period_idx')],
+                'unique_together': {('group', 'student', 'period')},
+            },
+        ),
+        migrations.RunPython(fill_grade_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_job_videolesson_hls'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='key',
+            field=models.CharField(blank=True, max_length=200, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 6.0 on 2026-10-18 11:33
+
+import django.db.models.deletion
+from django.core import signing
+from django.db import migrations, models
+
+
+def fill_certificate_records(apps, schema_editor):
+    Certificate = apps.get_model("core", "Certificate")
+    CertificateRecord = apps.get_model("core", "CertificateRecord")
+    rows = Certificate.objects.values(
+        "pk", "cert_number", "issued_at",
+        "enrollment__student__username", "enrollment__student__first_name",
+        "enrollment__student__last_name", "enrollment__course__title",
+    )
+    records = []
+    for row in rows.iterator(chunk_size=2000):
+        full_name = f"{row['enrollment__student__first_name']} {row['enrollment__student__last_name']}".strip()
+        payload = {
+            "number": row["cert_number"],
+            "student": full_name or row["enrollment__student__username"],
+            "course": row["enrollment__course__title"],
+            "issued_at": row["issued_at"].date().isoformat(),
+        }
+        records.append(CertificateRecord(
+            certificate_id=row["pk"], cert_number=row["cert_number"], payload=payload,
+            token=signing.dumps(payload, salt="core.certificates.verify", compress=True),
+        ))
+    CertificateRecord.objects.bulk_create(records, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_number_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CertificateRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cert_number', models.CharField(max_length=100, unique=True)),
+                ('payload', models.JSONField()),
+                ('token', models.TextField()),
+                ('certificate', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='record', to='core.certificate')),
+            ],
+        ),
+        migrations.RunPython(fill_certificate_records, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-18 11:36
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_certificate_record'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenRevocation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(blank=True, max_length=255, null=True, unique=True)),
+                ('user_id', models.BigIntegerField(blank=True, null=True)),
+                ('revoked_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at'], name='tokenrevocation_expires_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 6.0 on 2026-10-18 11:40
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Max
+
+
+# замороженная копия core.grades.grade_bucket: миграция не должна зависеть
+# от того, как шкала будет выглядеть потом
+def grade_bucket(value):
+    return min(5, max(1, int(value + Decimal("0.5"))))
+
+
+def drop_duplicate_journal_entries(apps, schema_editor):
+    # из повторов (group, date, student) остаётся последняя по id оценка;
+    # delete() в миграции не шлёт сигналы, поэтому вклад удалённых оценок
+    # вычитается из сводок здесь же — как это сделал бы apply_grade_changes
+    JournalEntry = apps.get_model("core", "JournalEntry")
+    GroupGradeStat = apps.get_model("core", "GroupGradeStat")
+    StudentGradeStat = apps.get_model("core", "StudentGradeStat")
+    duplicates = (
+        JournalEntry.objects.values("group_id", "date", "student_id")
+        .annotate(n=Count("id"), keep=Max("id")).filter(n__gt=1)
+    )
+    for row in duplicates:
+        extra = JournalEntry.objects.filter(
+            group_id=row["group_id"], date=row["date"], student_id=row["student_id"],
+        ).exclude(pk=row["keep"])
+        for value in extra.exclude(grade_value__isnull=True).values_list("grade_value", flat=True):
+            bucket = f"n{grade_bucket(value)}"
+            changes = {"count": F("count") - 1, "total": F("total") - value, bucket: F(bucket) - 1}
+            period = row["date"].replace(day=1)
+            GroupGradeStat.objects.filter(group_id=row["group_id"], period=period).update(**changes)
+            StudentGradeStat.objects.filter(
+                group_id=row["group_id"], student_id=row["student_id"], period=period,
+            ).update(**changes)
+        extra.delete()
+
+
+def renumber_duplicate_lessons(apps, schema_editor):
+    # курсы с одинаковым order у уроков перенумеровываются 0, 1, 2... с тем же порядком
+    Lesson = apps.get_model("core", "Lesson")
+    courses = (
+        Lesson.objects.values("course_id", "order").annotate(n=Count("id"))
+        .filter(n__gt=1).values_list("course_id", flat=True).distinct()
+    )
+    for course_id in set(courses):
+        lessons = list(Lesson.objects.filter(course_id=course_id).order_by("order", "id"))
+        for position, lesson in enumerate(lessons):
+            lesson.order = position
+        Lesson.objects.bulk_update(lessons, ["order"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_token_revocation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_journal_entries, migrations.RunPython.noop),
+        migrations.RunPython(renumber_duplicate_lessons, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='videolesson',
+            index=models.Index(fields=['course', '-created_at', '-id'], name='videolesson_course_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='videolesson',
+            index=models.Index(fields=['teacher', '-created_at', '-id'], name='videolesson_teacher_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='journalentry',
+            constraint=models.UniqueConstraint(fields=('group', 'date', 'student'), name='journal_unique_entry'),
+        ),
+        migrations.AddConstraint(
+            model_name='lesson',
+            constraint=models.UniqueConstraint(fields=('course', 'order'), name='lesson_course_order_uniq'),
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 6.0 on 2026-10-18 11:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# внешний контент: FTS5 хранит только индекс, текст берётся из core_searchentry;
+# prefix — готовые индексы префиксов для typeahead
+SQLITE_FTS = [
+    """CREATE VIRTUAL TABLE core_searchentry_fts USING fts5(
+        title, body, content='core_searchentry', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')""",
+    """CREATE TRIGGER core_searchentry_ai AFTER INSERT ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    """CREATE TRIGGER core_searchentry_ad AFTER DELETE ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts(core_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    """CREATE TRIGGER core_searchentry_au AFTER UPDATE ON core_searchentry BEGIN
+        INSERT INTO core_searchentry_fts(core_searchentry_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO core_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+]
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS core_searchentry_au",
+    "DROP TRIGGER IF EXISTS core_searchentry_ad",
+    "DROP TRIGGER IF EXISTS core_searchentry_ai",
+    "DROP TABLE IF EXISTS core_searchentry_fts",
+]
+# то же выражение, что PG_VECTOR в core/search.py
+POSTGRES_GIN = """CREATE INDEX core_searchentry_tsv_idx ON core_searchentry USING GIN ((
+    setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', body), 'B')))"""
+POSTGRES_GIN_DROP = "DROP INDEX IF EXISTS core_searchentry_tsv_idx"
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for sql in SQLITE_FTS:
+            schema_editor.execute(sql)
+    elif vendor == "postgresql":
+        schema_editor.execute(POSTGRES_GIN)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for sql in SQLITE_FTS_DROP:
+            schema_editor.execute(sql)
+    elif vendor == "postgresql":
+        schema_editor.execute(POSTGRES_GIN_DROP)
+
+
+def fill_search_entries(apps, schema_editor):
+    Course = apps.get_model("core", "Course")
+    Lesson = apps.get_model("core", "Lesson")
+    SearchEntry = apps.get_model("core", "SearchEntry")
+    yo = str.maketrans("ёЁ", "еЕ")
+    entries = [
+        SearchEntry(kind="course", object_id=pk, course_id=pk,
+                    title=title.translate(yo), body=description.translate(yo))
+        for pk, title, description in Course.objects.values_list("pk", "title", "description").iterator()
+    ] + [
+        SearchEntry(kind="lesson", object_id=pk, course_id=course_id,
+                    title=title.translate(yo), body=content.translate(yo))
+        for pk, course_id, title, content in Lesson.objects.values_list(
+            "pk", "course_id", "title", "content").iterator()
+    ]
+    SearchEntry.objects.bulk_create(entries, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('course', 'Курс'), ('lesson', 'Урок')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(max_length=200)),
+                ('body', models.TextField(blank=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='core.course')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='searchentry_object_uniq')],
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(fill_search_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-18 11:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['level', '-created_at', '-id'], name='course_level_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['price', 'id'], name='course_price_idx'),
+        ),
+    ]
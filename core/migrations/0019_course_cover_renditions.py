@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_course_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='cover_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
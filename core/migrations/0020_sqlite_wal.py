@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 12:40
+
+from django.db import migrations
+
+
+# journal_mode=WAL хранится в самом файле базы: достаточно включить один
+# раз, а не на каждом соединении. Внутри транзакции SQLite режим не меняет,
+# поэтому миграция не atomic.
+def enable_wal(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("PRAGMA journal_mode=WAL")
+
+
+def disable_wal(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("PRAGMA journal_mode=DELETE")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('core', '0019_course_cover_renditions'),
+    ]
+
+    operations = [
+        migrations.RunPython(enable_wal, disable_wal),
+    ]
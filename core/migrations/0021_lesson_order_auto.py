@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_sqlite_wal'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lesson',
+            name='order',
+            field=models.PositiveIntegerField(default=None),
+        ),
+    ]
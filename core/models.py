@@ -1,8 +1,13 @@
+import uuid
+
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Max
 from django.utils import timezone
 from django.contrib.auth.models import User
 
+from .grades import grade_state, normalize_grade
+
 # =========================
 # ПРОФИЛЬ + РОЛИ
 # =========================
@@ -43,6 +48,11 @@ class Application(models.Model):
     message = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="application_created_idx"),
+        ]
+
     def __str__(self):
         return f"{self.full_name} — {self.course}"
 
@@ -64,8 +74,22 @@ class Course(models.Model):
     level = models.CharField(max_length=3, choices=LEVELS, default="BEG")
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     cover = models.ImageField(upload_to="course_covers/", null=True, blank=True)
+    # версии обложки для srcset, см. core/covers.py
+    cover_renditions = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # денормализованные счётчики, см. core/counters.py
+    lessons_count = models.PositiveIntegerField(default=0, editable=False)
+    active_enrollments_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="course_created_idx"),
+            # фильтр по уровню с сортировкой по умолчанию и ordering=price
+            models.Index(fields=["level", "-created_at", "-id"], name="course_level_idx"),
+            models.Index(fields=["price", "id"], name="course_price_idx"),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -77,12 +101,39 @@ class Lesson(models.Model):
         on_delete=models.CASCADE
     )
     title = models.CharField(max_length=200)
-    order = models.PositiveIntegerField(default=0)
+    # None — номер выдаст save(): следующий в курсе
+    order = models.PositiveIntegerField(default=None)
     video_url = models.URLField(blank=True, null=True)
     content = models.TextField(blank=True)
 
     class Meta:
         ordering = ["order"]
+        constraints = [
+            # индекс ограничения обслуживает и course.lessons.order_by("order")
+            models.UniqueConstraint(fields=["course", "order"], name="lesson_course_order_uniq"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "course_id" in instance.__dict__:  # course_id мог быть отложен (defer)
+            instance.remember_counted_course()
+        return instance
+
+    def remember_counted_course(self):
+        # курс, в Course.lessons_count которого урок уже учтён
+        self._counted_course_id = self.course_id
+
+    def save(self, *args, **kwargs):
+        # счётчик курса обновляется в post_save — в той же транзакции
+        with transaction.atomic():
+            if self._state.adding and self.order is None:
+                # урок встаёт в конец курса; строка курса блокируется, иначе два
+                # параллельных добавления взяли бы один номер (IntegrityError)
+                Course.objects.select_for_update().filter(pk=self.course_id).values_list("pk").first()
+                last = Lesson.objects.filter(course_id=self.course_id).aggregate(last=Max("order"))["last"]
+                self.order = 0 if last is None else last + 1
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.course.title} — {self.title}"
@@ -108,6 +159,24 @@ class Enrollment(models.Model):
 
     class Meta:
         unique_together = ("student", "course")
+        indexes = [
+            models.Index(fields=["-purchased_at", "-id"], name="enrollment_purchased_idx"),
+            models.Index(fields=["student", "-purchased_at", "-id"], name="enrollment_student_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_counted_state()
+        return instance
+
+    def remember_counted_state(self):
+        # то, что уже учтено в Course.active_enrollments_count
+        self._counted_state = (self.course_id, self.active)
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.student.username} -> {self.course.title}"
@@ -122,10 +191,43 @@ class Certificate(models.Model):
     issued_at = models.DateTimeField(auto_now_add=True)
     cert_number = models.CharField(max_length=100, unique=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-issued_at", "-id"], name="certificate_issued_idx"),
+        ]
+
     def __str__(self):
         return f"Certificate {self.cert_number}"
 
 
+class CertificateRecord(models.Model):
+    """Снимок сертификата на момент выдачи для публичной проверки.
+
+    payload уже готов к отдаче, token — он же, подписанный SECRET_KEY
+    (core/certificates.py), поэтому проверка не делает JOIN'ов.
+    """
+    certificate = models.OneToOneField(
+        Certificate,
+        on_delete=models.CASCADE,
+        related_name="record"
+    )
+    cert_number = models.CharField(max_length=100, unique=True)
+    payload = models.JSONField()
+    token = models.TextField()
+
+    def __str__(self):
+        return self.cert_number
+
+
+class NumberSequence(models.Model):
+    """Счётчик для номеров документов; блоки резервирует core/certificates.py."""
+    name = models.CharField(max_length=50, primary_key=True)
+    last_value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_value}"
+
+
 # =========================
 # ПРОФИЛИ УЧИТЕЛЯ И ДИРЕКТОРА
 # =========================
@@ -190,14 +292,99 @@ class JournalEntry(models.Model):
         on_delete=models.CASCADE,
         related_name='journal_entries'
     )
-    date = models.DateField(auto_now_add=True)
+    date = models.DateField(default=timezone.localdate)
     grade = models.CharField(max_length=5)
+    # grade, приведённая к пятибалльной шкале (core/grades.py); None — не оценка
+    grade_value = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True, editable=False)
     comment = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-date", "-id"], name="journal_date_idx"),
+        ]
+        constraints = [
+            # одна оценка студента в группе за день; порядок колонок — под
+            # журнал учителя (group) и JournalBulkSerializer (group, date, student__in)
+            models.UniqueConstraint(fields=["group", "date", "student"], name="journal_unique_entry"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_graded_state()
+        return instance
+
+    def remember_graded_state(self):
+        # то, что уже учтено в сводках GroupGradeStat/StudentGradeStat
+        deferred = self.get_deferred_fields()
+        if deferred & {"group_id", "student_id", "date", "grade_value"}:
+            return
+        self._graded_state = grade_state(self)
+
+    def save(self, *args, **kwargs):
+        self.grade_value = normalize_grade(self.grade)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.student.username} — {self.grade}"
 
 
+# =========================
+# СВОДКИ ПО ОЦЕНКАМ
+# =========================
+# Поддерживаются инкрементально (core/analytics.py), period — первое число месяца.
+
+class GradeStat(models.Model):
+    period = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    n1 = models.PositiveIntegerField(default=0)
+    n2 = models.PositiveIntegerField(default=0)
+    n3 = models.PositiveIntegerField(default=0)
+    n4 = models.PositiveIntegerField(default=0)
+    n5 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class GroupGradeStat(GradeStat):
+    group = models.ForeignKey(
+        StudentGroup,
+        on_delete=models.CASCADE,
+        related_name='grade_stats'
+    )
+
+    class Meta:
+        unique_together = ("group", "period")
+
+    def __str__(self):
+        return f"{self.group.name} {self.period:%Y-%m}: {self.count}"
+
+
+class StudentGradeStat(GradeStat):
+    group = models.ForeignKey(
+        StudentGroup,
+        on_delete=models.CASCADE,
+        related_name='student_grade_stats'
+    )
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='grade_stats'
+    )
+
+    class Meta:
+        unique_together = ("group", "student", "period")
+        indexes = [
+            models.Index(fields=["period", "student"], name="studentgradestat_period_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.student.username} {self.period:%Y-%m}: {self.count}"
+
+
 # =========================
 # ВИДЕОУРОКИ
 # =========================
@@ -208,6 +395,13 @@ class VideoLesson(models.Model):
         related_name='videos',
         on_delete=models.CASCADE
     )
+    HLS_STATUS_CHOICES = (
+        ('pending', 'В очереди'),
+        ('processing', 'Обрабатывается'),
+        ('ready', 'Готово'),
+        ('failed', 'Ошибка'),
+    )
+
     title = models.CharField(max_length=200)
     video_file = models.FileField(upload_to='video_lessons/')
     teacher = models.ForeignKey(
@@ -218,5 +412,140 @@ class VideoLesson(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # HLS-версии (core/transcode.py): MEDIA_ROOT/video_hls/<id>/master.m3u8
+    hls_status = models.CharField(max_length=20, choices=HLS_STATUS_CHOICES, default='pending')
+    hls_renditions = models.JSONField(default=list, blank=True)
+    poster = models.ImageField(upload_to='video_posters/', blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="videolesson_created_idx"),
+            # фильтры админки по курсу и учителю
+            models.Index(fields=["course", "-created_at", "-id"], name="videolesson_course_idx"),
+            models.Index(fields=["teacher", "-created_at", "-id"], name="videolesson_teacher_idx"),
+        ]
+
     def __str__(self):
         return self.title
+
+
+class VideoUpload(models.Model):
+    """Незавершённая загрузка видео по частям (core/uploads.py).
+
+    Байты лежат в MEDIA_ROOT/video_lessons/.uploads/<id>.part, принятый
+    offset — это размер этого файла. VideoLesson создаётся только после
+    finalize и проверки sha256.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    teacher = models.ForeignKey(
+        TeacherProfile,
+        on_delete=models.CASCADE,
+        related_name='video_uploads'
+    )
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='video_uploads'
+    )
+    title = models.CharField(max_length=200)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.size} bytes)"
+
+
+# =========================
+# ФОНОВЫЕ ЗАДАЧИ
+# =========================
+
+class Job(models.Model):
+    """Задача в очереди core/tasks.py; выполняет `manage.py run_jobs`."""
+    STATUS_CHOICES = (
+        ('queued', 'В очереди'),
+        ('running', 'Выполняется'),
+        ('done', 'Выполнена'),
+        ('failed', 'Ошибка'),
+    )
+
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after", "id"], name="job_ready_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+# =========================
+# ОТЗЫВ JWT
+# =========================
+
+class TokenRevocation(models.Model):
+    """Отзыв токенов до истечения их срока (core/auth.py).
+
+    Либо один токен по jti, либо все токены пользователя, выданные раньше
+    revoked_at (смена роли, блокировка). После expires_at запись не нужна:
+    такие токены истекли сами.
+    """
+    jti = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    # не ForeignKey: токены удалённого пользователя тоже надо отзывать
+    user_id = models.BigIntegerField(null=True, blank=True)
+    revoked_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["expires_at"], name="tokenrevocation_expires_idx"),
+        ]
+
+    def __str__(self):
+        return self.jti or f"user {self.user_id} до {self.revoked_at:%Y-%m-%d %H:%M}"
+
+
+# =========================
+# ПОЛНОТЕКСТОВЫЙ ПОИСК
+# =========================
+
+class SearchEntry(models.Model):
+    """Документ поискового индекса: курс или урок (core/search.py).
+
+    Полнотекстовый индекс строится по title и body: в SQLite — таблица
+    FTS5 core_searchentry_fts с триггерами, в PostgreSQL — GIN-индекс по
+    tsvector. Строки обновляются сигналами при сохранении курса и урока.
+    """
+    KIND_CHOICES = (
+        ('course', 'Курс'),
+        ('lesson', 'Урок'),
+    )
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='search_entries'
+    )
+    title = models.CharField(max_length=200)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="searchentry_object_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}: {self.title}"
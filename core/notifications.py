@@ -0,0 +1,32 @@
+# core/notifications.py
+from django.conf import settings
+from django.core.mail import send_mail
+
+from .models import Application
+from .tasks import task
+
+
+# =========================
+# ПИСЬМА
+# =========================
+# Письма уходят из очереди (core/tasks.py), а не из запроса: SMTP может
+# отвечать секундами, а при сбое задача повторится с backoff.
+
+@task("notify_application", max_attempts=8, backoff=60)
+def notify_application(application_id):
+    recipients = settings.APPLICATION_NOTIFY_EMAILS
+    application = Application.objects.filter(pk=application_id).first()
+    if not recipients or application is None:
+        return
+    send_mail(
+        subject=f"Новая заявка: {application.full_name}",
+        message=(
+            f"Имя: {application.full_name}\n"
+            f"Email: {application.email}\n"
+            f"Телефон: {application.phone or '—'}\n"
+            f"Курс: {application.course or '—'}\n\n"
+            f"{application.message}"
+        ),
+        from_email=None,
+        recipient_list=recipients,
+    )
@@ -0,0 +1,119 @@
+# core/pagination.py
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor (keyset) pagination for the whole /api/ router.
+
+    The viewset declares its ordering in `cursor_ordering`; it must end with
+    a unique field ("id"/"-id") so that no two rows share a position.
+
+    Stock CursorPagination keeps only the first ordering field in the
+    cursor and skips rows that tie on it with OFFSET, so a long run of
+    equal dates or prices degrades into an OFFSET scan. Here the cursor
+    holds every ordering field and a page is
+    `WHERE key <= k AND (key < k OR id < i) ORDER BY key, id LIMIT n`:
+    the first condition is an index range, the offset is always 0, and a
+    deep page costs the same as the first one.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = ("-id",)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, "cursor_ordering", None)
+        if ordering is None:
+            return super().get_ordering(request, queryset, view)
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip("-")
+            attr = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(None if attr is None else str(attr))
+        return json.dumps(values, separators=(",", ":"))
+
+    def keyset_filter(self, position, reverse):
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        # (a, b, id) после (x, y, z): a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z)
+        condition, equal = Q(), Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip("-")
+            # (курсор назад) XOR (убывающее поле)
+            lookup = "lt" if reverse != field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        first = self.ordering[0].lstrip("-")
+        first_lookup = "lte" if reverse != self.ordering[0].startswith("-") else "gte"
+        # нестрогая граница по первому полю — диапазон по индексу
+        return Q(**{f"{first}__{first_lookup}": values[0]}) & condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # повторяет CursorPagination.paginate_queryset, кроме фильтра по позиции
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(self.keyset_filter(current_position, reverse))
+
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
@@ -0,0 +1,177 @@
+# core/queryplan.py
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from rest_framework import permissions, serializers
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# ПЛАН ЗАГРУЗКИ СВЯЗЕЙ
+# =========================
+# Сериализатор сам знает, какие связи он читает, поэтому план
+# объявляется в его Meta:
+#
+#     class Meta:
+#         select_related = ["group__teacher__user"]
+#         prefetch_related = ["students"]
+
+def get_relation_plan(serializer_class):
+    meta = getattr(serializer_class, "Meta", None)
+    return (
+        list(getattr(meta, "select_related", [])),
+        list(getattr(meta, "prefetch_related", [])),
+    )
+
+
+def apply_relation_plan(queryset, serializer_class):
+    select, prefetch = get_relation_plan(serializer_class)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+def _select_related_paths(select):
+    paths = set()
+    for lookup in select:
+        parts = lookup.split("__")
+        paths.update("__".join(parts[:i]) for i in range(1, len(parts) + 1))
+    return paths
+
+
+def get_deferred_columns(serializer, model, select=(), keep=(), prefix=""):
+    """Columns of `model` (and of its select_related models) the serializer never reads.
+
+    A field with source="*" (SerializerMethodField and friends) may read
+    anything, so nothing is deferred on that level.
+    """
+    sources = set()
+    nested = {}
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == "*":
+            return []
+        name = field.source.split(".")[0]
+        sources.add(name)
+        inner = getattr(field, "child", field)
+        if isinstance(inner, serializers.BaseSerializer) and "." not in field.source:
+            nested[name] = inner
+
+    deferred = [
+        prefix + f.name
+        for f in model._meta.concrete_fields
+        if not f.primary_key and not f.is_relation
+        and f.name not in sources and prefix + f.name not in keep
+    ]
+
+    joined = _select_related_paths(select)
+    for name, inner in nested.items():
+        try:
+            relation = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if relation.concrete and relation.is_relation and prefix + name in joined:
+            deferred += get_deferred_columns(
+                inner, relation.related_model, select, keep, prefix + name + "__"
+            )
+    return deferred
+
+
+class QueryPlanMixin:
+    """Applies the serializer's query plan to every queryset the viewset uses.
+
+    Besides select/prefetch_related, read requests defer every column the
+    serializer does not output. `?fields=a,b` narrows the output (and so
+    the column list) further.
+    """
+
+    def get_requested_fields(self):
+        if self.request.method not in permissions.SAFE_METHODS:
+            return None
+        raw = self.request.query_params.get("fields")
+        if not raw:
+            return None
+        return {name.strip() for name in raw.split(",") if name.strip()}
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        requested = self.get_requested_fields()
+        if requested:
+            target = getattr(serializer, "child", serializer)
+            for name in list(target.fields):
+                if name not in requested:
+                    target.fields.pop(name)
+        return serializer
+
+    def get_undeferrable_fields(self):
+        # курсор пагинации и lookup читаются с каждого объекта
+        keep = {name.lstrip("-") for name in getattr(self, "cursor_ordering", ())}
+        keep.add(self.lookup_field)
+        return keep
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        queryset = apply_relation_plan(queryset, self.get_serializer_class())
+        if self.request.method in permissions.SAFE_METHODS:
+            select, _ = get_relation_plan(self.get_serializer_class())
+            deferred = get_deferred_columns(
+                self.get_serializer(), queryset.model, select, self.get_undeferrable_fields()
+            )
+            if deferred:
+                queryset = queryset.defer(*deferred)
+        return queryset
+
+
+# =========================
+# БЮДЖЕТ ЗАПРОСОВ
+# =========================
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMixin:
+    """Counts SQL queries per request and reports them in X-Query-Count.
+
+    `query_budget` is the maximum number of queries a single request may
+    run, independent of row count. Going over it is logged, or raised when
+    settings.QUERY_BUDGET_STRICT is on.
+    """
+
+    query_budget = None
+
+    def get_query_budget(self):
+        return self.query_budget
+
+    def dispatch(self, request, *args, **kwargs):
+        counter = QueryCounter()
+        # считаются запросы ко всем базам, включая реплику (core/dbrouters.py)
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(counter))
+            response = super().dispatch(request, *args, **kwargs)
+
+        budget = self.get_query_budget()
+        response["X-Query-Count"] = str(counter.count)
+        if budget is not None:
+            response["X-Query-Budget"] = str(budget)
+            if counter.count > budget:
+                message = "%s %s ran %d queries (budget %d)" % (
+                    request.method, request.path, counter.count, budget
+                )
+                if getattr(settings, "QUERY_BUDGET_STRICT", False):
+                    raise AssertionError(message)
+                logger.warning(message)
+        return response
@@ -0,0 +1,233 @@
+# core/search.py
+import re
+
+from django.db import connection, transaction
+from django.utils.html import escape
+
+from .models import Course, Lesson, SearchEntry
+
+FTS_TABLE = "core_searchentry_fts"
+MAX_TERMS = 8
+MIN_STEM = 3
+# маркеры подсветки от БД; в тексте их не бывает, а escape() их не трогает
+MARK_START, MARK_END = "\x02", "\x03"
+
+_WORD = re.compile(r"\w+")
+_CYRILLIC = re.compile(r"[а-яёңөү]")
+
+
+# =========================
+# ИНДЕКС
+# =========================
+# SearchEntry — по строке на курс и урок; полнотекстовый индекс над ней
+# держит сама БД (миграция 0017): в SQLite триггеры переносят каждую
+# вставку/изменение/удаление в FTS5-таблицу, в PostgreSQL это GIN-индекс
+# по выражению. Сигналы (core/signals.py) делают upsert одним запросом.
+# bulk_create сигналы обходит — после него `manage.py rebuild_search_index`.
+#
+# Стемминга в индексе нет: unicode61 и 'simple' хранят слова как есть.
+# Вместо этого слово запроса обрезается до основы и ищется как префикс:
+# «программирования» -> программировани* находит «программирование»,
+# «китептерден» -> китеп* находит «китеп», «китептер».
+
+def normalize_text(text):
+    # unicode61 не приравнивает ё к е
+    return text.replace("ё", "е").replace("Ё", "Е")
+
+
+def _upsert(entry):
+    SearchEntry.objects.bulk_create(
+        [entry], update_conflicts=True, unique_fields=["kind", "object_id"],
+        update_fields=["course", "title", "body"],
+    )
+
+
+def course_entry(course):
+    return SearchEntry(kind="course", object_id=course.pk, course_id=course.pk,
+                       title=normalize_text(course.title), body=normalize_text(course.description))
+
+
+def lesson_entry(lesson):
+    return SearchEntry(kind="lesson", object_id=lesson.pk, course_id=lesson.course_id,
+                       title=normalize_text(lesson.title), body=normalize_text(lesson.content))
+
+
+def index_course(course):
+    _upsert(course_entry(course))
+
+
+def index_lesson(lesson):
+    _upsert(lesson_entry(lesson))
+
+
+def unindex(kind, object_id):
+    SearchEntry.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def rebuild_search_index(batch_size=2000):
+    """Пересобирает индекс с нуля; возвращает число документов."""
+    with transaction.atomic():
+        SearchEntry.objects.all().delete()
+        total = 0
+        for queryset, make in ((Course.objects.only("title", "description"), course_entry),
+                               (Lesson.objects.only("course_id", "title", "content"), lesson_entry)):
+            batch = []
+            for obj in queryset.iterator(chunk_size=batch_size):
+                batch.append(make(obj))
+                if len(batch) >= batch_size:
+                    SearchEntry.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+            SearchEntry.objects.bulk_create(batch)
+            total += len(batch)
+        if connection.vendor == "sqlite":
+            # заодно сжимает сегменты FTS5 после массовой вставки
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return total
+
+
+# =========================
+# ОСНОВЫ СЛОВ
+# =========================
+# Лёгкое отсечение окончаний, не полноценный стеммер: ошибка в сторону
+# короткой основы даёт лишние совпадения, которые ранжирование опускает
+# вниз. Основа не короче MIN_STEM букв. Русское окончание снимается один
+# раз, киргизские аффиксы — до трёх подряд (китеп-тер-ден); из двух основ
+# берётся короче. Латиница не трогается.
+#
+# Основа — всегда префикс слова, поэтому «основа*» находит всё, что
+# нашло бы «слово*», и недописанное слово typeahead'а ищется так же.
+
+RU_ENDINGS = sorted((
+    "ование", "ение", "ание", "ость", "ости", "остью",
+    "иями", "ями", "ами", "иях", "ях", "ах", "ием", "ией", "ий", "ей", "ой", "ом", "ем", "ам", "ям",
+    "его", "ого", "ему", "ому", "ими", "ыми", "ых", "их", "ую", "юю", "ая", "яя", "ое", "ее", "ые", "ие",
+    "ться", "тся", "ешь", "ете", "ите", "ют", "ут", "ят", "ать", "ять", "ить", "еть", "ыть",
+    "ал", "ил", "ла", "ли", "ло",
+    "а", "я", "о", "е", "ы", "и", "у", "ю", "ь", "й",
+), key=len, reverse=True)
+
+
+def _affixes(heads, vowels, tail=""):
+    return [head + vowel + tail for head in heads for vowel in vowels]
+
+
+# сингармонизм: четыре варианта гласной, согласная — по предыдущему звуку
+KY_SUFFIXES = sorted(
+    _affixes("лдт", "аеоө", "р")      # -лар: множественное число
+    + _affixes("ндт", "ыиуү", "н")    # -нын: родительный
+    + _affixes("ндт", "ыиуү")         # -ны: винительный
+    + _affixes("гк", "аеоө")          # -га: дательный
+    + _affixes("дт", "аеоө")          # -да: местный
+    + _affixes("дтн", "аеоө", "н"),   # -дан: исходный
+    key=len, reverse=True,
+)
+
+STOP_WORDS = frozenset((
+    "в", "во", "на", "по", "с", "со", "к", "о", "об", "от", "до", "за", "из", "для", "и", "не",
+    "да", "же", "ли", "бы", "жана", "менен", "үчүн", "дагы",
+))
+
+
+def _strip(word, suffixes):
+    for suffix in suffixes:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            return word[:-len(suffix)]
+    return word
+
+
+def stem(word):
+    word = normalize_text(word.lower())
+    if not _CYRILLIC.search(word):
+        return word
+    russian = _strip(word, RU_ENDINGS)
+    kyrgyz = word
+    for _ in range(3):
+        stripped = _strip(kyrgyz, KY_SUFFIXES)
+        if stripped == kyrgyz:
+            break
+        kyrgyz = stripped
+    return min(russian, kyrgyz, key=len)
+
+
+def query_terms(query):
+    """Префиксы для MATCH: основы слов запроса без служебных слов."""
+    words = _WORD.findall(normalize_text(query.lower()))
+    return [stem(word) for word in words if len(word) > 1 and word not in STOP_WORDS][:MAX_TERMS]
+
+
+# =========================
+# ЗАПРОС
+# =========================
+
+def render_highlight(text):
+    return escape(text).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+def search(query, kind=None, limit=20):
+    """Список найденных курсов и уроков, лучшие сверху."""
+    terms = query_terms(query)
+    if not terms:
+        return []
+    if connection.vendor == "postgresql":
+        rows = _search_postgresql(terms, kind, limit)
+    else:
+        rows = _search_sqlite(terms, kind, limit)
+    return [
+        {
+            "kind": row_kind,
+            "id": object_id,
+            "course": slug,
+            "title": render_highlight(title),
+            "snippet": render_highlight(snippet),
+            "url": f"/courses/{slug}/" + (f"#lesson-{object_id}" if row_kind == "lesson" else ""),
+        }
+        for row_kind, object_id, slug, title, snippet in rows
+    ]
+
+
+def _search_sqlite(terms, kind, limit):
+    # bm25: совпадение в заголовке весит в 10 раз больше, чем в тексте
+    match = " ".join(f'"{term}"*' for term in terms)
+    sql = f"""
+        SELECT e.kind, e.object_id, c.slug,
+               highlight({FTS_TABLE}, 0, %s, %s),
+               snippet({FTS_TABLE}, 1, %s, %s, '…', 16)
+        FROM {FTS_TABLE}
+        JOIN core_searchentry e ON e.id = {FTS_TABLE}.rowid
+        JOIN core_course c ON c.id = e.course_id
+        WHERE {FTS_TABLE} MATCH %s {"AND e.kind = %s" if kind else ""}
+        ORDER BY bm25({FTS_TABLE}, 10.0, 1.0)
+        LIMIT %s
+    """
+    params = [MARK_START, MARK_END, MARK_START, MARK_END, match, *([kind] if kind else []), limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+# выражение должно совпадать с GIN-индексом из миграции 0017
+PG_VECTOR = ("setweight(to_tsvector('simple', e.title), 'A') || "
+             "setweight(to_tsvector('simple', e.body), 'B')")
+
+
+def _search_postgresql(terms, kind, limit):
+    tsquery = " & ".join(f"{term}:*" for term in terms)
+    options = f"StartSel={MARK_START}, StopSel={MARK_END}"
+    sql = f"""
+        SELECT e.kind, e.object_id, c.slug,
+               ts_headline('simple', e.title, q.query, %s),
+               ts_headline('simple', e.body, q.query, %s)
+        FROM core_searchentry e
+        JOIN core_course c ON c.id = e.course_id,
+             to_tsquery('simple', %s) AS q(query)
+        WHERE {PG_VECTOR} @@ q.query {"AND e.kind = %s" if kind else ""}
+        ORDER BY ts_rank({PG_VECTOR}, q.query) DESC
+        LIMIT %s
+    """
+    params = [options + ", HighlightAll=true", options + ", MaxWords=24, MinWords=12",
+              tsquery, *([kind] if kind else []), limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
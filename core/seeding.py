@@ -0,0 +1,210 @@
+# core/seeding.py
+import math
+import random
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .analytics import rebuild_grade_stats
+from .catalogue_cache import bump_list
+from .certificates import build_records, reserve_numbers
+from .counters import rebuild_course_counters
+from .grades import normalize_grade
+from .search import rebuild_search_index
+from .models import (
+    Course, Lesson, Enrollment, Certificate, Profile, TeacherProfile, DirectorProfile,
+    StudentGroup, JournalEntry,
+)
+
+
+# =========================
+# СИНТЕТИЧЕСКИЕ ДАННЫЕ
+# =========================
+# Всё через bulk_create пачками по batch_size: сигналы не срабатывают,
+# поэтому профили создаются явно, а счётчики курсов, сводки оценок и
+# поисковый индекс пересчитываются в конце, как после rebuild_* команд. Строки отдаются
+# генераторами и не копятся в памяти, так что объём ограничен только базой.
+#
+# Одинаковый seed даёт одинаковые данные (даты — относительно сегодняшнего
+# дня), поэтому замеры разных коммитов сравнимы.
+#
+# lessons — уроков на курс, group_size — студентов в группе,
+# enrollments — курсов на студента, certificates — сколько записей всего
+# получат сертификат (поровну по курсам). Учителей — по одному на 5 групп; у первого
+# (его возвращает seed_database) всегда 5 групп, как у живого учителя.
+
+SCALES = {
+    "small": dict(courses=20, lessons=10, users=200, groups=10, group_size=20,
+                  enrollments=2, certificates=50, journal_entries=2_000),
+    "medium": dict(courses=200, lessons=10, users=2_000, groups=100, group_size=20,
+                   enrollments=2, certificates=500, journal_entries=20_000),
+    "large": dict(courses=2_000, lessons=10, users=20_000, groups=1_000, group_size=20,
+                  enrollments=3, certificates=5_000, journal_entries=200_000),
+    # около миллиона строк, как в рабочей базе
+    "production": dict(courses=500, lessons=20, users=50_000, groups=2_000, group_size=25,
+                       enrollments=3, certificates=45_000, journal_entries=700_000),
+}
+
+GROUPS_PER_TEACHER = 5
+GRADES = ("5", "5", "4", "4", "4", "3", "3", "2", "н")
+FIRST_NAMES = ("Айбек", "Мария", "Иван", "Алина", "Нурлан", "Айгерим", "Дмитрий", "Жылдыз")
+LAST_NAMES = ("Иванов", "Садыков", "Петрова", "Асанова", "Токтогулов", "Ким", "Смирнова")
+WORDS = ("Python", "Django", "SQL", "Алгоритмы", "Сети", "Linux", "Дизайн", "Frontend",
+         "Данные", "Git", "Тестирование", "Безопасность", "Mobile", "DevOps", "Графика")
+LEVELS = [code for code, _ in Course.LEVELS]
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def bulk_insert(model, rows, batch_size):
+    """bulk_create из генератора пачками; возвращает созданные объекты."""
+    created = []
+    for batch in _batches(rows, batch_size):
+        created += model.objects.bulk_create(batch)
+    return created
+
+
+def bulk_insert_count(model, rows, batch_size):
+    """То же, но объекты не сохраняются — для самых больших таблиц."""
+    total = 0
+    for batch in _batches(rows, batch_size):
+        model.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+def prefix_in_use(prefix):
+    return (User.objects.filter(username__startswith=f"{prefix}_").exists()
+            or Course.objects.filter(slug__startswith=f"{prefix}-").exists())
+
+
+def seed_database(counts, seed=0, prefix="seed", password=None, batch_size=2000, log=None):
+    """Заполняет базу по `counts`; возвращает {"teacher", "student", "director", "course"}.
+
+    password=None — вход паролем невозможен. `log(name, rows, seconds)`
+    вызывается после каждой таблицы.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    today = timezone.localdate()
+    # хэш считается один раз: PBKDF2 на каждого пользователя занял бы часы
+    password = make_password(password)
+    log = log or (lambda name, rows, seconds: None)
+
+    def step(name, insert):
+        started = time.perf_counter()
+        result = insert()
+        log(name, result if isinstance(result, int) else len(result), time.perf_counter() - started)
+        return result
+
+    with transaction.atomic():
+        teachers_n = max(1, math.ceil(counts["groups"] / GROUPS_PER_TEACHER))
+        users = step("users", lambda: bulk_insert(User, (
+            User(username=f"{prefix}_teacher{i}", password=password,
+                 first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES))
+            for i in range(teachers_n)
+        ), batch_size) + bulk_insert(User, (
+            User(username=f"{prefix}_student{i}", password=password,
+                 first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                 date_joined=now - timedelta(days=rng.randrange(730)))
+            for i in range(counts["users"])
+        ), batch_size))
+        teacher_users, students = users[:teachers_n], users[teachers_n:]
+        director, = User.objects.bulk_create(
+            [User(username=f"{prefix}_director", password=password, is_staff=True)]
+        )
+
+        # как create_user_profiles: TeacherProfile у всех, кроме staff
+        teachers = step("teacher profiles", lambda: bulk_insert(
+            TeacherProfile, (TeacherProfile(user=user) for user in users), batch_size
+        ))[:teachers_n]
+        DirectorProfile.objects.create(user=director)
+        step("profiles", lambda: bulk_insert_count(Profile, (
+            *(Profile(user=user, role="teacher") for user in teacher_users),
+            Profile(user=director, role="director"),
+        ), batch_size))
+
+        courses = step("courses", lambda: bulk_insert(Course, (
+            Course(title=f"{rng.choice(WORDS)} {i}", slug=f"{prefix}-course-{i}",
+                   description=" ".join(rng.choices(WORDS, k=60)), level=rng.choice(LEVELS),
+                   price=rng.randrange(0, 50_000, 500))
+            for i in range(counts["courses"])
+        ), batch_size))
+        step("lessons", lambda: bulk_insert_count(Lesson, (
+            Lesson(course=course, title=f"Урок {n + 1}", order=n,
+                   content=" ".join(rng.choices(WORDS, k=200)))
+            for course in courses for n in range(counts["lessons"])
+        ), batch_size))
+
+        per_student = min(counts["enrollments"], len(courses))
+        step("enrollments", lambda: bulk_insert_count(Enrollment, (
+            Enrollment(student=student, course=course,
+                       purchased_at=now - timedelta(minutes=rng.randrange(60 * 24 * 365)))
+            for student in students for course in rng.sample(courses, per_student)
+        ), batch_size))
+        step("certificates", lambda: seed_certificates(
+            courses, counts.get("certificates", 0), batch_size
+        ))
+
+        groups = step("groups", lambda: bulk_insert(StudentGroup, (
+            StudentGroup(name=f"Группа {i + 1}", teacher=teachers[i // GROUPS_PER_TEACHER])
+            for i in range(counts["groups"])
+        ), batch_size))
+        pairs = [
+            (group.pk, student.pk)
+            for group in groups
+            for student in rng.sample(students, min(counts["group_size"], len(students)))
+        ]
+        Membership = StudentGroup.students.through
+        step("group members", lambda: bulk_insert_count(Membership, (
+            Membership(studentgroup_id=g, user_id=s) for g, s in pairs
+        ), batch_size))
+
+        grade_values = {grade: normalize_grade(grade) for grade in GRADES}
+
+        def journal():
+            # (группа, студент) по кругу, дата сдвигается на каждом круге —
+            # ключ (group, date, student) не повторяется
+            for i in range(counts["journal_entries"] if pairs else 0):
+                group_id, student_id = pairs[i % len(pairs)]
+                grade = rng.choice(GRADES)
+                yield JournalEntry(
+                    group_id=group_id, student_id=student_id, grade=grade,
+                    grade_value=grade_values[grade], date=today - timedelta(days=i // len(pairs)),
+                )
+        step("journal entries", lambda: bulk_insert_count(JournalEntry, journal(), batch_size))
+
+        step("course counters", rebuild_course_counters)
+        step("grade stats", lambda: rebuild_grade_stats(batch_size=batch_size) or 0)
+        step("search index", lambda: rebuild_search_index(batch_size=batch_size))
+    bump_list()
+    return {"teacher": teacher_users[0], "student": students[0] if students else None,
+            "director": director, "course": courses[0] if courses else None}
+
+
+def seed_certificates(courses, count, batch_size):
+    """Сертификаты первым `count` записям, поровну по курсам."""
+    if not count or not courses:
+        return 0
+    per_course = math.ceil(count / len(courses))
+    ids = []
+    for course in courses:
+        ids += Enrollment.objects.filter(course=course).order_by("pk").values_list("pk", flat=True)[:per_course]
+    ids = ids[:count]
+    numbers = reserve_numbers(len(ids))
+    for batch in _batches(zip(ids, numbers), batch_size):
+        Certificate.objects.bulk_create(
+            [Certificate(enrollment_id=pk, cert_number=number) for pk, number in batch]
+        )
+    # снимки для публичной проверки, как в issue_certificates: номера блока идут подряд
+    issued = Certificate.objects.filter(cert_number__gte=numbers[0], cert_number__lte=numbers[-1])
+    return build_records(issued, batch_size=batch_size)
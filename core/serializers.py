@@ -1,6 +1,17 @@
 # core/serializers.py
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Prefetch
+from django.urls import reverse
+from django.utils import timezone
+from .analytics import apply_grade_changes
+from .certificates import course_enrollments
+from .covers import srcset_map
+from .grades import grade_state, normalize_grade
+from .transcode import MASTER_PLAYLIST
+from .uploads import current_offset
 from .models import (Course,
                      Lesson,
                      Enrollment,
@@ -10,6 +21,7 @@ from .models import (Course,
                      StudentGroup,
                      JournalEntry,
                      VideoLesson,
+                     VideoUpload,
                      Application)
 
 User = get_user_model()
@@ -23,30 +35,63 @@ class ApplicationSerializer(serializers.ModelSerializer):
         model = Application
         fields = '__all__'
         read_only_fields = ('created_at','user')
-class LessonSerializer(serializers.ModelSerializer):
+class LessonListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Lesson
-        fields = ["id", "title", "order", "video_url", "content"]
+        fields = ["id", "title", "order", "video_url"]
 
-class CourseListSerializer(serializers.ModelSerializer):
-    lessons_count = serializers.IntegerField(source="lessons.count", read_only=True)
+class LessonSerializer(LessonListSerializer):
+    class Meta(LessonListSerializer.Meta):
+        fields = LessonListSerializer.Meta.fields + ["content"]
+
+    def validate_order(self, value):
+        # course в сериализаторе нет, поэтому UniqueTogetherValidator DRF не
+        # добавил — без этой проверки повтор упал бы IntegrityError (500)
+        if self.instance is not None and Lesson.objects.filter(
+            course_id=self.instance.course_id, order=value,
+        ).exclude(pk=self.instance.pk).exists():
+            raise serializers.ValidationError("В курсе уже есть урок с таким номером.")
+        return value
+
+# Списки не тянут тяжёлые TextField (description, content):
+# колонки, которых нет в выдаче, откладываются через defer() в queryplan.
+class CourseSummarySerializer(serializers.ModelSerializer):
+    lessons_count = serializers.IntegerField(read_only=True)
     class Meta:
         model = Course
-        fields = ["id", "title", "slug", "description", "level", "price", "lessons_count", "cover"]
+        fields = ["id", "title", "slug", "level", "price", "lessons_count", "cover"]
+
+class CoverSrcsetField(serializers.Field):
+    """Версии обложки для <picture>: srcset по форматам, src, размеры оригинала."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("source", "cover_renditions")
+        super().__init__(read_only=True, **kwargs)
 
-class CourseDetailSerializer(CourseListSerializer):
-    lessons = LessonSerializer(many=True, read_only=True)
-    class Meta(CourseListSerializer.Meta):
-        fields = CourseListSerializer.Meta.fields + ["lessons"]
+    def to_representation(self, value):
+        return srcset_map(value)
+
+class CourseListSerializer(CourseSummarySerializer):
+    short = serializers.CharField(read_only=True)  # аннотация в CourseViewSet
+    cover_srcset = CoverSrcsetField()
+    class Meta(CourseSummarySerializer.Meta):
+        fields = CourseSummarySerializer.Meta.fields + ["short", "cover_srcset"]
+
+class CourseDetailSerializer(CourseSummarySerializer):
+    lessons = LessonListSerializer(many=True, read_only=True)
+    class Meta(CourseSummarySerializer.Meta):
+        fields = CourseSummarySerializer.Meta.fields + ["description", "lessons"]
+        prefetch_related = [Prefetch("lessons", queryset=Lesson.objects.defer("content"))]
 
 class EnrollmentSerializer(serializers.ModelSerializer):
     student = UserSerializer(read_only=True)
-    course = CourseListSerializer(read_only=True)
+    course = CourseSummarySerializer(read_only=True)
     course_id = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all(), write_only=True, source="course")
     class Meta:
         model = Enrollment
         fields = ["id", "student", "course", "course_id", "active", "purchased_at"]
         read_only_fields = ["id", "student", "course", "purchased_at"]
+        select_related = ["student", "course"]
 
     def create(self, validated_data):
         student = self.context["request"].user
@@ -59,6 +104,36 @@ class CertificateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Certificate
         fields = ["id", "cert_number", "issued_at", "enrollment"]
+        select_related = ["enrollment__student", "enrollment__course"]
+
+class CertificateIssueSerializer(serializers.Serializer):
+    """Пакетная выдача: весь курс (активные записи) или список записей."""
+    course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all(), required=False)
+    # id списком и одна выборка, а не PrimaryKeyRelatedField(many=True) —
+    # тот делает по запросу на каждую запись
+    enrollments = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+
+    def validate_enrollments(self, value):
+        ids = set(value)
+        found = set(Enrollment.objects.filter(pk__in=ids).values_list("pk", flat=True))
+        if ids - found:
+            raise serializers.ValidationError(
+                f"Записи не найдены: {', '.join(map(str, sorted(ids - found)))}"
+            )
+        return sorted(ids)
+
+    def validate(self, attrs):
+        if ("course" in attrs) == ("enrollments" in attrs):
+            raise serializers.ValidationError("Укажите либо course, либо enrollments.")
+        return attrs
+
+    def get_enrollments(self):
+        if "course" in self.validated_data:
+            return course_enrollments(self.validated_data["course"])
+        return Enrollment.objects.filter(pk__in=self.validated_data["enrollments"])
+
 class TeacherProfileSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.PrimaryKeyRelatedField(
@@ -70,6 +145,7 @@ class TeacherProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = TeacherProfile
         fields = ['id','user','user_id','bio','phone']
+        select_related = ['user']
 
 class DirectorProfileSerializer(serializers.ModelSerializer):
     class Meta:
@@ -101,6 +177,8 @@ class StudentGroupSerializer(serializers.ModelSerializer):
     class Meta:
         model = StudentGroup
         fields = ['id','name','teacher','teacher_id','students','student_ids','student_ids_read']
+        select_related = ['teacher__user']
+        prefetch_related = ['students']
 
 class JournalEntrySerializer(serializers.ModelSerializer):
     student = serializers.StringRelatedField()
@@ -110,9 +188,120 @@ class JournalEntrySerializer(serializers.ModelSerializer):
     class Meta:
         model = JournalEntry
         fields = ['id','student','group','group_id','group_teacher_id','date','grade','comment']
+        read_only_fields = ['date']
+        select_related = ['student', 'group__teacher__user']
+
+
+class JournalBulkRowSerializer(serializers.Serializer):
+    student_id = serializers.IntegerField()
+    grade = serializers.CharField(max_length=5)
+    comment = serializers.CharField(required=False, allow_blank=True, default="")
+
+
+class JournalBulkSerializer(serializers.Serializer):
+    """Оценки всей группы за один день: один запрос, одна транзакция.
+
+    Пара (student, group, date) — ключ: существующая запись обновляется,
+    новая создаётся. Группы ограничены context["groups"].
+    """
+    group_id = serializers.PrimaryKeyRelatedField(queryset=StudentGroup.objects.none(), source="group")
+    date = serializers.DateField(default=timezone.localdate)
+    entries = JournalBulkRowSerializer(many=True, allow_empty=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if "groups" in self.context:
+            self.fields["group_id"].queryset = self.context["groups"]
+
+    def validate(self, attrs):
+        ids = [row["student_id"] for row in attrs["entries"]]
+        members = set(attrs["group"].students.filter(pk__in=ids).values_list("pk", flat=True))
+        seen = set()
+        errors = []
+        for student_id in ids:
+            if student_id in seen:
+                errors.append({"student_id": ["Студент указан дважды."]})
+            elif student_id not in members:
+                errors.append({"student_id": ["Студент не состоит в группе."]})
+            else:
+                errors.append({})
+            seen.add(student_id)
+        if any(errors):
+            raise serializers.ValidationError({"entries": errors})
+        return attrs
+
+    def create(self, validated_data):
+        group, date = validated_data["group"], validated_data["date"]
+        rows = validated_data["entries"]
+        # bulk_create/bulk_update не шлют сигналы — сводки обновляем сами
+        changes = []
+        with transaction.atomic():
+            existing = {
+                entry.student_id: entry
+                for entry in JournalEntry.objects.select_for_update().filter(
+                    group=group, date=date, student_id__in=[row["student_id"] for row in rows]
+                )
+            }
+            to_create, to_update, results = [], [], []
+            for row in rows:
+                entry = existing.get(row["student_id"])
+                if entry is None:
+                    entry = JournalEntry(
+                        student_id=row["student_id"], group=group, date=date,
+                        grade=row["grade"], grade_value=normalize_grade(row["grade"]),
+                        comment=row["comment"],
+                    )
+                    to_create.append(entry)
+                    changes.append((None, grade_state(entry)))
+                    results.append((entry, "created"))
+                elif (entry.grade, entry.comment) != (row["grade"], row["comment"]):
+                    old_state = grade_state(entry)
+                    entry.grade, entry.comment = row["grade"], row["comment"]
+                    entry.grade_value = normalize_grade(row["grade"])
+                    to_update.append(entry)
+                    changes.append((old_state, grade_state(entry)))
+                    results.append((entry, "updated"))
+                else:
+                    results.append((entry, "unchanged"))
+            JournalEntry.objects.bulk_create(to_create)
+            JournalEntry.objects.bulk_update(to_update, ["grade", "grade_value", "comment"])
+            apply_grade_changes(changes)
+        return [
+            {"id": entry.pk, "student_id": entry.student_id, "grade": entry.grade, "status": status}
+            for entry, status in results
+        ]
 
 class VideoLessonSerializer(serializers.ModelSerializer):
     teacher = TeacherProfileSerializer(read_only=True)
+    stream_url = serializers.HyperlinkedIdentityField(view_name="videolesson-stream")
+    hls_url = serializers.SerializerMethodField()
     class Meta:
         model = VideoLesson
-        fields = ['id','course','title','video_file','created_at','teacher']
\ No newline at end of file
+        fields = ['id','course','title','video_file','stream_url','hls_status','hls_url',
+                  'poster','created_at','teacher']
+        read_only_fields = ['hls_status','poster']
+        select_related = ['teacher__user']
+
+    def get_hls_url(self, obj):
+        # адаптивный плейлист появляется только когда готовы все версии
+        if obj.hls_status != 'ready':
+            return None
+        url = reverse("videolesson-hls", kwargs={"pk": obj.pk, "name": MASTER_PLAYLIST})
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+class VideoUploadSerializer(serializers.ModelSerializer):
+    offset = serializers.SerializerMethodField()
+    sha256 = serializers.RegexField(r"^[0-9a-fA-F]{64}$")
+
+    class Meta:
+        model = VideoUpload
+        fields = ['id','course','title','filename','size','sha256','offset','created_at']
+
+    def get_offset(self, obj):
+        return current_offset(obj)
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.VIDEO_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError("Недопустимый размер файла.")
+        return value
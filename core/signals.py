@@ -1,12 +1,303 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import TeacherProfile, DirectorProfile
+from .models import (
+    Profile, TeacherProfile, DirectorProfile, Course, Lesson, Enrollment, JournalEntry, VideoLesson,
+    Application, Certificate,
+)
+from .analytics import apply_grade_changes
+from .auth import revoke_user_tokens
+from .catalogue_cache import bump_course, bump_course_by_id, forget_course
+from .certificates import build_records, forget_certificate
+from .counters import adjust_lessons_count, adjust_active_enrollments_count
+from .grades import grade_state
+from .search import index_course, index_lesson, unindex
+from .tasks import enqueue
 
+# Профиль создаётся синхронно, а не через очередь: это один INSERT, а
+# первый же запрос нового пользователя проверяет teacher_profile.
 @receiver(post_save, sender=User)
 def create_user_profiles(sender, instance, created, **kwargs):
     if created:
+        # у нового пользователя ещё нет токенов — отзывать нечего
         if instance.is_staff:
-            DirectorProfile.objects.create(user=instance)  # директор
+            profile = DirectorProfile(user=instance)  # директор
         else:
-            TeacherProfile.objects.create(user=instance)  # учитель
+            profile = TeacherProfile(user=instance)  # учитель
+        profile._new_user = True
+        profile.save()
+
+
+# =========================
+# ОТЗЫВ JWT ПРИ СМЕНЕ ПРАВ
+# =========================
+# Роль, is_staff и id профилей зашиты в токен (core/auth.py), поэтому
+# после их смены уже выданные токены пользователя отзываются. Старые
+# значения берутся из базы в pre_save: правка email или bio токены не трогает.
+
+ACCESS_FIELDS = ("username", "is_staff", "is_superuser", "is_active")
+
+
+@receiver(pre_save, sender=User)
+def load_user_access_state(sender, instance, update_fields=None, **kwargs):
+    # update_last_login() при входе сохраняет только last_login
+    if instance._state.adding or (update_fields is not None and not set(ACCESS_FIELDS) & set(update_fields)):
+        return
+    instance._access_state = User.objects.filter(pk=instance.pk).values_list(*ACCESS_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_user_change(sender, instance, created, **kwargs):
+    stored = instance.__dict__.pop("_access_state", None)
+    if stored is not None and stored != tuple(getattr(instance, field) for field in ACCESS_FIELDS):
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_on_user_delete(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk)
+
+
+@receiver(pre_save, sender=Profile)
+def load_profile_role(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or (update_fields is not None and "role" not in update_fields):
+        return
+    instance._stored_role = Profile.objects.filter(pk=instance.pk).values_list("role", flat=True).first()
+
+
+@receiver(post_save, sender=Profile)
+def revoke_tokens_on_role_change(sender, instance, created, **kwargs):
+    stored = instance.__dict__.pop("_stored_role", None)
+    if stored is not None and stored != instance.role:
+        revoke_user_tokens(instance.user_id)
+
+
+# появление или удаление профиля меняет *_profile_id в токене
+@receiver([post_save, post_delete], sender=Profile)
+@receiver([post_save, post_delete], sender=TeacherProfile)
+@receiver([post_save, post_delete], sender=DirectorProfile)
+def revoke_tokens_on_profile_change(sender, instance, created=None, **kwargs):
+    # created=None — это post_delete
+    if created is not False and not getattr(instance, "_new_user", False):
+        revoke_user_tokens(instance.user_id)
+
+
+# =========================
+# СЧЁТЧИКИ КУРСА
+# =========================
+
+@receiver(pre_save, sender=Lesson)
+def load_lesson_counted_course(sender, instance, **kwargs):
+    if not instance._state.adding and not hasattr(instance, "_counted_course_id"):
+        instance._counted_course_id = (
+            Lesson.objects.filter(pk=instance.pk).values_list("course_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Lesson)
+def count_saved_lesson(sender, instance, created, **kwargs):
+    old_course_id = None if created else instance._counted_course_id
+    if old_course_id != instance.course_id:
+        # урок перенесли в другой курс (в админке) — версию старого курса
+        # поднимает bump_lesson_course_version
+        if old_course_id is not None:
+            adjust_lessons_count(old_course_id, -1)
+            instance._moved_from_course_id = old_course_id
+        adjust_lessons_count(instance.course_id, 1)
+    instance.remember_counted_course()
+
+
+@receiver(post_delete, sender=Lesson)
+def count_deleted_lesson(sender, instance, **kwargs):
+    adjust_lessons_count(getattr(instance, "_counted_course_id", instance.course_id), -1)
+
+
+@receiver(pre_save, sender=Enrollment)
+def load_enrollment_counted_state(sender, instance, **kwargs):
+    # экземпляр собран вручную, а не загружен из БД — берём состояние из базы
+    if not instance._state.adding and not hasattr(instance, "_counted_state"):
+        instance._counted_state = (
+            Enrollment.objects.filter(pk=instance.pk).values_list("course_id", "active").first()
+            or (None, False)
+        )
+
+
+@receiver(post_save, sender=Enrollment)
+def count_saved_enrollment(sender, instance, created, **kwargs):
+    old_course_id, old_active = (None, False) if created else instance._counted_state
+    if old_active and (old_course_id != instance.course_id or not instance.active):
+        adjust_active_enrollments_count(old_course_id, -1)
+    if instance.active and (old_course_id != instance.course_id or not old_active):
+        adjust_active_enrollments_count(instance.course_id, 1)
+    instance.remember_counted_state()
+
+
+@receiver(post_delete, sender=Enrollment)
+def count_deleted_enrollment(sender, instance, **kwargs):
+    course_id, active = getattr(instance, "_counted_state", (instance.course_id, instance.active))
+    if active:
+        adjust_active_enrollments_count(course_id, -1)
+
+
+# =========================
+# СВОДКИ ПО ОЦЕНКАМ
+# =========================
+
+@receiver(pre_save, sender=JournalEntry)
+def load_journal_graded_state(sender, instance, **kwargs):
+    if not instance._state.adding and not hasattr(instance, "_graded_state"):
+        stored = JournalEntry.objects.filter(pk=instance.pk).first()
+        instance._graded_state = stored._graded_state if stored else None
+
+
+@receiver(post_save, sender=JournalEntry)
+def update_grade_stats(sender, instance, created, **kwargs):
+    old = None if created else instance._graded_state
+    apply_grade_changes([(old, grade_state(instance))])
+    instance.remember_graded_state()
+
+
+@receiver(post_delete, sender=JournalEntry)
+def remove_from_grade_stats(sender, instance, origin=None, **kwargs):
+    # при удалении группы её сводки уходят тем же каскадом, при удалении
+    # студента групповые сводки правит remove_student_grades
+    origin_model = getattr(origin, "model", type(origin))
+    if origin is not None and origin_model is not JournalEntry:
+        return
+    old = getattr(instance, "_graded_state", grade_state(instance))
+    apply_grade_changes([(old, None)])
+
+
+@receiver(pre_delete, sender=User)
+def remove_student_grades(sender, instance, **kwargs):
+    # StudentGradeStat студента удалит каскад, а из GroupGradeStat его
+    # оценки нужно вычесть; сигнал идёт в транзакции удаления
+    entries = JournalEntry.objects.filter(student=instance, grade_value__isnull=False)
+    apply_grade_changes([
+        (grade_state(entry), None)
+        for entry in entries.only("group_id", "student_id", "date", "grade_value")
+    ])
+
+
+# =========================
+# ИНВАЛИДАЦИЯ КЭША КАТАЛОГА
+# =========================
+# Версию поднимаем только после коммита, иначе параллельный запрос успеет
+# закэшировать под новой версией ещё старые данные. При смене slug и
+# удалении версия старого адреса стирается — иначе он отдавал бы курс из кэша.
+
+@receiver(pre_save, sender=Course)
+def load_stored_slug(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or (update_fields is not None and "slug" not in update_fields):
+        return
+    instance._stored_slug = Course.objects.filter(pk=instance.pk).values_list("slug", flat=True).first()
+
+
+@receiver(post_save, sender=Course)
+def bump_course_version(sender, instance, **kwargs):
+    slug, stored = instance.slug, instance.__dict__.pop("_stored_slug", None)
+
+    def bump():
+        bump_course(slug)
+        if stored not in (None, slug):
+            forget_course(stored)
+
+    transaction.on_commit(bump)
+
+
+@receiver(post_delete, sender=Course)
+def forget_course_version(sender, instance, **kwargs):
+    slug = instance.slug
+    transaction.on_commit(lambda: forget_course(slug))
+
+
+@receiver([post_save, post_delete], sender=Lesson)
+def bump_lesson_course_version(sender, instance, **kwargs):
+    course_ids = {instance.course_id, instance.__dict__.pop("_moved_from_course_id", None)} - {None}
+
+    def bump():
+        for course_id in course_ids:
+            bump_course_by_id(course_id)
+
+    transaction.on_commit(bump)
+
+
+# =========================
+# ВЕРСИИ ОБЛОЖКИ
+# =========================
+# cover_renditions пишет только задача render_cover через update(), так что
+# у загруженного раньше экземпляра значение может устареть — перед
+# сохранением берём его из базы, иначе save() затёр бы готовые версии.
+
+@receiver(pre_save, sender=Course)
+def load_cover_renditions(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or update_fields is not None:
+        return
+    stored = Course.objects.filter(pk=instance.pk).values_list("cover_renditions", flat=True).first()
+    if stored is not None:
+        instance.cover_renditions = stored
+
+
+@receiver(post_save, sender=Course)
+def schedule_cover_renditions(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "cover" not in update_fields:
+        return
+    source = instance.cover.name or ""
+    if instance.cover_renditions.get("source", "") != source:
+        enqueue("render_cover", key=f"render_cover:{instance.pk}:{source}",
+                course_id=instance.pk, source=source)
+
+
+# =========================
+# ПОИСКОВЫЙ ИНДЕКС
+# =========================
+# В той же транзакции, что и изменение: найденный курс всегда существует.
+# Строки уроков удалённого курса уходят каскадом по SearchEntry.course.
+
+@receiver(post_save, sender=Course)
+def index_saved_course(sender, instance, **kwargs):
+    index_course(instance)
+
+
+@receiver(post_save, sender=Lesson)
+def index_saved_lesson(sender, instance, **kwargs):
+    index_lesson(instance)
+
+
+@receiver(post_delete, sender=Lesson)
+def unindex_deleted_lesson(sender, instance, **kwargs):
+    unindex("lesson", instance.pk)
+
+
+# =========================
+# ПРОВЕРКА СЕРТИФИКАТОВ
+# =========================
+# issue_certificates() создаёт записи проверки сам — bulk_create сигналов не шлёт.
+
+@receiver(post_save, sender=Certificate)
+def create_certificate_record(sender, instance, created, **kwargs):
+    if created:
+        build_records(Certificate.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Certificate)
+def forget_deleted_certificate(sender, instance, **kwargs):
+    number = instance.cert_number
+    transaction.on_commit(lambda: forget_certificate(number))
+
+
+# =========================
+# ФОНОВЫЕ ЗАДАЧИ
+# =========================
+
+@receiver(post_save, sender=VideoLesson)
+def schedule_transcoding(sender, instance, created, **kwargs):
+    if created and instance.video_file:
+        enqueue("transcode_video", key=f"transcode_video:{instance.pk}", video_id=instance.pk)
+
+
+@receiver(post_save, sender=Application)
+def schedule_application_notification(sender, instance, created, **kwargs):
+    if created:
+        enqueue("notify_application", key=f"notify_application:{instance.pk}", application_id=instance.pk)
@@ -1,50 +1,91 @@
-document.addEventListener("DOMContentLoaded", function() {
-  // ====== VARIABLES ======
-  let currentEntity = "users";
-  let data = [];
-  const tableHead = document.getElementById("table-head");
-  const tableBody = document.getElementById("table-body");
-  const modal = document.getElementById("modal");
-  const modalTitle = document.getElementById("modal-title");
-  const modalContent = document.getElementById("modal-content");
-  const searchInput = document.getElementById("search-input");
-  const addBtn = document.getElementById("add-btn");
-  const saveBtn = document.getElementById("save-btn");
-  const cancelBtn = document.getElementById("cancel-btn");
-
-  // ====== MENU ======
-  document.querySelectorAll(".admin-menu-item").forEach(btn => {
-    btn.addEventListener("click", () => {
-      currentEntity = btn.dataset.entity;
-      document.getElementById("admin-title").innerText = btn.innerText;
-      fetchData();
-    });
-  });
+// ===== SIDEBAR =====
+const sidebarToggle = document.getElementById('sidebar-toggle');
+const sidebarMenu = document.getElementById('sidebar-menu');
+
+// ===== GLOBAL VARIABLES =====
+let currentEntity = "users";
+let data = [];
+let nextUrl = null;
+const tableHead = document.getElementById("table-head");
+const tableBody = document.getElementById("table-body");
+const modal = document.getElementById("modal");
+const modalTitle = document.getElementById("modal-title");
+const modalContent = document.getElementById("modal-content");
+const searchInput = document.getElementById("search-input");
+const loadMoreBtn = document.getElementById("load-more");
+const adminLoginForm = document.getElementById('admin-login');
+const adminContent = document.querySelector('main'); // контент до логина скрываем
+
+// ===== SIDEBAR TOGGLE =====
+sidebarToggle?.addEventListener('click', ()=> sidebarMenu.classList.toggle('hidden'));
+
+// ===== TOKEN CHECK =====
+function getToken() { return localStorage.getItem('admin_token'); }
+function isLoggedIn() { return !!getToken(); }
+
+// ===== LOGIN =====
+async function adminLogin(){
+    const username = document.getElementById('admin-username').value;
+    const password = document.getElementById('admin-password').value;
+    try {
+        const res = await fetch('/api/token/', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ username, password })
+        });
+        if(res.ok){
+            const data = await res.json();
+            localStorage.setItem('admin_token', data.access);
+            adminLoginForm.style.display = 'none';
+            adminContent.style.display = 'block';
+            setupMenuClicks();
+            fetchData();
+        } else alert('Ошибка входа!');
+    } catch(e) { console.error(e); alert('Ошибка сети!'); }
+}
+
+// ===== API URL =====
+function getApiUrl(entity){
+    const adminEntities = ['users','applications'];
+    if(adminEntities.includes(entity)) return `/api/admin/${entity}/`;
+    return `/api/${entity}/`;
+}
 
-  // ====== FETCH DATA ======
-  async function fetchData() {
+// ===== FETCH DATA =====
+// списки приходят страницами: {results, next}; "Загрузить ещё" идёт по next
+async function fetchData(more=false){
+    if(!isLoggedIn()) return;
+    const url = more ? nextUrl : getApiUrl(currentEntity);
+    if(!url) return;
     try {
-      const res = await fetch(`/api/admin/${currentEntity}/`, {
-        headers: { 'Authorization': `Bearer ${localStorage.getItem('admin_token')}` }
-      });
-      data = await res.json();
-      renderTable();
+        const res = await fetch(url, {
+            headers: { 'Authorization': `Bearer ${getToken()}` }
+        });
+        if(res.ok){
+            const page = await res.json();
+            data = more ? data.concat(page.results) : page.results;
+            nextUrl = page.next;
+            loadMoreBtn.classList.toggle('hidden', !nextUrl);
+            renderTable();
+        }
     } catch(e){ console.error(e); }
-  }
+}
+
+loadMoreBtn.addEventListener('click', ()=>fetchData(true));
 
-  // ====== RENDER TABLE ======
-  function renderTable() {
+// ===== RENDER TABLE =====
+function renderTable(){
     tableHead.innerHTML = "";
     tableBody.innerHTML = "";
-    if(data.length === 0) return tableHead.innerHTML = "<th>Нет данных</th>";
+    if(data.length===0){ tableHead.innerHTML="<th class='px-4 py-2'>Нет данных</th>"; return; }
 
     const keys = Object.keys(data[0]);
     const trHead = document.createElement("tr");
     keys.forEach(k=>{
-      const th = document.createElement("th");
-      th.innerText = k.charAt(0).toUpperCase()+k.slice(1);
-      th.className = "px-4 py-2 text-left";
-      trHead.appendChild(th);
+        const th = document.createElement("th");
+        th.innerText = k.charAt(0).toUpperCase() + k.slice(1);
+        th.className = "px-4 py-2 text-left";
+        trHead.appendChild(th);
     });
     const thAction = document.createElement("th");
     thAction.innerText = "Действия";
@@ -53,125 +94,121 @@ document.addEventListener("DOMContentLoaded", function() {
     tableHead.appendChild(trHead);
 
     data.forEach(item=>{
-      const tr = document.createElement("tr");
-      keys.forEach(k=>{
-        const td = document.createElement("td");
-        td.innerText = item[k];
-        td.className = "px-4 py-2";
-        tr.appendChild(td);
-      });
-      const tdAction = document.createElement("td");
-      tdAction.className = "px-4 py-2 flex gap-2";
-      const editBtn = document.createElement("button");
-      editBtn.innerText = "Редактировать";
-      editBtn.className = "bg-yellow-500 hover:bg-yellow-600 text-white px-2 py-1 rounded text-xs";
-      editBtn.onclick = ()=> openEditModal(item);
-      const delBtn = document.createElement("button");
-      delBtn.innerText = "Удалить";
-      delBtn.className = "bg-red-500 hover:bg-red-600 text-white px-2 py-1 rounded text-xs";
-      delBtn.onclick = ()=> deleteItem(item.id);
-      tdAction.appendChild(editBtn);
-      tdAction.appendChild(delBtn);
-      tr.appendChild(tdAction);
-      tableBody.appendChild(tr);
+        const tr = document.createElement("tr");
+        keys.forEach(k=>{
+            const td = document.createElement("td");
+            td.innerText = item[k];
+            td.className = "px-4 py-2";
+            tr.appendChild(td);
+        });
+        const tdAction = document.createElement("td");
+        tdAction.className = "px-4 py-2 flex gap-2";
+        const editBtn = document.createElement("button");
+        editBtn.innerText = "Редактировать";
+        editBtn.className = "bg-yellow-500 hover:bg-yellow-600 text-white px-2 py-1 rounded text-xs";
+        editBtn.onclick = ()=> openEditModal(item);
+        const delBtn = document.createElement("button");
+        delBtn.innerText = "Удалить";
+        delBtn.className = "bg-red-500 hover:bg-red-600 text-white px-2 py-1 rounded text-xs";
+        delBtn.onclick = ()=> deleteItem(item.id);
+        tdAction.appendChild(editBtn);
+        tdAction.appendChild(delBtn);
+        tr.appendChild(tdAction);
+        tableBody.appendChild(tr);
     });
-  }
-
-  // ====== MODAL ======
-  window.openAddModal = function() {
-    modalTitle.innerText = `Добавить ${currentEntity}`;
-    modalContent.innerHTML = generateForm({});
-    modal.classList.remove("hidden");
-  };
-
-  window.openEditModal = function(item) {
-    modalTitle.innerText = `Редактировать ${currentEntity}`;
-    modalContent.innerHTML = generateForm(item);
-    modal.classList.remove("hidden");
-  };
-
-  window.closeModal = function() {
-    modal.classList.add("hidden");
-  };
-
-  cancelBtn.addEventListener("click", closeModal);
-
-  // ====== FORM GENERATOR ======
-  function generateForm(item){
-    let html = '';
+}
+
+// ===== MODAL / FORM =====
+function openAddModal(){ modalTitle.innerText=`Добавить ${currentEntity}`; modalContent.innerHTML=generateForm({}); modal.classList.remove("hidden"); }
+function openEditModal(item){ modalTitle.innerText=`Редактировать ${currentEntity}`; modalContent.innerHTML=generateForm(item); modal.classList.remove("hidden"); }
+function closeModal(){ modal.classList.add("hidden"); }
+function generateForm(item){
+    let html='';
     for(const key in item){
-      html += `<label class="block text-sm">${key}<input class="w-full bg-slate-800 border border-slate-700 px-2 py-1 rounded mt-1 mb-2" name="${key}" value="${item[key]||''}"/></label>`;
+        html += `<div><label class="block text-sm text-slate-200">${key}</label><input type="text" name="${key}" value="${item[key]}" class="w-full px-2 py-1 rounded bg-slate-800 border border-slate-700 text-white"></div>`;
     }
     if(Object.keys(item).length===0){
-      html += `<label class="block text-sm">Название<input class="w-full bg-slate-800 border border-slate-700 px-2 py-1 rounded mt-1 mb-2" name="name"/></label>`;
+        html += `<div><label class="block text-sm text-slate-200">Название</label><input type="text" name="name" value="" class="w-full px-2 py-1 rounded bg-slate-800 border border-slate-700 text-white"></div>`;
     }
     return html;
-  }
-
-  // ====== SAVE ======
-  window.saveEntity = async function() {
-    const inputs = modalContent.querySelectorAll("input, select");
-    let body = {};
-    inputs.forEach(i=> body[i.name]=i.value);
-    let method = body.id ? "PUT" : "POST";
-    let url = `/api/admin/${currentEntity}/${body.id ? body.id+'/' : ''}`;
+}
+
+// ===== SAVE / DELETE =====
+async function saveEntity(){
+    const inputs = modalContent.querySelectorAll("input");
+    let body={};
+    inputs.forEach(i=>body[i.name]=i.value);
+    const method = body.id?"PUT":"POST";
+    const url = getApiUrl(currentEntity)+(body.id?body.id+"/":"");
     try{
-      const res = await fetch(url,{
-        method,
-        headers:{
-          "Content-Type":"application/json",
-          "Authorization": `Bearer ${localStorage.getItem('admin_token')}`
-        },
-        body: JSON.stringify(body)
-      });
-      if(res.ok){ closeModal(); fetchData(); }
-      else alert("Ошибка сохранения");
-    }catch(e){ console.error(e); }
-  };
-
-  // ====== DELETE ======
-  async function deleteItem(id){
+        const res = await fetch(url,{
+            method: method,
+            headers: { "Content-Type":"application/json", "Authorization": `Bearer ${getToken()}` },
+            body: JSON.stringify(body)
+        });
+        if(res.ok){ closeModal(); fetchData(); } else alert("Ошибка сохранения");
+    } catch(e){ console.error(e); }
+}
+
+async function deleteItem(id){
     if(!confirm("Удалить запись?")) return;
     try{
-      const res = await fetch(`/api/admin/${currentEntity}/${id}/`,{
-        method:"DELETE",
-        headers:{ "Authorization": `Bearer ${localStorage.getItem('admin_token')}` }
-      });
-      if(res.ok) fetchData();
-    }catch(e){ console.error(e); }
-  }
-
-  // ====== SEARCH ======
-  searchInput?.addEventListener("input", ()=>{
+        const res = await fetch(getApiUrl(currentEntity)+id+"/",{
+            method:"DELETE",
+            headers:{ "Authorization": `Bearer ${getToken()}` }
+        });
+        if(res.ok) fetchData();
+    } catch(e){ console.error(e); }
+}
+
+// ===== SEARCH =====
+searchInput?.addEventListener("input", ()=>{
     const q = searchInput.value.toLowerCase();
     const filtered = data.filter(d=>Object.values(d).some(v=>v.toString().toLowerCase().includes(q)));
-    tableBody.innerHTML = "";
+    tableBody.innerHTML="";
     filtered.forEach(item=>{
-      const keys = Object.keys(item);
-      const tr = document.createElement("tr");
-      keys.forEach(k=>{
-        const td = document.createElement("td");
-        td.innerText = item[k];
-        td.className = "px-4 py-2";
-        tr.appendChild(td);
-      });
-      const tdAction = document.createElement("td");
-      tdAction.className = "px-4 py-2 flex gap-2";
-      const editBtn = document.createElement("button");
-      editBtn.innerText = "Редактировать";
-      editBtn.className = "bg-yellow-500 hover:bg-yellow-600 text-white px-2 py-1 rounded text-xs";
-      editBtn.onclick = ()=> openEditModal(item);
-      const delBtn = document.createElement("button");
-      delBtn.innerText = "Удалить";
-      delBtn.className = "bg-red-500 hover:bg-red-600 text-white px-2 py-1 rounded text-xs";
-      delBtn.onclick = ()=> deleteItem(item.id);
-      tdAction.appendChild(editBtn);
-      tdAction.appendChild(delBtn);
-      tr.appendChild(tdAction);
-      tableBody.appendChild(tr);
+        const tr=document.createElement("tr");
+        Object.keys(item).forEach(k=>{
+            const td=document.createElement("td");
+            td.innerText=item[k];
+            td.className="px-4 py-2";
+            tr.appendChild(td);
+        });
+        const tdAction=document.createElement("td");
+        tdAction.className="px-4 py-2 flex gap-2";
+        const editBtn=document.createElement("button");
+        editBtn.innerText="Редактировать";
+        editBtn.className="bg-yellow-500 hover:bg-yellow-600 text-white px-2 py-1 rounded text-xs";
+        editBtn.onclick=()=>openEditModal(item);
+        const delBtn=document.createElement("button");
+        delBtn.innerText="Удалить";
+        delBtn.className="bg-red-500 hover:bg-red-600 text-white px-2 py-1 rounded text-xs";
+        delBtn.onclick=()=>deleteItem(item.id);
+        tdAction.appendChild(editBtn);
+        tdAction.appendChild(delBtn);
+        tr.appendChild(tdAction);
+        tableBody.appendChild(tr);
     });
-  });
-
-  // ====== INITIAL LOAD ======
-  fetchData();
 });
+
+// ===== MENU CLICK AFTER LOGIN =====
+function setupMenuClicks(){
+    document.querySelectorAll(".admin-menu-item").forEach(btn=>{
+        btn.addEventListener("click", ()=>{
+            currentEntity = btn.dataset.entity;
+            document.getElementById("admin-title").innerText = btn.innerText;
+            fetchData();
+            if(window.innerWidth < 768) sidebarMenu.classList.add("hidden");
+        });
+    });
+}
+
+// ===== INITIAL LOAD =====
+if(isLoggedIn()){
+    adminLoginForm.style.display='none';
+    adminContent.style.display='block';
+    setupMenuClicks();
+    fetchData();
+}else{
+    adminContent.style.display='none';
+}
@@ -0,0 +1,65 @@
+  const html = document.documentElement;
+  const themeBtn = document.getElementById('theme-toggle');
+  const themeIcon = document.getElementById('theme-icon');
+  const themeBtnMobile = document.getElementById('theme-toggle-mobile');
+  const themeIconMobile = document.getElementById('theme-icon-mobile');
+  const menuBtn = document.getElementById('menu-toggle');
+  const mobileMenu = document.getElementById('mobile-menu');
+const localeSelectDesktop = document.querySelector('select[name="lang"]');
+const localeSelectMobile = document.getElementById('lang-mobile');
+
+  const savedTheme = localStorage.getItem('theme');
+
+  function setSunIcon(svg){
+    svg.innerHTML='<path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 3v1m0 16v1m8.66-12.34l-.707.707M4.05 19.95l-.707.707M21 12h-1M4 12H3m16.66 4.66l-.707-.707M4.05 4.05l-.707-.707M12 5a7 7 0 100 14 7 7 0 000-14z"/>';
+    svg.classList.remove('text-gray-300');
+    svg.classList.add('text-yellow-400');
+  }
+  function setMoonIcon(svg){
+    svg.innerHTML='<path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M21 12.79A9 9 0 1111.21 3a7 7 0 009.79 9.79z"/>';
+    svg.classList.remove('text-yellow-400');
+    svg.classList.add('text-gray-300');
+  }
+
+  if(savedTheme === 'dark'){
+    html.classList.add('dark');
+    setMoonIcon(themeIcon);
+    setMoonIcon(themeIconMobile);
+  } else {
+    setSunIcon(themeIcon);
+    setSunIcon(themeIconMobile);
+  }
+
+  function toggleTheme(svgD, svgM){
+    html.classList.toggle('dark');
+    const isDark = html.classList.contains('dark');
+    localStorage.setItem('theme', isDark ? 'dark' : 'light');
+    svgD.classList.add('rotate-180');
+    svgM.classList.add('rotate-180');
+    setTimeout(()=>{
+      svgD.classList.remove('rotate-180');
+      svgM.classList.remove('rotate-180');
+    }, 500);
+    if(isDark){ setMoonIcon(svgD); setMoonIcon(svgM); } else { setSunIcon(svgD); setSunIcon(svgM); }
+  }
+
+  themeBtn.addEventListener('click', ()=>toggleTheme(themeIcon, themeIconMobile));
+  themeBtnMobile.addEventListener('click', ()=>toggleTheme(themeIcon, themeIconMobile));
+  menuBtn.addEventListener('click', ()=>{
+    mobileMenu.classList.toggle('hidden');
+  });
+
+  // сохраняем выбранный язык в query-параметре ?lang=
+  function handleLocaleChange(select){
+    const lang = select.value;
+    const url = new URL(window.location.href);
+    url.searchParams.set('lang', lang);
+    window.location.href = url.toString();
+  }
+
+  if(localeSelectDesktop){
+    localeSelectDesktop.addEventListener('change', ()=>handleLocaleChange(localeSelectDesktop));
+  }
+  if(localeSelectMobile){
+    localeSelectMobile.addEventListener('change', ()=>handleLocaleChange(localeSelectMobile));
+  }
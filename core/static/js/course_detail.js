@@ -0,0 +1,12 @@
+// страница курса отрисована сервером, здесь только запись на курс
+const enrollBtn = document.getElementById('enroll');
+enrollBtn.onclick = async () => {
+  const token = localStorage.getItem('access');
+  const resp = await fetch('/api/enrollments/', {
+    method:'POST',
+    headers:{'Content-Type':'application/json', 'Authorization': token?`Bearer ${token}`:''},
+    body: JSON.stringify({course_id: Number(enrollBtn.dataset.courseId)})
+  });
+  if(resp.ok) alert('Вы записаны!');
+  else alert('Ошибка: ' + (await resp.text()));
+}
@@ -0,0 +1,118 @@
+const moreBtn = document.getElementById('courses-more');
+const levelSelect = document.getElementById('filter-level');
+const priceSelect = document.getElementById('filter-price');
+const orderingSelect = document.getElementById('filter-ordering');
+// первая страница отрисована сервером, дальше — JSON API
+let nextUrl = document.getElementById('courses').dataset.next || null;
+
+function catalogueParams(){
+  const params = new URLSearchParams({ordering: orderingSelect.value});
+  if (levelSelect.value) params.set('level', levelSelect.value);
+  if (priceSelect.value) {
+    const [min, max] = priceSelect.value.split('|');
+    params.set('price_min', min);
+    if (max) params.set('price_max', max);
+  }
+  return params;
+}
+
+// фасеты приходят только с первой страницей: счётчики в подписях фильтров
+function renderFacets(facets){
+  const fill = (select, options) => {
+    const value = select.value;
+    select.length = 1;
+    options.forEach(([val, label]) => select.add(new Option(label, val)));
+    select.value = value;
+  };
+  fill(levelSelect, facets.level.map(f => [f.value, `${f.label} (${f.count})`]));
+  fill(priceSelect, facets.price.map(f => [`${f.min}|${f.max || ''}`, `${f.label} (${f.count})`]));
+}
+
+function reloadCourses(){
+  const params = catalogueParams();
+  // адрес страницы повторяет фильтры: после перезагрузки сервер отрисует то же
+  history.replaceState(null, '', `${location.pathname}?${params}`);
+  document.getElementById('courses').innerHTML = '';
+  nextUrl = `/api/courses/?${params}`;
+  loadCourses();
+}
+[levelSelect, priceSelect, orderingSelect].forEach(s => s.addEventListener('change', reloadCourses));
+
+// версии обложки (core/covers.py): браузер сам выберет ширину и формат
+function coverPicture(c){
+  const s = c.cover_srcset;
+  if (!s) return '';
+  const sizes = '(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw';
+  return `
+    <picture>
+      <source type="image/webp" srcset="${s.webp}" sizes="${sizes}">
+      <img src="${s.src}" srcset="${s.jpeg}" sizes="${sizes}" width="${s.width}" height="${s.height}"
+        alt="" loading="lazy" decoding="async" class="w-full h-auto rounded">
+    </picture>`;
+}
+
+function loadCourses(){
+  if (!nextUrl) return;
+  fetch(nextUrl)
+  .then(r => r.json())
+  .then(data => {
+    const el = document.getElementById('courses');
+    nextUrl = data.next;
+    if (data.facets) renderFacets(data.facets);
+    moreBtn.classList.toggle('hidden', !nextUrl);
+    data.results.forEach(c => {
+      el.insertAdjacentHTML('beforeend', `
+        <div class="card space-y-3 h-full flex flex-col justify-between">
+          ${coverPicture(c)}
+          <div>
+            <div class="text-xs uppercase tracking-[0.2em] text-cyan-300 mb-2">${c.level}</div>
+            <h3 class="text-xl font-bold mb-2"><a href="/courses/${c.slug}/" class="hover:text-cyan-200 transition">${c.title}</a></h3>
+            <p class="text-slate-300 mb-2">${c.short}...</p>
+          </div>
+          <div class="flex items-center justify-between text-sm text-slate-300 gap-3">
+            <span class="font-semibold text-cyan-300">${c.price} ₸</span>
+            <a href="/courses/${c.slug}/" class="btn-primary text-sm px-3 py-2 sm:w-auto justify-center">Подробнее</a>
+          </div>
+        </div>
+      `);
+    });
+  });
+}
+
+moreBtn.addEventListener('click', event => {
+  event.preventDefault();
+  loadCourses();
+});
+
+// title и snippet приходят HTML'ем: текст экранирован сервером, совпадения в <mark>
+const searchInput = document.getElementById('search-input');
+const searchResults = document.getElementById('search-results');
+let searchTimer = null;
+let searchSeq = 0;
+
+searchInput.addEventListener('input', () => {
+  clearTimeout(searchTimer);
+  searchTimer = setTimeout(runSearch, 200);
+});
+
+function runSearch(){
+  const q = searchInput.value.trim();
+  const seq = ++searchSeq;
+  if (q.length < 2) {
+    searchResults.classList.add('hidden');
+    return;
+  }
+  fetch(`/api/search/?limit=8&q=${encodeURIComponent(q)}`)
+  .then(r => r.json())
+  .then(data => {
+    if (seq !== searchSeq) return;  // пришёл ответ на устаревший запрос
+    searchResults.innerHTML = data.results.length ? data.results.map(r => `
+      <a href="${r.url}" class="block hover:text-cyan-200 transition">
+        <div class="text-xs uppercase tracking-[0.2em] text-cyan-300">${r.kind === 'course' ? 'Курс' : 'Урок'}</div>
+        <div class="font-semibold">${r.title}</div>
+        <div class="text-sm text-slate-300">${r.snippet}</div>
+      </a>
+    `).join('') : '<p class="text-slate-300">Ничего не найдено</p>';
+    searchResults.classList.remove('hidden');
+  });
+}
@@ -0,0 +1,18 @@
+// данные берутся из готовых сводок (/api/analytics/), а не из журнала
+async function loadAnalytics(url, el, render){
+  try{
+    const resp = await fetch(url, { credentials: 'include' });
+    if(!resp.ok) throw new Error('Нет доступа к аналитике');
+    const rows = await resp.json();
+    el.innerHTML = rows.length ? rows.map(render).join('') : '<span class="text-slate-400">Нет данных</span>';
+  }catch(e){
+    el.innerHTML = `<span class="text-red-300">${e.message}</span>`;
+  }
+}
+
+loadAnalytics('/api/analytics/groups/', document.getElementById('analytics-groups'), g => `
+  <div class="flex justify-between"><span>${g.group}</span><span class="font-semibold text-cyan-300">${g.average ?? '—'}</span></div>
+`);
+loadAnalytics('/api/analytics/at-risk/', document.getElementById('analytics-risk'), r => `
+  <div class="flex justify-between"><span>${r.student} · ${r.group}</span><span class="font-semibold text-red-300">${r.average}</span></div>
+`);
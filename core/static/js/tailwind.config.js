@@ -0,0 +1 @@
+tailwind.config = { darkMode: 'class' };
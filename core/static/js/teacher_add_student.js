@@ -0,0 +1,78 @@
+const pathParts = location.pathname.split('/').filter(Boolean);
+const teacherId = Number(pathParts[pathParts.length - 2]) || null;
+const selectEl = document.getElementById('group-select');
+const studentInput = document.getElementById('student-id-input');
+const statusEl = document.getElementById('status');
+const btn = document.getElementById('add-student-btn');
+
+function getCookie(name) {
+  const value = `; ${document.cookie}`;
+  const parts = value.split(`; ${name}=`);
+  if (parts.length === 2) return parts.pop().split(';').shift();
+  return '';
+}
+
+function setStatus(msg, isError=false){
+  statusEl.textContent = msg;
+  statusEl.classList.remove('text-red-300','text-emerald-300');
+  statusEl.classList.add(isError ? 'text-red-300' : 'text-emerald-300');
+}
+
+async function loadGroups(){
+  selectEl.innerHTML = '<option>Загрузка...</option>';
+  const data = [];
+  let url = '/api/groups/';
+  while(url){
+    const resp = await fetch(url);
+    if(!resp.ok){ setStatus('Не удалось загрузить группы', true); return; }
+    const page = await resp.json();
+    data.push(...page.results);
+    url = page.next;
+  }
+  const mine = teacherId ? data.filter(g=>g.teacher && g.teacher.id === teacherId) : data;
+  if(!mine.length){
+    selectEl.innerHTML = '<option value="">Нет групп</option>';
+    return;
+  }
+  selectEl.innerHTML = mine.map(g=>`<option value="${g.id}" data-students='${JSON.stringify(g.student_ids_read||[])}'>${g.name} (#${g.id})</option>`).join('');
+}
+
+btn.addEventListener('click', async ()=>{
+  const groupId = Number(selectEl.value);
+  const studentId = Number(studentInput.value);
+  if(!groupId){ setStatus('Выберите группу', true); return; }
+  if(!studentId){ setStatus('Укажите ID студента', true); return; }
+
+  const selectedOpt = selectEl.selectedOptions[0];
+  const currentIds = JSON.parse(selectedOpt.getAttribute('data-students') || '[]');
+  if(currentIds.includes(studentId)){
+    setStatus('Студент уже в группе', true);
+    return;
+  }
+  const newIds = [...currentIds, studentId];
+
+  const headers = {
+    'Content-Type':'application/json',
+    'X-CSRFToken': getCookie('csrftoken')
+  };
+  const token = localStorage.getItem('access');
+  if(token) headers['Authorization'] = `Bearer ${token}`;
+
+  const resp = await fetch(`/api/groups/${groupId}/`, {
+    method:'PATCH',
+    headers,
+    credentials:'include',
+    body: JSON.stringify({ student_ids: newIds, teacher_id: teacherId })
+  });
+
+  if(!resp.ok){
+    const txt = await resp.text();
+    setStatus('Ошибка: ' + txt, true);
+    return;
+  }
+  setStatus('Студент добавлен');
+  studentInput.value = '';
+  await loadGroups();
+});
+
+loadGroups();
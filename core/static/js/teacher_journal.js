@@ -0,0 +1,107 @@
+const tbody = document.getElementById('journal-body');
+const moreBtn = document.getElementById('journal-more');
+const pathParts = location.pathname.split('/').filter(Boolean);
+const teacherId = Number(pathParts[pathParts.length - 2]) || null;
+let nextUrl = '/api/journal/';
+let shown = 0;
+
+function renderRows(list){
+  if (!shown) tbody.innerHTML = '';
+  shown += list.length;
+  if (!shown) {
+    tbody.innerHTML = `<tr><td class="px-4 py-3 text-slate-300" colspan="5">Пусто</td></tr>`;
+    return;
+  }
+  tbody.insertAdjacentHTML('beforeend', list.map(item => `
+    <tr>
+      <td class="px-4 py-3">${item.student}</td>
+      <td class="px-4 py-3">${item.group}</td>
+      <td class="px-4 py-3">${item.date}</td>
+      <td class="px-4 py-3">${item.grade || '—'}</td>
+      <td class="px-4 py-3">${item.comment || '—'}</td>
+    </tr>
+  `).join(''));
+}
+
+// журнал приходит страницами (cursor pagination), следующую берём по data.next
+async function loadJournal() {
+  if (!nextUrl) return;
+  try {
+    const resp = await fetch(nextUrl);
+    if(!resp.ok) throw new Error('Не удалось загрузить журнал');
+    const data = await resp.json();
+    const rows = data.results;
+    const filtered = teacherId ? rows.filter(r => r.group_teacher_id === teacherId) : rows;
+    nextUrl = data.next;
+    renderRows(filtered);
+    moreBtn.classList.toggle('hidden', !nextUrl);
+  } catch (e) {
+    tbody.innerHTML = `<tr><td class="px-4 py-3 text-red-300" colspan="5">${e.message}</td></tr>`;
+  }
+}
+
+moreBtn.addEventListener('click', loadJournal);
+loadJournal();
+
+// ===== оценки всей группе одним запросом (/api/journal/bulk/) =====
+const groupSelect = document.getElementById('grade-group');
+const dateInput = document.getElementById('grade-date');
+const gradeRows = document.getElementById('grade-rows');
+const gradeStatus = document.getElementById('grade-status');
+let groups = [];
+dateInput.valueAsDate = new Date();
+
+function getCookie(name) {
+  const value = `; ${document.cookie}`;
+  const parts = value.split(`; ${name}=`);
+  if (parts.length === 2) return parts.pop().split(';').shift();
+  return '';
+}
+
+function renderGradeRows(){
+  const group = groups.find(g => g.id === Number(groupSelect.value));
+  if(!group){ gradeRows.innerHTML = ''; return; }
+  gradeRows.innerHTML = group.student_ids_read.map((id, i) => `
+    <label class="flex items-center justify-between gap-2 text-sm">
+      <span>${group.students[i]}</span>
+      <input data-student="${id}" maxlength="5" class="w-16 bg-slate-900 border border-slate-700 rounded px-2 py-1">
+    </label>
+  `).join('');
+}
+
+async function loadGroups(){
+  let url = '/api/groups/';
+  while(url){
+    const resp = await fetch(url);
+    if(!resp.ok) return;
+    const page = await resp.json();
+    groups.push(...page.results.filter(g => !teacherId || (g.teacher && g.teacher.id === teacherId)));
+    url = page.next;
+  }
+  groupSelect.innerHTML = groups.map(g => `<option value="${g.id}">${g.name}</option>`).join('');
+  renderGradeRows();
+}
+
+async function saveGrades(){
+  const entries = [...gradeRows.querySelectorAll('input[data-student]')]
+    .filter(i => i.value.trim())
+    .map(i => ({ student_id: Number(i.dataset.student), grade: i.value.trim() }));
+  if(!entries.length){ gradeStatus.textContent = 'Нет оценок для сохранения'; return; }
+  const resp = await fetch('/api/journal/bulk/', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', 'X-CSRFToken': getCookie('csrftoken') },
+    credentials: 'include',
+    body: JSON.stringify({ group_id: Number(groupSelect.value), date: dateInput.value, entries })
+  });
+  if(!resp.ok){ gradeStatus.textContent = 'Ошибка: ' + await resp.text(); return; }
+  const { results } = await resp.json();
+  const changed = results.filter(r => r.status !== 'unchanged').length;
+  gradeStatus.textContent = `Сохранено: ${changed} из ${results.length}`;
+  nextUrl = '/api/journal/';
+  shown = 0;
+  loadJournal();
+}
+
+groupSelect.addEventListener('change', renderGradeRows);
+document.getElementById('grade-save').addEventListener('click', saveGrades);
+loadGroups();
@@ -0,0 +1,134 @@
+const card = document.getElementById('teacher-card');
+const pathParts = location.pathname.split('/').filter(Boolean);
+const maybeId = pathParts[pathParts.length - 1];
+const teacherId = Number.isInteger(Number(maybeId)) ? Number(maybeId) : null;
+const journalLink = document.getElementById('journal-link');
+const addStudentPageLink = document.getElementById('add-student-page');
+const groupsList = document.getElementById('groups-list');
+const groupNameInput = document.getElementById('group-name');
+const studentIdInput = document.getElementById('student-id');
+const createGroupBtn = document.getElementById('create-group');
+
+function renderTeacher(data){
+  const user = data.user || {};
+  const fullName = [user.first_name, user.last_name].filter(Boolean).join(' ') || user.username || 'Учитель';
+  const bio = data.bio || 'Преподаватель';
+  const phone = data.phone || '—';
+  card.innerHTML = `
+    <img src="/static/teacher.jpg" alt="Учитель" class="w-24 h-24 rounded-full shadow-lg border border-slate-700">
+    <div class="space-y-2 flex-1">
+      <h2 class="text-2xl font-bold">${fullName}</h2>
+      <p class="text-slate-300">${bio}</p>
+      <div class="flex flex-wrap gap-3 text-sm">
+        <span class="px-3 py-1 rounded-full bg-emerald-500/90 text-emerald-950 font-semibold">ID ${data.id}</span>
+        <span class="px-3 py-1 rounded-full bg-cyan-500/90 text-cyan-950 font-semibold">Телефон: ${phone}</span>
+      </div>
+    </div>
+  `;
+  if (journalLink && data.id) {
+    journalLink.href = `/teacher_profile/${data.id}/journal/`;
+  }
+  if (addStudentPageLink && data.id) {
+    addStudentPageLink.href = `/teacher_profile/${data.id}/add_student/`;
+  }
+}
+
+async function loadTeacher() {
+  try {
+    if (!teacherId) {
+      // fallback: взять первого учителя
+      const listResp = await fetch('/api/teachers/');
+      if (!listResp.ok) throw new Error('Не удалось загрузить список учителей');
+      const list = (await listResp.json()).results;
+      if (!list.length) throw new Error('Учителя не найдены');
+      return renderTeacher(list[0]);
+    }
+    const resp = await fetch('/api/teachers/' + teacherId + '/');
+    if (!resp.ok) throw new Error('Учитель не найден');
+    const data = await resp.json();
+    renderTeacher(data);
+    loadGroups(data.id);
+  } catch (e) {
+    card.innerHTML = `<div class="text-red-300">Ошибка: ${e.message}</div>`;
+  }
+}
+
+async function loadGroups(tId){
+  try{
+    const data = await fetchAllPages('/api/groups/');
+    const mine = data.filter(g => g.teacher && g.teacher.id === tId);
+    if(!mine.length){
+      groupsList.innerHTML = `<div class="text-slate-400 text-sm">Нет групп</div>`;
+      return;
+    }
+    groupsList.innerHTML = mine.map(g => `
+      <div class="card space-y-2">
+        <div class="flex items-center justify-between">
+          <h4 class="font-semibold text-lg">${g.name}</h4>
+          <span class="text-xs text-slate-400">#${g.id}</span>
+        </div>
+        <p class="text-slate-300 text-sm">Студентов: ${g.students.length}</p>
+        <div class="flex flex-wrap gap-2 text-sm">
+          ${g.students.map(s=>`<span class="px-2 py-1 rounded bg-slate-800 border border-slate-700">${s}</span>`).join('')}
+        </div>
+      </div>
+    `).join('');
+  }catch(e){
+    groupsList.innerHTML = `<div class="text-red-300 text-sm">${e.message}</div>`;
+  }
+}
+
+// API отдаёт списки страницами, проходим по data.next до конца
+async function fetchAllPages(url){
+  const rows = [];
+  while(url){
+    const resp = await fetch(url);
+    if(!resp.ok) throw new Error('Не удалось загрузить группы');
+    const data = await resp.json();
+    rows.push(...data.results);
+    url = data.next;
+  }
+  return rows;
+}
+
+function getCookie(name) {
+  const value = `; ${document.cookie}`;
+  const parts = value.split(`; ${name}=`);
+  if (parts.length === 2) return parts.pop().split(';').shift();
+  return '';
+}
+
+async function createGroup(tId){
+  const name = groupNameInput.value.trim();
+  const studentId = studentIdInput.value.trim();
+  if(!name){
+    alert('Введите название группы');
+    return;
+  }
+  const body = { name, teacher_id: tId };
+  if(studentId) body.student_ids = [Number(studentId)];
+  const headers = {
+    'Content-Type':'application/json',
+    'X-CSRFToken': getCookie('csrftoken')
+  };
+  const token = localStorage.getItem('access');
+  if(token) headers['Authorization'] = `Bearer ${token}`;
+  const resp = await fetch('/api/groups/', {
+    method:'POST',
+    headers,
+    body: JSON.stringify(body),
+    credentials: 'include'
+  });
+  if(!resp.ok){
+    const txt = await resp.text();
+    alert('Ошибка: ' + txt);
+    return;
+  }
+  groupNameInput.value = '';
+  studentIdInput.value = '';
+  loadGroups(tId);
+}
+
+createGroupBtn?.addEventListener('click', ()=>{ if(teacherId) createGroup(teacherId); });
+
+loadTeacher();
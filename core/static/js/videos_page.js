@@ -0,0 +1,36 @@
+const modal = document.getElementById('video-modal');
+const modalVideo = document.getElementById('modal-video');
+const closeModal = document.getElementById('close-modal');
+const grid = document.getElementById('videos-grid');
+
+const videos = [
+  { title:'Python: основы синтаксиса', duration:'12 мин', src:'/media/sample-video.mp4' },
+  { title:'Django: быстрый старт', duration:'9 мин', src:'/media/sample-video.mp4' },
+  { title:'Tailwind: верстка за 15 минут', duration:'15 мин', src:'/media/sample-video.mp4' },
+  { title:'Pandas: обработка CSV', duration:'8 мин', src:'/media/sample-video.mp4' },
+  { title:'API: REST концепции', duration:'10 мин', src:'/media/sample-video.mp4' },
+  { title:'Git: базовые команды', duration:'6 мин', src:'/media/sample-video.mp4' },
+];
+
+videos.forEach(v => {
+  grid.insertAdjacentHTML('beforeend', `
+    <article class="card space-y-3 cursor-pointer" onclick="openVideo('${v.src}')">
+      <div class="aspect-video rounded-xl bg-slate-800 border border-slate-700 flex items-center justify-center text-slate-500 text-sm">Превью</div>
+      <div class="space-y-1">
+        <h3 class="text-lg font-semibold">${v.title}</h3>
+        <p class="text-slate-300 text-sm">Длительность: ${v.duration}</p>
+      </div>
+    </article>
+  `);
+});
+
+function openVideo(src) {
+  modalVideo.src = src;
+  modal.classList.remove('hidden');
+}
+
+closeModal.addEventListener('click', () => {
+  modal.classList.add('hidden');
+  modalVideo.pause();
+  modalVideo.src = '';
+});
@@ -0,0 +1,197 @@
+# core/staticfiles.py
+import gzip
+import mimetypes
+import posixpath
+import re
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+
+from .media import IMMUTABLE_CACHE_CONTROL, _not_modified, file_etag
+
+try:
+    import brotli
+except ImportError:  # без пакета brotli рядом кладутся только .gz
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:  # без rjsmin JS только сжимается
+    rjsmin = None
+
+COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".txt", ".map", ".html")
+MIN_COMPRESS_SIZE = 256
+# имя.<12 знаков md5>.расширение — так называет файлы ManifestStaticFilesStorage
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.\w+$")
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s*([{};,])\s*")
+
+
+# =========================
+# СБОРКА СТАТИКИ
+# =========================
+# collectstatic с CompressedManifestStaticFilesStorage (settings.STORAGES):
+#
+#   css/main.css                  — копия исходника
+#   css/main.4f2a9c0e1b7d.css     — минифицированная версия с хэшем
+#   css/main.4f2a9c0e1b7d.css.gz  — она же, сжатая заранее
+#   css/main.4f2a9c0e1b7d.css.br  — если установлен brotli
+#
+# {% static %} отдаёт имена с хэшем, поэтому их можно кэшировать навсегда.
+# Хэш считается от уже минифицированных байт (file_hash), то есть от того,
+# что реально лежит под этим именем.
+#
+# В CSS убираются комментарии и лишние пробелы. JS минифицирует rjsmin —
+# он разбирает строки, шаблонные строки и регулярные выражения; построчная
+# чистка ломала бы многострочные литералы. Без rjsmin JS не минифицируется,
+# основную экономию всё равно даёт сжатие.
+# Статика из сторонних пакетов только сжимается.
+
+def minify_css(text):
+    text = _CSS_COMMENT.sub("", text)
+    text = re.sub(r"\s+", " ", text)
+    text = _CSS_SPACE.sub(r"\1", text)
+    text = re.sub(r":\s+", ":", text)
+    return text.replace(";}", "}").strip() + "\n"
+
+
+MINIFIERS = {".css": minify_css}
+if rjsmin is not None:
+    MINIFIERS[".js"] = rjsmin.jsmin
+
+
+def minified_bytes(name, data):
+    """Минифицированные байты или None, если для расширения минификатора нет."""
+    minifier = MINIFIERS.get(posixpath.splitext(name)[1])
+    return None if minifier is None else minifier(data.decode()).encode()
+
+
+def compressed_variants(data):
+    """[(суффикс, байты)] — только те, что заметно меньше исходника."""
+    variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append((".br", brotli.compress(data, quality=11)))
+    return [(suffix, packed) for suffix, packed in variants if len(packed) < len(data) * 0.95]
+
+
+def own_static_dirs():
+    """Каталоги собственной статики: STATICFILES_DIRS и static/ приложения core."""
+    dirs = [entry[1] if isinstance(entry, (list, tuple)) else entry for entry in settings.STATICFILES_DIRS]
+    dirs.append(Path(apps.get_app_config("core").path) / "static")
+    return {Path(directory).resolve() for directory in dirs}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    minified = frozenset()
+
+    def post_process(self, paths, dry_run=False, **options):
+        # минифицируем только свои исходники: статика admin, DRF и swagger
+        # приходит из пакетов уже собранной. Решает каталог-источник, а не
+        # расположение на диске — .venv обычно лежит внутри BASE_DIR
+        sources = own_static_dirs()
+        self.minified = {
+            name for name, (storage, path) in paths.items()
+            if Path(storage.location).resolve() in sources
+        }
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name, hashed_name in self.hashed_files.items():
+            self.finish_file(hashed_name, minify=name in self.minified)
+
+    def file_hash(self, name, content=None):
+        if content is None or name not in self.minified:
+            return super().file_hash(name, content)
+        data = b"".join(content.chunks())
+        minified = minified_bytes(name, data)
+        return super().file_hash(name, ContentFile(data if minified is None else minified))
+
+    def finish_file(self, name, minify=False):
+        ext = posixpath.splitext(name)[1]
+        if ext not in COMPRESSIBLE or not self.exists(name):
+            return
+        with self.open(name) as f:
+            data = f.read()
+        minified = minified_bytes(name, data) if minify else None
+        if minified is not None:
+            data = minified
+            self.delete(name)
+            self._save(name, ContentFile(data))
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        for suffix, packed in compressed_variants(data):
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(packed))
+
+
+# =========================
+# ОТДАЧА СТАТИКИ
+# =========================
+# Обычно /static/ раздаёт фронт-сервер прямо из STATIC_ROOT, например nginx:
+#
+#   location /static/ {
+#       alias <STATIC_ROOT>/;
+#       gzip_static on;           # .gz рядом с файлом
+#       brotli_static on;         # .br, модуль ngx_brotli
+#       location ~ "\.[0-9a-f]{12}\.\w+$" {
+#           add_header Cache-Control "public, max-age=31536000, immutable";
+#       }
+#   }
+#
+# Без фронт-сервера (STATIC_SERVE=1) то же делает serve_static.
+
+def accepted_encodings(request):
+    header = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    accepted = set()
+    for item in header.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        weight = next((param[2:] for param in params if param.startswith("q=")), "1")
+        try:
+            if float(weight) > 0:
+                accepted.add(coding.lower())
+        except ValueError:
+            continue
+    return accepted
+
+
+def serve_static(request, path):
+    """Файл из STATIC_ROOT: заранее сжатый вариант, если клиент его принимает."""
+    name = posixpath.normpath(path).lstrip("/")
+    try:
+        source = Path(safe_join(settings.STATIC_ROOT, name))
+    except SuspiciousFileOperation:
+        raise Http404("Файл не найден")
+    if not source.is_file():
+        raise Http404("Файл не найден")
+
+    target, encoding = source, None
+    accepted = accepted_encodings(request)
+    for suffix, coding in ((".br", "br"), (".gz", "gzip")):
+        variant = source.with_name(source.name + suffix)
+        if coding in accepted and variant.is_file():
+            target, encoding = variant, coding
+            break
+
+    stat = target.stat()
+    etag = file_etag(stat)
+    if _not_modified(request, etag, stat.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        content_type = mimetypes.guess_type(source.name)[0] or "application/octet-stream"
+        response = FileResponse(target.open("rb"), content_type=content_type)
+        if encoding:
+            response["Content-Encoding"] = encoding
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Vary"] = "Accept-Encoding"
+    response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if HASHED_NAME.search(name) else "no-cache"
+    return response
@@ -0,0 +1,102 @@
+# core/tasks.py
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+# =========================
+# ОЧЕРЕДЬ ЗАДАЧ В БД
+# =========================
+# Без внешнего брокера: задача — строка Job, воркер (`manage.py run_jobs`)
+# забирает готовые строки и выполняет их в пуле процессов или потоков.
+#
+#     @task("transcode_video", max_attempts=2)
+#     def transcode_video(video_id): ...
+#
+#     enqueue("transcode_video", key=f"transcode_video:{video.pk}", video_id=video.pk)
+#
+# enqueue() ставит задачу только после коммита текущей транзакции: иначе
+# воркер может взять задачу раньше, чем станут видны её данные.
+# Задача с уже известным `key` не ставится повторно (Job.key уникален),
+# поэтому повторная отправка формы или сигнала не дублирует побочный эффект.
+# Упавшая задача возвращается в очередь через backoff * 2^(попытка-1) секунд,
+# после max_attempts попыток остаётся в статусе failed.
+
+MAX_BACKOFF = 60 * 60
+
+
+def task(name, max_attempts=5, backoff=30):
+    def register(func):
+        func.max_attempts = max_attempts
+        func.backoff = backoff
+        TASKS[name] = func
+        return func
+    return register
+
+
+def enqueue(name, key=None, **payload):
+    if name not in TASKS:
+        raise KeyError(f"unknown task {name!r}")
+    job = Job(name=name, key=key, payload=payload)
+    transaction.on_commit(lambda: Job.objects.bulk_create([job], ignore_conflicts=True))
+
+
+def retry_delay(func, attempts):
+    delay = min(func.backoff * 2 ** (attempts - 1), MAX_BACKOFF)
+    # разброс, чтобы задачи, упавшие вместе, не вернулись одной волной
+    return timedelta(seconds=delay * random.uniform(1, 1.2))
+
+
+def claim_jobs(limit):
+    """Помечает до `limit` готовых задач как running и возвращает их id.
+
+    Зависшие running-задачи (воркер упал) старше JOB_LOCK_TIMEOUT
+    снова считаются готовыми.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    with transaction.atomic():
+        ready = Job.objects.filter(
+            Q(status="queued") | Q(status="running", locked_at__lt=stale),
+            run_after__lte=now,
+        ).order_by("run_after", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            ready = ready.select_for_update(skip_locked=True)
+        ids = list(ready.values_list("id", flat=True)[:limit])
+        Job.objects.filter(id__in=ids).update(status="running", locked_at=now)
+    return ids
+
+
+def run_job(job_id):
+    job = Job.objects.get(pk=job_id)
+    func = TASKS[job.name]
+    job.attempts += 1
+    job.finished_at = None
+    try:
+        func(**job.payload)
+    except Exception:
+        job.error = traceback.format_exc()
+        if job.attempts < func.max_attempts:
+            logger.warning("job %s #%s failed, attempt %d of %d", job.name, job.pk,
+                           job.attempts, func.max_attempts, exc_info=True)
+            job.status = "queued"
+            job.run_after = timezone.now() + retry_delay(func, job.attempts)
+        else:
+            logger.exception("job %s #%s failed", job.name, job.pk)
+            job.status, job.finished_at = "failed", timezone.now()
+    else:
+        job.status, job.error, job.finished_at = "done", "", timezone.now()
+    job.save(update_fields=["status", "error", "attempts", "run_after", "finished_at"])
+    return job.status
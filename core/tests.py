@@ -1,3 +1,1288 @@
-from django.test import TestCase
+import hashlib
+import json
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core import mail
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.connection import ConnectionDoesNotExist
+from django.utils.http import http_date
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.throttling import ScopedRateThrottle
+
+from .auth import RoleRefreshToken, revocations, users_with_roles
+from .dbrouters import REPLICA_DB_ALIAS, ReplicaRouter, primary_reads, replica_reads
+from .catalogue_cache import bump_list, course_version_key
+from .benchmark import compare_results, generate_dataset, run_endpoints
+from .certificates import course_enrollments, format_number, is_valid_number, issue_certificates, reserve_numbers
+from .covers import rendition_names
+from .grades import normalize_grade
+from .media import serve_public_media
+from .staticfiles import minified_bytes, minify_css, rjsmin, serve_static
+from .search import query_terms, render_highlight, search, stem
+from .tasks import TASKS, enqueue, task
+from .uploads import upload_dir
+from .transcode import TranscodeError, hls_dir, plan_renditions, transcode_video, write_master_playlist
+from .models import (
+    Course, Lesson, Enrollment, Profile, TeacherProfile,
+    StudentGroup, JournalEntry, VideoLesson, GroupGradeStat, StudentGradeStat, Job, Application, Certificate,
+    TokenRevocation, VideoUpload,
+)
+from .utils import issue_certificate_for_enrollment
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class CoreAPITestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher_user = User.objects.create_user("teacher")
+        Profile.objects.create(user=self.teacher_user, role="teacher")
+        self.teacher, _ = TeacherProfile.objects.get_or_create(user=self.teacher_user)
+        self.client.force_authenticate(self.teacher_user)
+        self.seq = 0
+
+    def add_rows(self, n):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._add_rows(n)
+
+    def _add_rows(self, n):
+        for _ in range(n):
+            self.seq += 1
+            i = self.seq
+            student = User.objects.create_user(f"student{i}")
+            course = Course.objects.create(title=f"C{i}", slug=f"c{i}", description="d")
+            Lesson.objects.create(course=course, title="L", order=1)
+            Enrollment.objects.create(student=self.teacher_user, course=course)
+            group = StudentGroup.objects.create(name=f"G{i}", teacher=self.teacher)
+            group.students.add(student)
+            JournalEntry.objects.create(student=student, group=group, grade="5")
+            VideoLesson.objects.create(course=course, title="V", video_file="v.mp4", teacher=self.teacher)
+
+    def query_count(self, url):
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return int(resp["X-Query-Count"])
+
+
+# =========================
+# QUERY BUDGET
+# =========================
+
+class QueryBudgetTests(CoreAPITestCase):
+    def test_list_queries_do_not_grow_with_rows(self):
+        urls = [
+            "/api/courses/", "/api/enrollments/", "/api/teachers/",
+            "/api/groups/", "/api/journal/", "/api/videos/",
+        ]
+        self.add_rows(2)
+        small = {url: self.query_count(url) for url in urls}
+        self.add_rows(10)
+        large = {url: self.query_count(url) for url in urls}
+        self.assertEqual(small, large)
+
+    def test_budget_header(self):
+        self.add_rows(1)
+        resp = self.client.get("/api/journal/")
+        self.assertLessEqual(int(resp["X-Query-Count"]), int(resp["X-Query-Budget"]))
+
+
+# =========================
+# QUERY PLANS
+# =========================
+
+# голый "SCAN <таблица>" — полный проход; SCAN ... USING INDEX идёт по индексу
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+class QueryPlanIndexTests(CoreAPITestCase):
+    # основной запрос списка: (url, таблица, разрешён ли проход по rowid).
+    # Списки с cursor_ordering = ("id",) идут по первичному ключу — для
+    # SQLite это тот же "SCAN", но без сортировки и с LIMIT
+    ENDPOINTS = [
+        ("/api/courses/", "core_course", False),
+        ("/api/courses/?level=BEG", "core_course", False),
+        ("/api/courses/?ordering=price", "core_course", False),
+        ("/api/courses/c1/", "core_lesson", False),
+        ("/api/lessons/", "core_lesson", True),
+        ("/api/enrollments/", "core_enrollment", False),
+        ("/api/certificates/", "core_certificate", False),
+        ("/api/teachers/", "core_teacherprofile", True),
+        ("/api/groups/", "core_studentgroup", False),
+        ("/api/journal/", "core_journalentry", False),
+        ("/api/videos/", "core_videolesson", False),
+        ("/api/admin/applications/", "core_application", False),
+    ]
+
+    def main_query_plan(self, url, table):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        sql = next(
+            q["sql"] for q in ctx.captured_queries
+            if q["sql"].startswith("SELECT") and f'FROM "{table}"' in q["sql"]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            return [row[3] for row in cursor.fetchall()]
+
+    def test_list_queries_use_indexes(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("EXPLAIN QUERY PLAN is sqlite-only")
+        self.add_rows(3)
+        caches[settings.CATALOGUE_CACHE_ALIAS].clear()
+        Application.objects.create(full_name="Иван", email="ivan@example.com")
+        admin = User.objects.create_user("admin", is_staff=True)
+        for url, table, pk_order in self.ENDPOINTS:
+            with self.subTest(url):
+                self.client.force_authenticate(admin if url.startswith("/api/admin/") else self.teacher_user)
+                plan = self.main_query_plan(url, table)
+                scans = [m.group(1) for m in map(FULL_SCAN.match, plan) if m]
+                if pk_order:
+                    self.assertNotIn("USE TEMP B-TREE FOR ORDER BY", plan)
+                    scans.remove(table)
+                self.assertEqual(scans, [], plan)
+
+    def test_journal_and_lesson_constraints(self):
+        self.add_rows(1)
+        entry = JournalEntry.objects.get()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            JournalEntry.objects.create(student=entry.student, group=entry.group, date=entry.date, grade="4")
+        course = Course.objects.get()
+        # order по умолчанию — следующий номер в курсе
+        self.assertEqual(Lesson.objects.create(course=course, title="L2").order, 2)
+        # явный 0 — тоже номер, а не «не указан»
+        self.assertEqual(Lesson.objects.create(course=course, title="L0", order=0).order, 0)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Lesson.objects.create(course=course, title="L3", order=1)
+        self.client.force_authenticate(self.teacher_user)
+        second = Lesson.objects.get(order=2)
+        resp = self.client.patch(f"/api/lessons/{second.pk}/", {"order": 1}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("order", resp.json())
+        self.assertEqual(self.client.patch(f"/api/lessons/{second.pk}/", {"order": 2}, format="json").status_code, 200)
+
+
+# =========================
+# PAGINATION
+# =========================
+
+class KeysetPaginationTests(CoreAPITestCase):
+    def test_journal_pages_follow_cursor(self):
+        self.add_rows(5)
+        seen = []
+        url = "/api/journal/?page_size=2"
+        while url:
+            data = self.client.get(url).json()
+            self.assertLessEqual(len(data["results"]), 2)
+            seen += [row["id"] for row in data["results"]]
+            url = data["next"]
+        ids = list(JournalEntry.objects.order_by("-date", "-id").values_list("id", flat=True))
+        self.assertEqual(seen, ids)
+
+    def test_ties_on_first_key_do_not_use_offset(self):
+        # у всех записей журнала одна дата: позицию различает только id
+        self.add_rows(5)
+        first = self.client.get("/api/journal/?page_size=2").json()
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(first["next"]).json()
+        sql = next(q["sql"] for q in queries if 'FROM "core_journalentry"' in q["sql"])
+        self.assertNotIn("OFFSET", sql)
+        back = self.client.get(second["previous"]).json()
+        self.assertEqual([row["id"] for row in back["results"]], [row["id"] for row in first["results"]])
+        self.assertEqual(self.client.get("/api/journal/?cursor=cD1bMV0%3D").status_code, 404)
+
+
+# =========================
+# CATALOGUE CACHE
+# =========================
+
+class CatalogueCacheTests(CoreAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.add_rows(3)
+
+    def test_hit_runs_no_queries(self):
+        self.client.get("/api/courses/")
+        self.client.get("/api/courses/c1/")
+        self.assertEqual(self.query_count("/api/courses/"), 0)
+        self.assertEqual(self.query_count("/api/courses/c1/"), 0)
+
+    def test_etag_gives_304(self):
+        etag = self.client.get("/api/courses/c1/")["ETag"]
+        resp = self.client.get("/api/courses/c1/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+    def test_lesson_change_invalidates_course(self):
+        first = self.client.get("/api/courses/c1/")
+        with self.captureOnCommitCallbacks(execute=True):
+            Lesson.objects.create(course=Course.objects.get(slug="c1"), title="New", order=2)
+        second = self.client.get("/api/courses/c1/")
+        self.assertNotEqual(first["ETag"], second["ETag"])
+        self.assertEqual(len(second.json()["lessons"]), 2)
+        self.assertEqual(
+            self.client.get("/api/courses/c1/", HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 200
+        )
+
+    def test_slug_change_invalidates_old_slug(self):
+        self.assertEqual(self.client.get("/api/courses/c1/").status_code, 200)
+        course = Course.objects.get(slug="c1")
+        course.slug = "renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            course.save()
+        self.assertEqual(self.client.get("/api/courses/c1/").status_code, 404)
+        self.assertEqual(self.client.get("/api/courses/renamed/").status_code, 200)
+
+    def test_unknown_slug_mints_no_version(self):
+        future = http_date(time.time() + 3600)
+        cache = caches[settings.CATALOGUE_CACHE_ALIAS]
+        for _ in range(2):
+            resp = self.client.get("/api/courses/nope/", HTTP_IF_MODIFIED_SINCE=future)
+            self.assertEqual(resp.status_code, 404)
+        self.assertIsNone(cache.get(course_version_key("nope")))
+        self.client.get("/api/courses/c2/")
+        with self.captureOnCommitCallbacks(execute=True):
+            Course.objects.get(slug="c2").delete()
+        self.assertEqual(self.client.get("/api/courses/c2/", HTTP_IF_MODIFIED_SINCE=future).status_code, 404)
+
+
+# =========================
+# CATALOGUE FILTERS
+# =========================
+
+class CatalogueFilterTests(CoreAPITestCase):
+    def setUp(self):
+        super().setUp()
+        caches[settings.CATALOGUE_CACHE_ALIAS].clear()
+        for slug, level, price in (("a", "BEG", 0), ("b", "BEG", 5000), ("c", "MID", 15000), ("d", "PRO", 30000)):
+            Course.objects.create(title=slug, slug=slug, description="d", level=level, price=price)
+
+    def slugs(self, query):
+        resp = self.client.get("/api/courses/" + query)
+        self.assertEqual(resp.status_code, 200)
+        return [c["slug"] for c in resp.json()["results"]]
+
+    def test_filter_and_ordering(self):
+        self.assertEqual(self.slugs("?level=BEG,MID&ordering=price"), ["a", "b", "c"])
+        self.assertEqual(self.slugs("?price_min=5000&price_max=15000&ordering=-price"), ["c", "b"])
+        today = timezone.localdate().isoformat()
+        self.assertEqual(len(self.slugs(f"?created_from={today}&created_to={today}")), 4)
+        self.assertEqual(self.slugs(f"?created_to={(timezone.localdate() - timedelta(days=1)).isoformat()}"), [])
+        for query in ("?level=XXX", "?ordering=title", "?price_min=abc", "?price_min=NaN", "?price_max=Infinity",
+                      "?created_from=вчера", "?created_from=2026-02-30"):
+            self.assertEqual(self.client.get("/api/courses/" + query).status_code, 400, query)
+
+    def test_facets_ignore_own_dimension(self):
+        data = self.client.get("/api/courses/?level=BEG&price_min=1").json()
+        facets = data["facets"]
+        self.assertEqual(facets["total"], 1)
+        # уровни — с учётом цены, цены — с учётом уровня
+        self.assertEqual({f["value"]: f["count"] for f in facets["level"]}, {"BEG": 1, "MID": 1, "PRO": 1})
+        self.assertEqual({f["key"]: f["count"] for f in facets["price"]},
+                         {"free": 1, "under_10000": 1, "10000_25000": 0, "from_25000": 0})
+        self.assertEqual(facets["price"][0]["max"], "0")
+        # следующие страницы без фасетов
+        next_page = self.client.get("/api/courses/?page_size=1").json()["next"]
+        self.assertNotIn("facets", self.client.get(next_page).json())
+
+    def test_facets_cached_with_catalogue(self):
+        self.client.get("/api/courses/?level=PRO")
+        self.assertEqual(self.query_count("/api/courses/?level=PRO"), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            Course.objects.create(title="e", slug="e", description="d", level="PRO")
+        self.assertEqual(self.client.get("/api/courses/?level=PRO").json()["facets"]["total"], 2)
+
+
+# =========================
+# CATALOGUE PAGES
+# =========================
+
+class CataloguePageTests(TestCase):
+    def setUp(self):
+        caches[settings.CATALOGUE_CACHE_ALIAS].clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course = Course.objects.create(title="Python", slug="python", description="d", level="BEG")
+            Lesson.objects.create(course=self.course, title="Введение", order=1)
+            Course.objects.create(title="Django", slug="django", description="d", level="MID", price=15000)
+
+    def test_list_rendered_on_server(self):
+        resp = self.client.get("/courses/?level=BEG")
+        self.assertContains(resp, 'href="/courses/python/"')
+        self.assertNotContains(resp, 'href="/courses/django/"')
+        self.assertContains(resp, '<option value="BEG" selected>')
+        # повторный запрос — ответ API и карточки из кэша
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get("/courses/?level=BEG"), "Python")
+
+    def test_fragments_follow_course_changes(self):
+        self.client.get("/courses/")
+        self.client.get("/courses/python/")
+        with self.captureOnCommitCallbacks(execute=True):
+            Lesson.objects.create(course=self.course, title="Циклы", order=2)
+            self.course.title = "Python 3"
+            self.course.save(update_fields=["title"])
+        detail = self.client.get("/courses/python/")
+        self.assertContains(detail, "Циклы")
+        self.assertContains(detail, "Уроков: 2")
+        self.assertContains(self.client.get("/courses/"), "Python 3")
+
+    def test_first_card_cover_not_lazy(self):
+        renditions = {"width": 640, "height": 360, "webp": [{"width": 640, "name": "c.640w.webp"}],
+                      "jpeg": [{"width": 640, "name": "c.640w.jpeg"}]}
+        Course.objects.update(cover_renditions=renditions)
+        for ordering, first in (("price", "python"), ("-price", "django"), ("price", "python")):
+            html = self.client.get(f"/courses/?ordering={ordering}").content.decode()
+            self.assertEqual(html.count('loading="lazy"'), 1, ordering)
+            self.assertLess(html.index(f'href="/courses/{first}/"'), html.index('loading="lazy"'))
+
+    def test_errors(self):
+        self.assertEqual(self.client.get("/courses/missing/").status_code, 404)
+        self.assertContains(self.client.get("/courses/?level=XXX"), "level", status_code=400)
+        self.assertEqual(self.client.get("/courses/?price_min=NaN").status_code, 400)
+
+    def test_browser_conditional_headers_not_passed_to_api(self):
+        self.client.get("/courses/python/")
+        self.assertContains(self.client.get("/courses/python/", HTTP_IF_NONE_MATCH="*"), "Python")
+        future = http_date(time.time() + 3600)
+        self.assertContains(self.client.get("/courses/", HTTP_IF_MODIFIED_SINCE=future), "Django")
+
+
+# =========================
+# SEARCH
+# =========================
+
+class SearchTests(TestCase):
+    def setUp(self):
+        caches[settings.CATALOGUE_CACHE_ALIAS].clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course = Course.objects.create(
+                title="Основы программирования на Python", slug="python",
+                description="Переменные, циклы и функции <b>с нуля</b>",
+            )
+            self.lesson = Lesson.objects.create(
+                course=self.course, title="Сабак 1", content="Китептер менен иштөө жана файлдар",
+            )
+            Course.objects.create(title="Дизайн", slug="design", description="Figma и цвет")
+
+    def test_stem(self):
+        self.assertEqual(stem("программирования"), "программировани")
+        self.assertEqual(stem("китептерден"), "китеп")
+        self.assertEqual(stem("Django"), "django")
+        self.assertEqual(query_terms("курсы по Ёлке"), ["курс", "елк"])
+
+    def test_inflected_word_finds_course(self):
+        results = search("программированию")
+        self.assertEqual([(r["kind"], r["course"]) for r in results], [("course", "python")])
+        self.assertIn("<mark>", results[0]["title"])
+        self.assertEqual(results[0]["url"], "/courses/python/")
+
+    def test_kyrgyz_word_finds_lesson(self):
+        results = search("китептерди", kind="lesson")
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["url"], f"/courses/python/#lesson-{self.lesson.pk}")
+        self.assertIn("<mark>Китептер</mark>", results[0]["snippet"])
+
+    def test_highlight_escapes_text(self):
+        self.assertIn("&lt;b&gt;", search("циклы")[0]["snippet"])
+        self.assertEqual(render_highlight("<i>\x02x\x03"), "&lt;i&gt;<mark>x</mark>")
+
+    def test_index_follows_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.title = "Веб-разработка"
+            self.course.save(update_fields=["title"])
+            self.lesson.delete()
+        self.assertEqual(search("программирования"), [])
+        self.assertEqual(search("китеп"), [])
+        self.assertEqual(search("веб")[0]["course"], "python")
+
+    def test_endpoint(self):
+        client = APIClient()
+        resp = client.get("/api/search/", {"q": "дизайну"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([r["course"] for r in resp.json()["results"]], ["design"])
+        self.assertEqual(client.get("/api/search/", {"q": "x", "kind": "video"}).status_code, 400)
+        with self.captureOnCommitCallbacks(execute=True):
+            Course.objects.filter(slug="design").get().delete()
+        self.assertEqual(client.get("/api/search/", {"q": "дизайну"}).json()["results"], [])
+
+
+# =========================
+# COURSE COUNTERS
+# =========================
+
+class CourseCounterTests(CoreAPITestCase):
+    def test_counters_follow_writes(self):
+        self.add_rows(1)
+        course = Course.objects.get(slug="c1")
+        Lesson.objects.create(course=course, title="L2", order=2)
+        enrollment = Enrollment.objects.get(course=course)
+        enrollment.active = False
+        enrollment.save()
+        course.refresh_from_db()
+        self.assertEqual((course.lessons_count, course.active_enrollments_count), (2, 0))
+
+        enrollment.active = True
+        enrollment.save()
+        course.lessons.first().delete()
+        course.refresh_from_db()
+        self.assertEqual((course.lessons_count, course.active_enrollments_count), (1, 1))
+
+    def test_lesson_moved_between_courses(self):
+        self.add_rows(2)
+        self.client.get("/api/courses/c1/")
+        lesson = Lesson.objects.get(course__slug="c1")
+        lesson.course = Course.objects.get(slug="c2")
+        lesson.order = 2
+        with self.captureOnCommitCallbacks(execute=True):
+            lesson.save()
+        counts = dict(Course.objects.values_list("slug", "lessons_count"))
+        self.assertEqual((counts["c1"], counts["c2"]), (0, 2))
+        self.assertEqual(self.client.get("/api/courses/c1/").json()["lessons"], [])
+
+    def test_rebuild_command_fixes_drift(self):
+        self.add_rows(2)
+        Course.objects.update(lessons_count=7)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_course_counters", "--check", stdout=StringIO())
+        call_command("rebuild_course_counters", stdout=StringIO())
+        call_command("rebuild_course_counters", "--check", stdout=StringIO())
+        self.assertEqual(set(Course.objects.values_list("lessons_count", flat=True)), {1})
+
+
+# =========================
+# DEFERRED COLUMNS / ?fields=
+# =========================
+
+class SparseFieldsTests(CoreAPITestCase):
+    def select_sql(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get(url).json()
+        return data, " ".join(q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT"))
+
+    def test_lists_skip_heavy_text(self):
+        self.add_rows(2)
+        data, sql = self.select_sql("/api/courses/")
+        self.assertNotIn('"core_course"."description"', sql.replace('SUBSTR("core_course"."description"', ""))
+        self.assertIn("short", data["results"][0])
+        _, sql = self.select_sql("/api/enrollments/")
+        self.assertNotIn('"core_course"."description"', sql)
+        _, sql = self.select_sql("/api/lessons/")
+        self.assertNotIn('"core_lesson"."content"', sql)
+
+    def test_fields_param_narrows_output_and_sql(self):
+        self.add_rows(2)
+        data, sql = self.select_sql("/api/journal/?fields=id,grade")
+        self.assertEqual(set(data["results"][0]), {"id", "grade"})
+        self.assertNotIn('"core_journalentry"."comment"', sql)
+
+
+# =========================
+# BULK JOURNAL
+# =========================
+
+class JournalBulkTests(CoreAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.group = StudentGroup.objects.create(name="G", teacher=self.teacher)
+        self.students = [User.objects.create_user(f"s{i}") for i in range(3)]
+        self.group.students.add(*self.students)
+
+    def post(self, entries):
+        return self.client.post("/api/journal/bulk/", {
+            "group_id": self.group.id, "date": "2026-09-01", "entries": entries,
+        }, format="json")
+
+    def test_upsert_per_row_results(self):
+        first = self.post([{"student_id": s.id, "grade": "4"} for s in self.students])
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual({r["status"] for r in first.json()["results"]}, {"created"})
+
+        second = self.post([
+            {"student_id": self.students[0].id, "grade": "5"},
+            {"student_id": self.students[1].id, "grade": "4"},
+        ])
+        self.assertEqual([r["status"] for r in second.json()["results"]], ["updated", "unchanged"])
+        self.assertEqual(JournalEntry.objects.count(), 3)
+
+    def test_rejects_students_outside_group(self):
+        outsider = User.objects.create_user("outsider")
+        resp = self.post([
+            {"student_id": self.students[0].id, "grade": "5"},
+            {"student_id": outsider.id, "grade": "5"},
+        ])
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json()["entries"][1], {"student_id": ["Студент не состоит в группе."]})
+        self.assertFalse(JournalEntry.objects.exists())
+
+
+# =========================
+# EXPORTS
+# =========================
+
+class ExportTests(CoreAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_rows(3)
+        self.client.force_authenticate(User.objects.create_user("boss", is_staff=True))
+
+    def download(self, url):
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return b"".join(resp.streaming_content)
+
+    def test_csv(self):
+        lines = self.download("/api/exports/journal/?output=csv").decode("utf-8-sig").splitlines()
+        self.assertEqual(lines[0], "Дата,Группа,Учитель,Студент,Оценка,Комментарий")
+        self.assertEqual(len(lines), 4)
+
+    def test_xlsx(self):
+        content = self.download("/api/exports/enrollments/?output=xlsx&active=true")
+        with zipfile.ZipFile(BytesIO(content)) as book:
+            sheet = book.read("xl/worksheets/sheet1.xml").decode("utf-8")
+        self.assertEqual(sheet.count("<row>"), 4)
+
+    def test_rejects_bad_filters(self):
+        self.assertEqual(self.client.get("/api/exports/journal/?output=pdf").status_code, 400)
+        self.assertEqual(self.client.get("/api/exports/applications/?date_from=x").status_code, 400)
+        self.assertEqual(self.client.get("/api/exports/journal/?date_from=2026-02-30").status_code, 400)
+        self.assertEqual(self.client.get("/api/exports/journal/?group=%C2%B2").status_code, 400)
+
+    def test_csv_neutralizes_formulas(self):
+        Application.objects.create(full_name="=HYPERLINK(\"http://x\")", email="a@example.com", phone="+996555")
+        content = self.download("/api/exports/applications/?output=csv").decode("utf-8-sig")
+        self.assertIn("\"'=HYPERLINK(\"\"http://x\"\")\"", content)
+        self.assertIn(",'+996555,", content)
+
+
+# =========================
+# GRADE ANALYTICS
+# =========================
+
+class GradeAnalyticsTests(CoreAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.group = StudentGroup.objects.create(name="G", teacher=self.teacher)
+        self.students = [User.objects.create_user(f"s{i}") for i in range(2)]
+        self.group.students.add(*self.students)
+        self.client.force_authenticate(User.objects.create_user("boss", is_staff=True))
+
+    def stats(self):
+        rows = StudentGradeStat.objects.filter(count__gt=0).order_by("student_id")
+        return list(rows.values_list("count", "total", "n2", "n5"))
+
+    def test_normalize_grade(self):
+        cases = {"5": "5.00", "4+": "4.25", "3-": "2.75", "4,5": "4.50", "b": "4.00", "90": "4.50"}
+        for raw, value in cases.items():
+            self.assertEqual(normalize_grade(raw), Decimal(value))
+        self.assertIsNone(normalize_grade("н"))
+
+    def test_rollups_follow_single_and_bulk_writes(self):
+        entry = JournalEntry.objects.create(student=self.students[0], group=self.group, grade="5")
+        JournalEntry.objects.create(student=self.students[1], group=self.group, grade="н")
+        entry.grade = "2"
+        entry.save()
+        self.client.force_authenticate(self.teacher_user)
+        self.client.post("/api/journal/bulk/", {
+            "group_id": self.group.id, "date": str(entry.date),
+            "entries": [{"student_id": s.id, "grade": "5"} for s in self.students],
+        }, format="json")
+        self.assertEqual(self.stats(), [(1, Decimal("5"), 0, 1), (1, Decimal("5"), 0, 1)])
+
+        JournalEntry.objects.get(student=self.students[1]).delete()
+        expected = self.stats()
+        call_command("rebuild_grade_stats", stdout=StringIO())
+        self.assertEqual(self.stats(), expected)
+
+    def test_deleting_student_updates_group_rollup(self):
+        JournalEntry.objects.create(student=self.students[0], group=self.group, grade="5")
+        JournalEntry.objects.create(student=self.students[1], group=self.group, grade="2")
+        self.students[1].delete()
+        row = GroupGradeStat.objects.get(group=self.group)
+        self.assertEqual((row.count, row.total, row.n2, row.n5), (1, Decimal("5"), 0, 1))
+
+    def test_endpoints(self):
+        for student, grade in ((self.students[0], "2"), (self.students[1], "5")):
+            for days in range(3):
+                date = timezone.localdate() - timedelta(days=days)
+                JournalEntry.objects.create(student=student, group=self.group, date=date, grade=grade)
+        groups = self.client.get("/api/analytics/groups/").json()
+        self.assertEqual(groups[0]["average"], 3.5)
+        at_risk = self.client.get("/api/analytics/at-risk/").json()
+        self.assertEqual([row["student_id"] for row in at_risk], [self.students[0].id])
+        self.assertEqual(self.client.get("/api/analytics/distribution/").json()["2"], 3)
+        self.assertEqual(len(self.client.get(f"/api/analytics/{self.group.id}/students/").json()), 2)
+        for url in ("/api/analytics/groups/?since=2026-13-01", "/api/analytics/at-risk/?threshold=NaN",
+                    "/api/analytics/at-risk/?threshold=Infinity", "/api/analytics/trends/?group=%C2%B2",
+                    "/api/analytics/at-risk/?min_entries=%C2%B2"):
+            self.assertEqual(self.client.get(url).status_code, 400, url)
+
+
+# =========================
+# VIDEO UPLOAD
+# =========================
+
+class VideoUploadTests(CoreAPITestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.course = Course.objects.create(title="C", slug="c", description="d")
+        self.data = b"0123456789" * 10
+
+    def start(self):
+        resp = self.client.post("/api/video-uploads/", {
+            "course": self.course.id, "title": "Intro", "filename": "intro.mp4",
+            "size": len(self.data), "sha256": hashlib.sha256(self.data).hexdigest(),
+        }, format="json")
+        self.assertEqual(resp.status_code, 201)
+        return f"/api/video-uploads/{resp.json()['id']}/"
+
+    def put(self, url, offset, chunk):
+        return self.client.put(f"{url}?offset={offset}", chunk, content_type="application/octet-stream")
+
+    def test_resumable_upload(self):
+        url = self.start()
+        self.assertEqual(self.put(url, 0, self.data[:40]).json()["offset"], 40)
+        conflict = self.put(url, 0, self.data[:40])
+        self.assertEqual(conflict.status_code, 409)
+        self.assertEqual(self.client.get(url).json()["offset"], 40)
+        self.assertEqual(self.put(url, 40, self.data[40:]).json()["offset"], len(self.data))
+
+        resp = self.client.post(url + "finalize/")
+        self.assertEqual(resp.status_code, 201)
+        video = VideoLesson.objects.get(pk=resp.json()["id"])
+        with video.video_file.open("rb") as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_checksum_mismatch_restarts(self):
+        url = self.start()
+        self.put(url, 0, b"x" * len(self.data))
+        self.assertEqual(self.client.post(url + "finalize/").status_code, 400)
+        self.assertEqual(self.client.get(url).json()["offset"], 0)
+        self.assertFalse(VideoLesson.objects.exists())
+
+    def test_busy_upload_and_bad_offset(self):
+        url = self.start()
+        self.put(url, 0, self.data)
+        upload = VideoUpload.objects.get()
+        lock = upload_dir() / f"{upload.pk}.lock"
+        lock.touch()
+        self.assertEqual(self.client.post(url + "finalize/").status_code, 409)
+        self.assertEqual(self.client.delete(url).status_code, 409)
+        lock.unlink()
+        self.assertEqual(self.put(url, "%C2%B2", b"x").status_code, 400)
+        self.assertEqual(self.client.post(url + "finalize/").status_code, 201)
+
+
+class VideoStreamTests(CoreAPITestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.data = bytes(range(256)) * 4
+        course = Course.objects.create(title="C", slug="c", description="d")
+        video = VideoLesson(course=course, title="V")
+        video.video_file.save("lesson.mp4", ContentFile(self.data))
+        self.url = f"/api/videos/{video.pk}/stream/"
+        self.student = User.objects.create_user("watcher")
+        Enrollment.objects.create(student=self.student, course=course)
+        self.client.force_authenticate(self.student)
+
+    def body(self, resp):
+        return b"".join(resp.streaming_content)
+
+    def test_range_and_conditional_requests(self):
+        full = self.client.get(self.url, HTTP_ACCEPT="video/*")
+        self.assertEqual(full.status_code, 200)
+        self.assertEqual(full["Accept-Ranges"], "bytes")
+        self.assertEqual(self.body(full), self.data)
+
+        part = self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+        self.assertEqual(part.status_code, 206)
+        self.assertEqual(part["Content-Range"], "bytes 100-199/1024")
+        self.assertEqual(self.body(part), self.data[100:200])
+        self.assertEqual(self.body(self.client.get(self.url, HTTP_RANGE="bytes=-24")), self.data[-24:])
+        stale = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"old"')
+        self.assertEqual(stale.status_code, 200)
+
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE="bytes=5000-").status_code, 416)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=full["ETag"]).status_code, 304)
+
+    def test_requires_active_enrollment(self):
+        Enrollment.objects.filter(student=self.student).update(active=False)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_authenticate(None)
+        self.assertIn(self.client.get(self.url).status_code, (401, 403))
+
+    @override_settings(MEDIA_SENDFILE="nginx")
+    def test_sendfile_offload(self):
+        resp = self.client.get(self.url)
+        self.assertTrue(resp["X-Accel-Redirect"].startswith("/protected-media/video_lessons/lesson"))
+        self.assertEqual(resp.content, b"")
+
+        # кириллица в имени — заголовок percent-кодирован
+        VideoLesson.objects.get().video_file.save("Урок_1.mp4", ContentFile(self.data))
+        self.assertTrue(self.client.get(self.url)["X-Accel-Redirect"].startswith(
+            "/protected-media/video_lessons/%D0%A3%D1%80%D0%BE%D0%BA_1"
+        ))
+        with override_settings(MEDIA_SENDFILE="apache"):
+            self.assertIn("/video_lessons/%D0%A3%D1%80%D0%BE%D0%BA_1", self.client.get(self.url)["X-Sendfile"])
+
+    def test_hls_available_once_ready(self):
+        video = VideoLesson.objects.get()
+        hls = f"/api/videos/{video.pk}/hls/master.m3u8"
+        self.assertIsNone(self.client.get(f"/api/videos/{video.pk}/").json()["hls_url"])
+        self.assertEqual(self.client.get(hls).status_code, 404)
+
+        hls_dir(video.pk).mkdir(parents=True)
+        (hls_dir(video.pk) / "master.m3u8").write_text("#EXTM3U\n")
+        VideoLesson.objects.filter(pk=video.pk).update(hls_status="ready")
+        self.assertTrue(self.client.get(f"/api/videos/{video.pk}/").json()["hls_url"].endswith(hls))
+        self.assertEqual(self.body(self.client.get(hls)), b"#EXTM3U\n")
+
+
+class TranscodeTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        course = Course.objects.create(title="C", slug="c", description="d")
+        self.video = VideoLesson(course=course, title="V")
+        self.video.video_file.save("lesson.mp4", ContentFile(b"video"))
+        self.statuses = []
+
+    def fake_run(self, height=720, fail=None):
+        def run(args, **kwargs):
+            self.statuses.append(VideoLesson.objects.get(pk=self.video.pk).hls_status)
+            if args[0] == settings.FFPROBE_BINARY:
+                stdout = json.dumps({"streams": [{"width": height * 16 // 9, "height": height}]})
+                return subprocess.CompletedProcess(args, 0, stdout, "")
+            if fail and args[-1].endswith(fail):
+                return subprocess.CompletedProcess(args, 1, "", "encoder error")
+            Path(args[-1]).write_bytes(b"out")
+            return subprocess.CompletedProcess(args, 0, "", "")
+        return mock.patch("core.transcode.subprocess.run", side_effect=run)
+
+    def test_plan_renditions(self):
+        self.assertEqual([r[0] for r in plan_renditions(720)], ["360p", "480p", "720p"])
+        self.assertEqual([r[0] for r in plan_renditions(240)], ["360p"])
+
+    def test_ready_with_master_playlist(self):
+        with self.fake_run(height=720):
+            transcode_video(self.video.pk)
+        video = VideoLesson.objects.get()
+        self.assertEqual(set(self.statuses), {"processing"})
+        self.assertEqual(video.hls_status, "ready")
+        self.assertEqual(video.poster, f"video_posters/{video.pk}.jpg")
+        # 1080p выше исходника — пропущена
+        self.assertEqual([(r["name"], r["status"]) for r in video.hls_renditions],
+                         [("360p", "ready"), ("480p", "ready"), ("720p", "ready")])
+        self.assertEqual((hls_dir(video.pk) / "master.m3u8").read_text().splitlines(), [
+            "#EXTM3U", "#EXT-X-VERSION:3",
+            "#EXT-X-STREAM-INF:BANDWIDTH=896000,RESOLUTION=640x360", "360p.m3u8",
+            "#EXT-X-STREAM-INF:BANDWIDTH=1528000,RESOLUTION=854x480", "480p.m3u8",
+            "#EXT-X-STREAM-INF:BANDWIDTH=2928000,RESOLUTION=1280x720", "720p.m3u8",
+        ])
+
+    def test_failed_rendition(self):
+        with self.fake_run(height=720, fail="480p.m3u8"), self.assertRaises(TranscodeError):
+            transcode_video(self.video.pk)
+        video = VideoLesson.objects.get()
+        self.assertEqual(video.hls_status, "failed")
+        self.assertEqual([r["status"] for r in video.hls_renditions], ["ready", "failed", "pending"])
+        self.assertFalse((hls_dir(video.pk) / "master.m3u8").exists())
+
+    def test_write_master_playlist(self):
+        out_dir = Path(settings.MEDIA_ROOT)
+        write_master_playlist(out_dir, [{"name": "360p", "height": 360, "bandwidth": 896000}], 4 / 3)
+        self.assertEqual((out_dir / "master.m3u8").read_text(),
+                         "#EXTM3U\n#EXT-X-VERSION:3\n#EXT-X-STREAM-INF:BANDWIDTH=896000,RESOLUTION=480x360\n360p.m3u8\n")
+
+
+# =========================
+# COVER RENDITIONS
+# =========================
+
+def png_file(name, size):
+    buffer = BytesIO()
+    Image.new("RGBA", size, (200, 40, 40, 128)).save(buffer, "PNG")
+    return ContentFile(buffer.getvalue(), name=name)
+
+
+class CoverRenditionTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        caches[settings.CATALOGUE_CACHE_ALIAS].clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course = Course.objects.create(title="C", slug="c", description="d",
+                                                cover=png_file("c.png", (800, 400)))
+
+    def run_jobs(self):
+        call_command("run_jobs", workers=0, once=True, stdout=StringIO())
+
+    def test_renditions_built_by_worker(self):
+        self.assertIsNone(APIClient().get("/api/courses/").json()["results"][0]["cover_srcset"])
+        self.run_jobs()
+        renditions = Course.objects.get().cover_renditions
+        self.assertEqual(renditions["source"], self.course.cover.name)
+        # 960 и 1280 шире оригинала
+        self.assertEqual([(r["width"], r["height"]) for r in renditions["webp"]], [(320, 160), (640, 320)])
+        for name in rendition_names(renditions):
+            self.assertRegex(name, r"^course_covers/c\.\d+w\.[0-9a-f]{12}\.(webp|jpeg)$")
+            self.assertTrue(default_storage.exists(name))
+
+        srcset = APIClient().get("/api/courses/").json()["results"][0]["cover_srcset"]
+        self.assertEqual(srcset["src"], default_storage.url(renditions["jpeg"][1]["name"]))
+        self.assertEqual(srcset["webp"].count("w, "), 1)
+        self.assertEqual((srcset["width"], srcset["height"]), (800, 400))
+
+        name = renditions["webp"][0]["name"]
+        response = serve_public_media(RequestFactory().get("/media/" + name), name)
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_new_cover_replaces_renditions(self):
+        self.run_jobs()
+        old = rendition_names(Course.objects.get().cover_renditions)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.cover = png_file("c2.png", (400, 200))
+            self.course.save()
+        stale = Course.objects.get()
+        self.run_jobs()
+        renditions = Course.objects.get().cover_renditions
+        self.assertEqual(len(renditions["jpeg"]), 1)
+        self.assertFalse(any(default_storage.exists(name) for name in old))
+        # save() устаревшего экземпляра не затирает готовые версии
+        stale.title = "C2"
+        stale.save()
+        self.assertEqual(Course.objects.get().cover_renditions, renditions)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.cover = None
+            self.course.save()
+        self.run_jobs()
+        self.assertEqual(Course.objects.get().cover_renditions, {})
+
+
+# =========================
+# STATIC ASSETS
+# =========================
+
+class StaticPipelineTests(TestCase):
+    def test_minify(self):
+        self.assertEqual(minify_css("/* x */\na , b {\n  color : red;\n}\n"), "a,b{color :red}\n")
+
+    def test_minify_js_keeps_multiline_literals(self):
+        if rjsmin is None:
+            self.skipTest("rjsmin не установлен")
+        literal = "`\n  // не комментарий\n`"
+        minified = minified_bytes("x.js", f"const a = {literal};\n  f(a)\n".encode())
+        self.assertIn(literal.encode(), minified)
+
+    def test_collectstatic_hashes_and_compresses(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        storages = {**settings.STORAGES, "staticfiles": {
+            "BACKEND": "core.staticfiles.CompressedManifestStaticFilesStorage",
+        }}
+        # BASE_DIR="/" — как будто пакеты лежат в .venv внутри проекта
+        with override_settings(STATIC_ROOT=root, STORAGES=storages, BASE_DIR="/"):
+            call_command("collectstatic", interactive=False, verbosity=0)
+            name = staticfiles_storage.stored_name("js/admin_panel.js")
+            self.assertRegex(name, r"^js/admin_panel\.[0-9a-f]{12}\.js$")
+            self.assertTrue(staticfiles_storage.exists(name + ".gz"))
+            # хэш в имени — от итоговых байт; свой CSS минифицирован, статика пакетов — нет
+            for source in ("js/admin_panel.js", "css/main.css"):
+                stored = staticfiles_storage.stored_name(source)
+                with staticfiles_storage.open(stored) as f:
+                    data = f.read()
+                self.assertIn(hashlib.md5(data).hexdigest()[:12], stored)
+            self.assertFalse(any(line.startswith(b" ") for line in data.splitlines()))
+            admin_js = staticfiles_storage.stored_name("admin/js/core.js")
+            with staticfiles_storage.open(admin_js) as f, open(finders.find("admin/js/core.js"), "rb") as source:
+                self.assertEqual(f.read(), source.read())
+
+            request = RequestFactory().get("/static/" + name, HTTP_ACCEPT_ENCODING="gzip, deflate")
+            response = serve_static(request, name)
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertEqual(response["Content-Type"], "text/javascript")
+            self.assertIn("immutable", response["Cache-Control"])
+            response.close()
+
+            response = serve_static(RequestFactory().get("/static/js/admin_panel.js"), "js/admin_panel.js")
+            self.assertFalse(response.has_header("Content-Encoding"))
+            self.assertEqual(response["Cache-Control"], "no-cache")
+            response.close()
+
+
+# =========================
+# JOB QUEUE
+# =========================
+
+CALLS = []
+
+
+@task("test_record")
+def record_call(value):
+    if value == "boom":
+        raise RuntimeError(value)
+    CALLS.append(value)
+
+
+class JobQueueTests(TestCase):
+    def run_jobs(self):
+        call_command("run_jobs", workers=0, once=True, stdout=StringIO())
+
+    def test_enqueue_waits_for_commit_and_worker_runs_jobs(self):
+        CALLS.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue("test_record", value="a")
+            enqueue("test_record", value="boom")
+            self.assertFalse(Job.objects.exists())
+        with self.assertLogs("core.tasks", "WARNING"):
+            self.run_jobs()
+        self.assertEqual(CALLS, ["a"])
+        retry = Job.objects.get(status="queued")
+        self.assertEqual(retry.attempts, 1)
+        self.assertGreater(retry.run_after, timezone.now())
+        self.assertIn("RuntimeError: boom", retry.error)
+
+        Job.objects.filter(pk=retry.pk).update(run_after=timezone.now(), attempts=4)
+        with self.assertLogs("core.tasks", "ERROR"):
+            self.run_jobs()
+        self.assertEqual(Job.objects.get(pk=retry.pk).status, "failed")
+
+    def test_idempotency_key(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue("test_record", key="once", value="a")
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue("test_record", key="once", value="a")
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_new_video_schedules_transcoding(self):
+        course = Course.objects.create(title="C", slug="c", description="d")
+        with self.captureOnCommitCallbacks(execute=True):
+            video = VideoLesson.objects.create(course=course, title="V", video_file="v.mp4")
+        job = Job.objects.get()
+        self.assertEqual((job.name, job.payload), ("transcode_video", {"video_id": video.pk}))
+        self.assertIn("transcode_video", TASKS)
+
+    @override_settings(APPLICATION_NOTIFY_EMAILS=["office@example.com"])
+    def test_application_email_sent_by_worker(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Application.objects.create(full_name="Иван", email="ivan@example.com")
+        self.assertEqual(len(mail.outbox), 0)
+        self.run_jobs()
+        self.assertEqual(mail.outbox[0].to, ["office@example.com"])
+
+
+# =========================
+# CERTIFICATES
+# =========================
+
+class CertificateIssueTests(CoreAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.course = Course.objects.create(title="C", slug="c", description="d")
+        users = User.objects.bulk_create([User(username=f"grad{i}") for i in range(30)])
+        Enrollment.objects.bulk_create([Enrollment(student=u, course=self.course) for u in users])
+
+    def test_number_format(self):
+        self.assertEqual(format_number(1234), "TS-000001234-4")
+        self.assertTrue(is_valid_number("TS-000001234-4"))
+        self.assertFalse(is_valid_number("TS-000001243-4"))
+        self.assertFalse(is_valid_number("TS-00000123²-4"))
+        self.assertEqual(reserve_numbers(2), [format_number(1), format_number(2)])
+
+    def test_bulk_issue_skips_existing_and_scales(self):
+        first = Enrollment.objects.order_by("pk").first()
+        issue_certificate_for_enrollment(first)
+        with CaptureQueriesContext(connection) as queries:
+            issued, skipped = issue_certificates(course_enrollments(self.course), batch_size=10)
+        self.assertEqual((issued, skipped), (29, 1))
+        self.assertLess(len(queries), 20)
+        numbers = list(Certificate.objects.values_list("cert_number", flat=True))
+        self.assertEqual(len(set(numbers)), 30)
+        self.assertTrue(all(is_valid_number(n) for n in numbers))
+        self.assertEqual(issue_certificates(course_enrollments(self.course)), (0, 30))
+
+    def test_issue_endpoint(self):
+        self.assertEqual(self.client.post("/api/certificates/issue/", {"course": self.course.id}).status_code, 403)
+        self.client.force_authenticate(User.objects.create_user("boss", is_staff=True))
+        resp = self.client.post("/api/certificates/issue/", {"course": self.course.id}, format="json")
+        self.assertEqual(resp.json(), {"issued": 30, "skipped": 0})
+        self.assertEqual(self.client.post("/api/certificates/issue/", {}, format="json").status_code, 400)
+
+    def test_issue_enrollment_list(self):
+        self.client.force_authenticate(User.objects.create_user("boss", is_staff=True))
+        ids = list(Enrollment.objects.values_list("pk", flat=True))
+        resp = self.client.post("/api/certificates/issue/", {"enrollments": [ids[0], 0]}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("0", str(resp.json()["enrollments"]))
+        # число запросов не зависит от длины списка
+        resp = self.client.post("/api/certificates/issue/", {"enrollments": ids}, format="json")
+        self.assertEqual(resp.json(), {"issued": 30, "skipped": 0})
+        self.assertLessEqual(int(resp["X-Query-Count"]), int(resp["X-Query-Budget"]))
+
+
+class CertificateVerifyTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.client = APIClient()
+        student = User.objects.create_user("grad", first_name="Анна", last_name="Петрова")
+        course = Course.objects.create(title="Python", slug="py", description="d")
+        enrollment = Enrollment.objects.create(student=student, course=course)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.number = issue_certificate_for_enrollment(enrollment).cert_number
+
+    def test_verify_hits_cache_after_first_lookup(self):
+        url = f"/api/certificates/verify/{self.number}/"
+        self.assertEqual(self.client.get(url).json()["certificate"]["student"], "Анна Петрова")
+        with self.assertNumQueries(0):
+            resp = self.client.get(url).json()
+        token_check = self.client.get("/api/certificates/verify/", {"token": resp["signature"]})
+        self.assertEqual(token_check.json()["certificate"]["number"], self.number)
+        self.assertEqual(self.client.get("/api/certificates/verify/", {"token": "x"}).status_code, 404)
+
+    def test_unknown_numbers(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/certificates/verify/TS-000000099-0/").status_code, 404)
+        missing = format_number(99)
+        self.assertEqual(self.client.get(f"/api/certificates/verify/{missing}/").status_code, 404)
+        with self.assertNumQueries(0):
+            self.client.get(f"/api/certificates/verify/{missing}/")
+
+        # выданный позже номер не должен застрять в негативном кэше
+        course = Course.objects.get()
+        Enrollment.objects.bulk_create([Enrollment(student=User.objects.create_user(f"s{i}"), course=course)
+                                        for i in range(98)])
+        with self.captureOnCommitCallbacks(execute=True):
+            issue_certificates(course_enrollments(course))
+        self.assertEqual(self.client.get(f"/api/certificates/verify/{missing}/").status_code, 200)
+
+    def test_rate_limited(self):
+        with mock.patch.object(ScopedRateThrottle, "THROTTLE_RATES", {"certificate_verify": "2/min"}):
+            codes = [self.client.get(f"/api/certificates/verify/{self.number}/").status_code for _ in range(3)]
+        self.assertEqual(codes, [200, 200, 429])
+
+    def test_by_number(self):
+        resp = self.client.get("/api/certificates/by-number/", {"q": self.number})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["enrollment"]["course"]["slug"], "py")
+        self.assertEqual(self.client.get("/api/certificates/by-number/", {"q": "TS-0"}).status_code, 404)
+        self.assertEqual(self.client.get("/api/certificates/by-number/").status_code, 400)
+
+
+# =========================
+# AUTHENTICATION
+# =========================
+
+class RoleAuthTests(CoreAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_rows(1)
+        self.client.force_authenticate(None)
+        # Profile фикстуры создан сразу после пользователя, токенов у него ещё не было;
+        # иначе отзыв «в ту же секунду» задел бы токены, выданные в тесте
+        TokenRevocation.objects.all().delete()
+        revocations.invalidate()
+        self.addCleanup(revocations.invalidate)
+
+    def role_queries(self, **auth):
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.get("/api/teachers/", **auth)
+        self.assertEqual(resp.status_code, 200)
+        return [q["sql"] for q in queries if "auth_user" in q["sql"] or "core_profile" in q["sql"]]
+
+    def test_jwt_loads_user_and_profiles_in_one_query(self):
+        token = RefreshToken.for_user(self.teacher_user).access_token
+        sql = self.role_queries(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertIn("core_teacherprofile", sql[0])
+        self.assertEqual(len([q for q in sql if 'FROM "auth_user"' in q]), 1)
+
+    def test_session_loads_user_and_profiles_in_one_query(self):
+        self.client.force_login(self.teacher_user)
+        sql = self.role_queries()
+        self.assertEqual(len([q for q in sql if 'FROM "auth_user"' in q]), 1)
+        self.assertIn("core_profile", sql[0])
+
+    def bearer(self, token):
+        return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def test_role_claims_skip_user_queries(self):
+        access = RoleRefreshToken.for_user(users_with_roles().get(pk=self.teacher_user.pk)).access_token
+        self.assertEqual(access["role"], "teacher")
+        sql = self.role_queries(**self.bearer(access))
+        self.assertEqual([q for q in sql if 'FROM "auth_user"' in q or 'FROM "core_profile"' in q], [])
+        resp = self.client.get("/api/journal/", **self.bearer(access))
+        self.assertEqual(resp.status_code, 200)
+
+    def test_role_change_revokes_tokens(self):
+        refresh = RoleRefreshToken.for_user(self.teacher_user)
+        access = refresh.access_token
+        profile = Profile.objects.get(user=self.teacher_user)
+        profile.role = "director"
+        profile.save()
+        self.assertEqual(self.client.get("/api/teachers/", **self.bearer(access)).status_code, 401)
+        self.assertEqual(self.client.post("/api/token/refresh/", {"refresh": str(refresh)}).status_code, 401)
+
+    def test_profile_and_email_edits_keep_tokens(self):
+        refresh = RoleRefreshToken.for_user(self.teacher_user)
+        access = refresh.access_token
+        resp = self.client.patch(f"/api/teachers/{self.teacher.pk}/", {"bio": "Новое"}, **self.bearer(access))
+        self.assertEqual(resp.status_code, 200)
+        Profile.objects.get(user=self.teacher_user).save()
+        user = User.objects.get(pk=self.teacher_user.pk)
+        user.email = "new@example.com"
+        user.save()
+        self.assertEqual(self.client.get("/api/teachers/", **self.bearer(access)).status_code, 200)
+        self.assertEqual(self.client.post("/api/token/refresh/", {"refresh": str(refresh)}).status_code, 200)
+        user.is_active = False
+        user.save()
+        self.assertEqual(self.client.post("/api/token/refresh/", {"refresh": str(refresh)}).status_code, 401)
+
+    def test_logout_revokes_access_and_refresh(self):
+        refresh = RoleRefreshToken.for_user(self.teacher_user)
+        access = refresh.access_token
+        resp = self.client.post("/api/token/revoke/", {"refresh": str(refresh)}, **self.bearer(access))
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(self.client.get("/api/teachers/", **self.bearer(access)).status_code, 401)
+        self.assertEqual(self.client.post("/api/token/refresh/", {"refresh": str(refresh)}).status_code, 401)
+
+
+# =========================
+# BENCHMARK
+# =========================
+
+class BenchmarkTests(TestCase):
+    COUNTS = dict(courses=3, lessons=2, users=12, groups=2, group_size=5, enrollments=2,
+                  certificates=4, journal_entries=25)
+
+    def test_dataset_and_endpoint_measurements(self):
+        fixtures = generate_dataset(self.COUNTS, seed=1)
+        self.assertEqual(Lesson.objects.count(), 6)
+        self.assertEqual(Enrollment.objects.count(), 24)
+        self.assertEqual(JournalEntry.objects.count(), 25)
+        self.assertEqual(Course.objects.get(pk=fixtures["course"].pk).lessons_count, 2)
+        self.assertEqual(call_command("rebuild_course_counters", "--check", stdout=StringIO()), None)
+
+        endpoints = (("journal", "/api/journal/", "teacher"), ("courses", "/api/courses/?b={i}", None))
+        results = run_endpoints(fixtures, requests=3, warmup=1, endpoints=endpoints)
+        self.assertEqual(results["journal"]["status"], [200])
+        self.assertGreater(results["journal"]["bytes"], 0)
+        self.assertLessEqual(results["courses"]["p50_ms"], results["courses"]["p99_ms"])
+
+        old = {"scales": {"small": {"endpoints": results}}}
+        slower = {name: {**row, "p95_ms": row["p95_ms"] * 2 + 1} for name, row in results.items()}
+        self.assertEqual(compare_results(old, old), [])
+        regressions = compare_results(old, {"scales": {"small": {"endpoints": slower}}})
+        self.assertEqual(sorted(r[1] for r in regressions), ["courses", "journal"])
+
+
+class SeedTests(TestCase):
+    ARGS = ["--users", "10", "--courses", "3", "--lessons", "2", "--groups", "2", "--group-size", "4",
+            "--certificates", "5", "--journal-entries", "30"]
+
+    def seed(self, *args):
+        call_command("seed_techschool", *self.ARGS, *args, stdout=StringIO())
+
+    def test_seed_is_deterministic_and_bypasses_signals(self):
+        self.seed("--prefix", "a", "--seed", "7")
+        self.seed("--prefix", "b", "--seed", "7")
+        titles = lambda prefix: list(
+            Course.objects.filter(slug__startswith=prefix).order_by("pk").values_list("title", "price")
+        )
+        self.assertEqual(titles("a-"), titles("b-"))
+        # по одному профилю на пользователя, хотя сигнал не срабатывал
+        self.assertEqual(TeacherProfile.objects.filter(user__username__startswith="a_").count(), 11)
+        self.assertEqual(Certificate.objects.filter(record__isnull=False).count(), 10)
+        self.assertEqual(JournalEntry.objects.count(), 60)
+        call_command("rebuild_course_counters", "--check", stdout=StringIO())
+        with self.assertRaises(CommandError):
+            self.seed("--prefix", "a")
+
+
+# =========================
+# DATABASE PROFILE
+# =========================
+
+class DatabaseProfileTests(TestCase):
+    def test_sqlite_pragmas_applied_on_connect(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("sqlite only")
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute("PRAGMA temp_store")
+            self.assertEqual(cursor.fetchone()[0], 2)  # MEMORY
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertGreater(cursor.fetchone()[0], 0)
+
+    def test_replica_router(self):
+        router = ReplicaRouter()
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Course), "default")
+            with mock.patch("core.dbrouters.has_replica", return_value=True):
+                self.assertEqual(router.db_for_read(Course), REPLICA_DB_ALIAS)
+                self.assertEqual(router.db_for_write(Course), "default")
+                with primary_reads():
+                    self.assertEqual(router.db_for_read(Course), "default")
+        with mock.patch("core.dbrouters.has_replica", return_value=True):
+            self.assertEqual(router.db_for_read(Course), "default")
+            self.assertFalse(router.allow_migrate(REPLICA_DB_ALIAS, "core"))
+
+    def test_catalogue_cache_filled_from_primary(self):
+        caches[settings.CATALOGUE_CACHE_ALIAS].clear()
+        Course.objects.create(title="C", slug="c", description="d")
+        # алиаса replica в тестах нет: запрос к нему упал бы
+        with mock.patch("core.dbrouters.has_replica", return_value=True):
+            self.assertEqual(self.client.get("/api/courses/").status_code, 200)
+            self.assertEqual(self.client.get("/api/courses/c/").status_code, 200)
+
+    def test_catalogue_cache_filled_from_caught_up_replica(self):
+        caches[settings.CATALOGUE_CACHE_ALIAS].clear()
+        Course.objects.create(title="C", slug="c", description="d")
+        with mock.patch("core.catalogue_cache.primary_position", return_value="0/16B"):
+            bump_list()
+        with mock.patch("core.catalogue_cache.replica_caught_up", return_value=False) as caught_up:
+            self.assertEqual(self.client.get("/api/courses/").status_code, 200)
+        caught_up.assert_called_once_with("0/16B")
+        # догнавшая реплика читается; алиаса в тестах нет — отсюда ошибка
+        with mock.patch("core.dbrouters.has_replica", return_value=True), \
+                mock.patch("core.catalogue_cache.replica_caught_up", return_value=True):
+            with self.assertRaises(ConnectionDoesNotExist):
+                self.client.get("/api/courses/?page_size=10")
@@ -0,0 +1,154 @@
+# core/transcode.py
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+from django.conf import settings
+
+from .models import VideoLesson
+from .tasks import task
+
+HLS_DIR = "video_hls"
+POSTER_DIR = "video_posters"
+MASTER_PLAYLIST = "master.m3u8"
+SEGMENT_SECONDS = 6
+
+
+# =========================
+# HLS-ВЕРСИИ ВИДЕОУРОКА
+# =========================
+# Задача transcode_video (очередь core/tasks.py) делает из исходника
+# несколько HLS-версий и постер локальным ffmpeg:
+#
+#   MEDIA_ROOT/video_hls/<id>/360p.m3u8, 360p_0000.ts, ...
+#   MEDIA_ROOT/video_hls/<id>/master.m3u8   — адаптивный плейлист
+#   MEDIA_ROOT/video_posters/<id>.jpg
+#
+# Версии выше разрешения исходника пропускаются (самая младшая
+# делается всегда). Статус каждой версии пишется в
+# VideoLesson.hls_renditions, общий — в hls_status; master.m3u8
+# появляется последним, поэтому ready значит «все версии на диске».
+
+RENDITIONS = (
+    # имя, высота, битрейт видео, битрейт аудио
+    ("360p", 360, 800_000, 96_000),
+    ("480p", 480, 1_400_000, 128_000),
+    ("720p", 720, 2_800_000, 128_000),
+    ("1080p", 1080, 5_000_000, 192_000),
+)
+
+
+class TranscodeError(Exception):
+    pass
+
+
+def hls_dir(video_id):
+    return Path(settings.MEDIA_ROOT) / HLS_DIR / str(video_id)
+
+
+def _run(args):
+    try:
+        result = subprocess.run(args, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise TranscodeError(f"{args[0]} не найден, укажите FFMPEG_BINARY/FFPROBE_BINARY")
+    if result.returncode != 0:
+        raise TranscodeError(result.stderr[-2000:])
+    return result.stdout
+
+
+def probe(source):
+    """(ширина, высота) первого видеопотока."""
+    out = _run([
+        settings.FFPROBE_BINARY, "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "stream=width,height", "-of", "json", str(source),
+    ])
+    streams = json.loads(out).get("streams") or []
+    if not streams:
+        raise TranscodeError("в файле нет видеопотока")
+    return streams[0]["width"], streams[0]["height"]
+
+
+def plan_renditions(source_height):
+    planned = [r for r in RENDITIONS if r[1] <= source_height]
+    return planned or list(RENDITIONS[:1])
+
+
+def transcode_rendition(source, out_dir, name, height, video_rate, audio_rate):
+    _run([
+        settings.FFMPEG_BINARY, "-y", "-v", "error", "-i", str(source),
+        "-vf", f"scale=-2:{height}",
+        "-c:v", "libx264", "-preset", "veryfast", "-profile:v", "main",
+        "-b:v", str(video_rate), "-maxrate", str(int(video_rate * 1.07)),
+        "-bufsize", str(video_rate * 2),
+        # ключевой кадр на границе каждого сегмента — иначе плеер не переключит версию
+        "-force_key_frames", f"expr:gte(t,n_forced*{SEGMENT_SECONDS})",
+        "-c:a", "aac", "-b:a", str(audio_rate), "-ac", "2",
+        "-f", "hls", "-hls_time", str(SEGMENT_SECONDS), "-hls_playlist_type", "vod",
+        "-hls_segment_filename", str(out_dir / f"{name}_%04d.ts"),
+        str(out_dir / f"{name}.m3u8"),
+    ])
+
+
+def make_poster(source, target):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    _run([
+        settings.FFMPEG_BINARY, "-y", "-v", "error", "-i", str(source),
+        # thumbnail выбирает характерный кадр, а не чёрный первый
+        "-vf", "thumbnail,scale=640:-2", "-frames:v", "1", str(target),
+    ])
+
+
+def write_master_playlist(out_dir, renditions, aspect):
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+    for item in renditions:
+        width = int(round(item["height"] * aspect / 2)) * 2
+        lines.append(
+            f"#EXT-X-STREAM-INF:BANDWIDTH={item['bandwidth']},RESOLUTION={width}x{item['height']}"
+        )
+        lines.append(f"{item['name']}.m3u8")
+    tmp = out_dir / (MASTER_PLAYLIST + ".tmp")
+    tmp.write_text("\n".join(lines) + "\n")
+    tmp.replace(out_dir / MASTER_PLAYLIST)
+
+
+def _set_status(video_id, **fields):
+    VideoLesson.objects.filter(pk=video_id).update(**fields)
+
+
+@task("transcode_video", max_attempts=2)
+def transcode_video(video_id):
+    video = VideoLesson.objects.filter(pk=video_id).only("video_file").first()
+    if video is None or not video.video_file:
+        return
+    source = Path(video.video_file.path)
+    out_dir = hls_dir(video_id)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    out_dir.mkdir(parents=True)
+    _set_status(video_id, hls_status="processing", hls_renditions=[])
+
+    try:
+        width, height = probe(source)
+        planned = plan_renditions(height)
+        renditions = [
+            {"name": name, "height": h, "bandwidth": v + a, "status": "pending"}
+            for name, h, v, a in planned
+        ]
+        _set_status(video_id, hls_renditions=renditions)
+        for item, rendition in zip(renditions, planned):
+            try:
+                transcode_rendition(source, out_dir, *rendition)
+            except TranscodeError:
+                item["status"] = "failed"
+                _set_status(video_id, hls_renditions=renditions)
+                raise
+            item["status"] = "ready"
+            _set_status(video_id, hls_renditions=renditions)
+
+        poster = f"{POSTER_DIR}/{video_id}.jpg"
+        make_poster(source, Path(settings.MEDIA_ROOT) / poster)
+        write_master_playlist(out_dir, renditions, width / height)
+    except Exception:
+        _set_status(video_id, hls_status="failed")
+        raise
+    _set_status(video_id, hls_status="ready", poster=poster)
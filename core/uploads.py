@@ -0,0 +1,151 @@
+# core/uploads.py
+import hashlib
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.text import get_valid_filename
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import VideoLesson
+
+UPLOAD_DIR = "video_lessons"
+READ_BLOCK = 1024 * 1024
+STALE_LOCK_SECONDS = 10 * 60
+
+
+# =========================
+# ЗАГРУЗКА ВИДЕО ПО ЧАСТЯМ
+# =========================
+# 1. POST   /api/video-uploads/                 — метаданные, size, sha256
+# 2. PUT    /api/video-uploads/<id>/?offset=N   — тело запроса дописывается в .part
+# 3. GET    /api/video-uploads/<id>/            — текущий offset (для докачки)
+# 4. POST   /api/video-uploads/<id>/finalize/   — проверка sha256, создание VideoLesson
+#
+# Тело чанка читается из потока блоками по 1 МБ и сразу пишется на диск,
+# поэтому память воркера не зависит от размера файла. Запись чанка,
+# finalize и удаление идут под одной блокировкой; пока работа идёт,
+# блокировка обновляет mtime после каждого блока и не считается брошенной.
+
+class UploadConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Конфликт загрузки."
+
+
+class ChunkTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Слишком большой чанк."
+
+
+def upload_dir():
+    return Path(settings.MEDIA_ROOT) / UPLOAD_DIR / ".uploads"
+
+
+def part_path(upload):
+    return upload_dir() / f"{upload.pk}.part"
+
+
+def current_offset(upload):
+    try:
+        return part_path(upload).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+class _ChunkLock:
+    """Одна операция на загрузку за раз; O_EXCL работает на любой ОС."""
+
+    def __init__(self, upload):
+        self.path = upload_dir() / f"{upload.pk}.lock"
+
+    def __enter__(self):
+        try:
+            if time.time() - self.path.stat().st_mtime > STALE_LOCK_SECONDS:
+                self.path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
+        try:
+            os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            raise UploadConflict("Загрузка занята другим запросом.")
+        return self
+
+    def refresh(self):
+        os.utime(self.path)
+
+    def __exit__(self, *exc):
+        self.path.unlink(missing_ok=True)
+
+
+def append_chunk(upload, stream, offset, length):
+    if length is None:
+        raise ValidationError({"detail": "нужен заголовок Content-Length"})
+    if length > settings.VIDEO_UPLOAD_MAX_CHUNK:
+        raise ChunkTooLarge()
+
+    upload_dir().mkdir(parents=True, exist_ok=True)
+    with _ChunkLock(upload) as lock:
+        received = current_offset(upload)
+        if offset != received:
+            raise UploadConflict({"detail": "неверный offset", "offset": received})
+        if received + length > upload.size:
+            raise ValidationError({"detail": "чанк выходит за объявленный размер файла"})
+
+        written = 0
+        with open(part_path(upload), "ab") as part:
+            while written < length:
+                block = stream.read(min(READ_BLOCK, length - written))
+                if not block:
+                    break
+                part.write(block)
+                written += len(block)
+                lock.refresh()
+    return received + written
+
+
+def file_sha256(path, lock=None):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_BLOCK), b""):
+            digest.update(block)
+            if lock is not None:
+                lock.refresh()
+    return digest.hexdigest()
+
+
+def finalize_upload(upload):
+    upload_dir().mkdir(parents=True, exist_ok=True)
+    with _ChunkLock(upload) as lock:
+        return _finalize_locked(upload, lock)
+
+
+def _finalize_locked(upload, lock):
+    path = part_path(upload)
+    received = current_offset(upload)
+    if received != upload.size:
+        raise UploadConflict({"detail": "файл загружен не полностью", "offset": received})
+    if file_sha256(path, lock) != upload.sha256.lower():
+        path.unlink(missing_ok=True)
+        raise ValidationError({"detail": "контрольная сумма не совпала, загрузите файл заново"})
+
+    name = default_storage.get_available_name(
+        f"{UPLOAD_DIR}/{get_valid_filename(upload.filename)}"
+    )
+    os.replace(path, default_storage.path(name))
+    with transaction.atomic():
+        video = VideoLesson.objects.create(
+            course=upload.course, title=upload.title, video_file=name, teacher=upload.teacher
+        )
+        upload.delete()
+    return video
+
+
+def discard_upload(upload):
+    upload_dir().mkdir(parents=True, exist_ok=True)
+    with _ChunkLock(upload):
+        part_path(upload).unlink(missing_ok=True)
+        upload.delete()
@@ -1,4 +1,4 @@
-from django.urls import path, include
+from django.urls import path, re_path, include
 from rest_framework import routers
 from django.views.generic import TemplateView
 from django.contrib.auth.decorators import login_required
@@ -30,6 +30,9 @@ router.register(r"directors", views.DirectorProfileViewSet)
 router.register(r"groups", views.StudentGroupViewSet, basename="groups")
 router.register(r"journal", views.JournalEntryViewSet, basename="journal")
 router.register(r"videos", views.VideoLessonViewSet)
+router.register(r"video-uploads", views.VideoUploadViewSet, basename="video-uploads")
+router.register(r"exports", views.ExportViewSet, basename="exports")
+router.register(r"analytics", views.AnalyticsViewSet, basename="analytics")
 
 # Admin API
 router.register(r"admin/applications", AdminApplicationViewSet, basename="admin-applications")
@@ -58,8 +61,8 @@ schema_view = get_schema_view(
 urlpatterns = [
     # -------- HTML --------
     path("", TemplateView.as_view(template_name="home.html"), name="home"),
-    path("courses/", TemplateView.as_view(template_name="courses_list.html"), name="courses_list"),
-    path("courses/<slug:slug>/", TemplateView.as_view(template_name="course_detail.html"), name="course_detail"),
+    path("courses/", views.CourseListPage.as_view(), name="courses_list"),
+    path("courses/<slug:slug>/", views.CourseDetailPage.as_view(), name="course_detail"),
 
     # ====== УЧИТЕЛЬ (только после логина) ======
     path(
@@ -95,6 +98,18 @@ urlpatterns = [
     ),
 
     # -------- API --------
+    path("api/certificates/verify/", views.CertificateVerifyView.as_view(), name="certificate-verify-token"),
+    path(
+        "api/certificates/verify/<str:number>/",
+        views.CertificateVerifyView.as_view(),
+        name="certificate-verify",
+    ),
+    path("api/search/", views.SearchView.as_view(), name="search"),
+    re_path(
+        r"^api/videos/(?P<pk>\d+)/hls/(?P<name>[\w-]+\.(?:m3u8|ts))$",
+        views.video_hls,
+        name="videolesson-hls",
+    ),
     path("api/", include(router.urls)),
 
     # Browsable API login
@@ -103,6 +118,7 @@ urlpatterns = [
     # JWT
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/token/revoke/", views.TokenRevokeView.as_view(), name="token_revoke"),
 
     # -------- SWAGGER --------
     path("swagger.json", schema_view.without_ui(cache_timeout=0), name="schema-json"),
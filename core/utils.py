@@ -1,8 +1,24 @@
 # core/utils.py
-import uuid
-from .models import Certificate
+from .certificates import reserve_numbers
+from .models import Certificate, Enrollment
+from .tasks import enqueue, task
 
 def issue_certificate_for_enrollment(enrollment):
-    number = str(uuid.uuid4()).replace('-', '')[:12].upper()
+    # повторный вызов (ретрай задачи) возвращает уже выданный сертификат
+    cert = Certificate.objects.filter(enrollment=enrollment).first()
+    if cert:
+        return cert
+    number, = reserve_numbers(1)
     cert = Certificate.objects.create(enrollment=enrollment, cert_number=number)
     return cert
+
+
+@task("issue_certificate")
+def issue_certificate(enrollment_id):
+    enrollment = Enrollment.objects.filter(pk=enrollment_id).first()
+    if enrollment:
+        issue_certificate_for_enrollment(enrollment)
+
+
+def schedule_certificate(enrollment):
+    enqueue("issue_certificate", key=f"issue_certificate:{enrollment.pk}", enrollment_id=enrollment.pk)
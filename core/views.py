@@ -1,23 +1,59 @@
-from rest_framework import viewsets, permissions, status
+import copy
+import hashlib
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from urllib.parse import urlsplit
+
+from rest_framework import mixins, viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.renderers import JSONRenderer
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db.models.functions import Substr
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.views.generic import TemplateView
 
 from .models import (
     Course, Lesson, Enrollment, Certificate,
     TeacherProfile, DirectorProfile,
-    StudentGroup, JournalEntry, VideoLesson,
+    StudentGroup, JournalEntry, VideoLesson, VideoUpload,
     Application
 )
 
+from .auth import get_role, revoke_token
+from .queryplan import QueryPlanMixin, QueryBudgetMixin
+from .catalogue_filters import (
+    DEFAULT_ORDERING, apply_filters, course_facets, parse_filters, parse_ordering,
+)
+from .catalogue_cache import (
+    LIST_VERSION_KEY, CatalogueCacheMixin, course_version_key, get_cache, get_version, get_versions,
+)
+from .dbrouters import ReplicaReadMixin
+from .exports import EXPORT_FORMATS, export_response
+from . import analytics
 from .serializers import (
     CourseListSerializer, CourseDetailSerializer,
-    LessonSerializer, EnrollmentSerializer, CertificateSerializer,
+    LessonListSerializer, LessonSerializer, EnrollmentSerializer, CertificateSerializer,
     TeacherProfileSerializer, DirectorProfileSerializer,
     StudentGroupSerializer, JournalEntrySerializer,
-    VideoLessonSerializer, UserSerializer, ApplicationSerializer
+    VideoLessonSerializer, UserSerializer, ApplicationSerializer,
+    JournalBulkSerializer, VideoUploadSerializer, CertificateIssueSerializer
 )
+from .certificates import issue_certificates, verify_number, verify_signature
+from .media import serve_file
+from .search import search
+from .transcode import HLS_DIR
+from .uploads import append_chunk, discard_upload, finalize_upload
 
 # =========================
 # PERMISSIONS
@@ -30,64 +66,261 @@ class IsAdmin(permissions.BasePermission):
 
 class IsTeacher(permissions.BasePermission):
     def has_permission(self, request, view):
-        return (
-            request.user.is_authenticated and
-            hasattr(request.user, 'profile') and
-            request.user.profile.role == 'teacher'
-        )
+        return get_role(request.user) == 'teacher'
 
 
 class IsDirector(permissions.BasePermission):
     def has_permission(self, request, view):
-        return (
-            request.user.is_authenticated and
-            hasattr(request.user, 'profile') and
-            request.user.profile.role == 'director'
-        )
+        return get_role(request.user) == 'director'
+
+
+class CanWatchVideo(permissions.BasePermission):
+    """Видеоурок смотрят записанные на курс, его автор, директор и админ."""
+
+    def has_permission(self, request, view):
+        return request.user.is_authenticated
+
+    def has_object_permission(self, request, view, obj):
+        user = request.user
+        if user.is_staff or get_role(user) == 'director':
+            return True
+        if obj.teacher_id and obj.teacher.user_id == user.id:
+            return True
+        return Enrollment.objects.filter(student=user, course_id=obj.course_id, active=True).exists()
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """Плеер шлёт Accept: video/*, а отвечаем мы не рендерером, а файлом."""
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return (renderers[0], renderers[0].media_type)
+
+
+# =========================
+# AUTH
+# =========================
+
+class TokenRevokeView(APIView):
+    """Выход: отзывает текущий access-токен и, если передан, refresh."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        if request.auth is not None:
+            revoke_token(request.auth)
+        raw_refresh = request.data.get("refresh")
+        if raw_refresh:
+            try:
+                refresh = RefreshToken(raw_refresh)
+            except TokenError as exc:
+                raise ValidationError({"refresh": str(exc)})
+            if str(refresh.get("user_id")) != str(request.user.pk):
+                raise ValidationError({"refresh": "Токен другого пользователя."})
+            revoke_token(refresh)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 # =========================
 # ADMIN
 # =========================
 
-class AdminApplicationViewSet(viewsets.ModelViewSet):
+class AdminApplicationViewSet(QueryBudgetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Application.objects.order_by('-created_at')
     serializer_class = ApplicationSerializer
     permission_classes = [IsAdmin]
+    query_budget = 4
+    cursor_ordering = ("-created_at", "-id")
 
 
-class AdminUserViewSet(viewsets.ModelViewSet):
+class AdminUserViewSet(QueryBudgetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAdmin]
+    query_budget = 4
+    cursor_ordering = ("id",)
 
 
 # =========================
 # COURSES
 # =========================
 
-class CourseViewSet(viewsets.ModelViewSet):
-    queryset = Course.objects.all().prefetch_related("lessons")
+class CourseViewSet(QueryBudgetMixin, ReplicaReadMixin, CatalogueCacheMixin, QueryPlanMixin,
+                    viewsets.ModelViewSet):
+    """Каталог. Фильтры и ordering списка — см. core/catalogue_filters.py.
+
+    Первая страница списка несёт ещё и "facets": счётчики для панели
+    фильтров, посчитанные с учётом остальных фильтров.
+    """
+    queryset = Course.objects.all()
     lookup_field = "slug"
     permission_classes = [permissions.AllowAny]
+    query_budget = 4
+
+    @property
+    def cursor_ordering(self):
+        if self.action != "list":
+            return ("-created_at", "-id")
+        return parse_ordering(self.request.query_params)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "list":
+            queryset = apply_filters(queryset, parse_filters(self.request.query_params))
+            queryset = queryset.annotate(short=Substr("description", 1, 160))
+        return queryset
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if "cursor" not in self.request.query_params:
+            response.data["facets"] = course_facets(parse_filters(self.request.query_params))
+        return response
 
     def get_serializer_class(self):
         return CourseListSerializer if self.action == "list" else CourseDetailSerializer
 
 
-class LessonViewSet(viewsets.ModelViewSet):
+# =========================
+# HTML-СТРАНИЦЫ КАТАЛОГА
+# =========================
+# Страницы рендерятся на сервере из ответа самого CourseViewSet — те же
+# фильтры, пагинация и кэш каталога, что у /api/courses/. Карточка курса и
+# тело страницы курса — фрагменты {% cache %} под версией курса: её
+# поднимают сигналы изменения Course и Lesson. Дальше («Показать ещё»,
+# фильтры, запись на курс) страница работает через JSON API.
+
+class CoursePageMixin:
+    # условные заголовки браузера относятся к странице, а не к ответу API:
+    # с ними API отдал бы 304 без данных
+    API_DROPPED_HEADERS = ("HTTP_IF_NONE_MATCH", "HTTP_IF_MODIFIED_SINCE")
+
+    def call_api(self, action, **kwargs):
+        request = copy.copy(self.request)
+        request.META = {
+            key: value for key, value in self.request.META.items() if key not in self.API_DROPPED_HEADERS
+        }
+        request.__dict__.pop("headers", None)  # cached_property поверх META
+        view = CourseViewSet.as_view({"get": action}, renderer_classes=[JSONRenderer])
+        return view(request, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["fragment_timeout"] = settings.CATALOGUE_CACHE_TIMEOUT
+        context["fragment_cache"] = settings.CATALOGUE_CACHE_ALIAS
+        return context
+
+
+class CourseListPage(CoursePageMixin, TemplateView):
+    template_name = "courses_list.html"
+
+    def get(self, request, *args, **kwargs):
+        api = self.call_api("list")
+        if api.status_code != status.HTTP_200_OK:
+            return self.render_to_response(
+                self.get_context_data(courses=[], errors=api.data), status=api.status_code
+            )
+        courses = api.data["results"]
+        versions = get_versions([course_version_key(c["slug"]) for c in courses])
+        for course in courses:
+            course["version"] = versions[course_version_key(course["slug"])]
+        next_query = urlsplit(api.data["next"]).query if api.data["next"] else ""
+        return self.render_to_response(self.get_context_data(
+            courses=courses,
+            filters=self.filter_options(api.data.get("facets"), request.GET),
+            next_page=f"{request.path}?{next_query}" if next_query else "",
+            next_api=f"/api/courses/?{next_query}" if next_query else "",
+        ))
+
+    def filter_options(self, facets, params):
+        """Пункты селектов фильтра со счётчиками фасетов и выбранным значением."""
+        options = {"ordering": params.get("ordering") or DEFAULT_ORDERING, "level": [], "price": []}
+        if not facets:  # не первая страница
+            return options
+        price = f"{params.get('price_min', '')}|{params.get('price_max', '')}"
+        for facet in facets["level"]:
+            options["level"].append({
+                "value": facet["value"], "label": f"{facet['label']} ({facet['count']})",
+                "selected": facet["value"] == params.get("level"),
+            })
+        for facet in facets["price"]:
+            value = f"{facet['min']}|{facet['max'] or ''}"
+            options["price"].append({
+                "value": value, "label": f"{facet['label']} ({facet['count']})", "selected": value == price,
+            })
+        return options
+
+
+class CourseDetailPage(CoursePageMixin, TemplateView):
+    template_name = "course_detail.html"
+
+    def get(self, request, slug, *args, **kwargs):
+        api = self.call_api("retrieve", slug=slug)
+        if api.status_code != status.HTTP_200_OK:
+            raise Http404("Курс не найден")
+        return self.render_to_response(self.get_context_data(
+            course=api.data, version=get_version(course_version_key(slug)),
+        ))
+
+
+class SearchView(APIView):
+    """Поиск по курсам и урокам: ?q=, kind=course|lesson, limit (до 50).
+
+    title и snippet — HTML, где совпадения обёрнуты в <mark>, остальное
+    экранировано. Ответы кэшируются под версией каталога, как и список курсов.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    max_limit = 50
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()[:200]
+        kind = request.query_params.get("kind") or None
+        if kind not in (None, "course", "lesson"):
+            raise ValidationError({"kind": "ожидается course или lesson"})
+        try:
+            limit = min(int(request.query_params.get("limit", 20)), self.max_limit)
+        except ValueError:
+            raise ValidationError({"limit": "ожидается число"})
+        if not query:
+            return Response({"query": "", "results": []})
+
+        cache = get_cache()
+        key = "search:%s:%s" % (
+            get_version(LIST_VERSION_KEY),
+            hashlib.md5(f"{kind}|{limit}|{query}".encode()).hexdigest(),
+        )
+        results = cache.get(key)
+        if results is None:
+            results = search(query, kind=kind, limit=max(limit, 1))
+            cache.set(key, results, settings.CATALOGUE_CACHE_TIMEOUT)
+        return Response({"query": query, "results": results})
+
+
+class LessonViewSet(QueryBudgetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Lesson.objects.all()
     serializer_class = LessonSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    query_budget = 3
+    cursor_ordering = ("id",)
+
+    def get_query_budget(self):
+        # правка: урок, проверка order, транзакция с UPDATE и поисковым индексом, slug курса
+        return 6 if self.action in ("update", "partial_update") else self.query_budget
+
+    def get_serializer_class(self):
+        return LessonListSerializer if self.action == "list" else LessonSerializer
 
 
 # =========================
 # ENROLLMENTS
 # =========================
 
-class EnrollmentViewSet(viewsets.ModelViewSet):
+class EnrollmentViewSet(QueryBudgetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     serializer_class = EnrollmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 4
+    cursor_ordering = ("-purchased_at", "-id")
 
     def get_queryset(self):
         user = self.request.user
@@ -103,13 +336,22 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
 # CERTIFICATES
 # =========================
 
-class CertificateViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Certificate.objects.select_related(
-        "enrollment__student",
-        "enrollment__course"
-    )
+class CertificateViewSet(QueryBudgetMixin, QueryPlanMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Certificate.objects.all()
     serializer_class = CertificateSerializer
     permission_classes = [permissions.AllowAny]
+    query_budget = 4
+    cursor_ordering = ("-issued_at", "-id")
+
+    def get_query_budget(self):
+        return 16 if self.action == "issue" else self.query_budget
+
+    @action(detail=False, methods=["post"], permission_classes=[IsAdmin | IsDirector])
+    def issue(self, request):
+        serializer = CertificateIssueSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        issued, skipped = issue_certificates(serializer.get_enrollments())
+        return Response({"issued": issued, "skipped": skipped}, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["get"], url_path="by-number")
     def by_number(self, request):
@@ -120,7 +362,7 @@ class CertificateViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        cert = self.queryset.filter(cert_number=num).first()
+        cert = self.filter_queryset(self.get_queryset()).filter(cert_number=num).first()
         if not cert:
             return Response(
                 {"detail": "not found"},
@@ -130,29 +372,59 @@ class CertificateViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(self.get_serializer(cert).data)
 
 
+class CertificateVerifyView(APIView):
+    """Публичная проверка номера или подписи (?token=) сертификата.
+
+    Без аутентификации и сериализаторов: ответ берётся из кэша или
+    одной строки CertificateRecord. Частота ограничена по IP.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = "certificate_verify"
+
+    def get(self, request, number=None):
+        if number is None:
+            payload = verify_signature(request.query_params.get("token", ""))
+            if payload is None:
+                return Response({"valid": False}, status=status.HTTP_404_NOT_FOUND)
+            return Response({"valid": True, "certificate": payload})
+
+        result = verify_number(number)
+        if result is None:
+            return Response({"valid": False}, status=status.HTTP_404_NOT_FOUND)
+        return Response(result)
+
+
 # =========================
 # TEACHER / DIRECTOR PROFILES
 # =========================
 
-class TeacherProfileViewSet(viewsets.ModelViewSet):
+class TeacherProfileViewSet(QueryBudgetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = TeacherProfile.objects.all()
     serializer_class = TeacherProfileSerializer
     permission_classes = [IsAdmin | IsTeacher]
+    query_budget = 4
+    cursor_ordering = ("id",)
 
 
-class DirectorProfileViewSet(viewsets.ModelViewSet):
+class DirectorProfileViewSet(QueryBudgetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = DirectorProfile.objects.all()
     serializer_class = DirectorProfileSerializer
     permission_classes = [IsAdmin | IsDirector]
+    query_budget = 4
+    cursor_ordering = ("id",)
 
 
 # =========================
 # STUDENT GROUPS
 # =========================
 
-class StudentGroupViewSet(viewsets.ModelViewSet):
+class StudentGroupViewSet(QueryBudgetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     serializer_class = StudentGroupSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 4
+    cursor_ordering = ("id",)
 
     def get_queryset(self):
         user = self.request.user
@@ -170,27 +442,269 @@ class StudentGroupViewSet(viewsets.ModelViewSet):
 # JOURNAL (ОЦЕНКИ)
 # =========================
 
-class JournalEntryViewSet(viewsets.ModelViewSet):
+class JournalEntryViewSet(QueryBudgetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     serializer_class = JournalEntrySerializer
     permission_classes = [permissions.IsAuthenticated, IsTeacher]
+    query_budget = 4
+    cursor_ordering = ("-date", "-id")
 
     def get_queryset(self):
         return JournalEntry.objects.filter(
             group__teacher=self.request.user.teacher_profile
         )
 
+    def get_query_budget(self):
+        return 20 if self.action == "bulk" else self.query_budget
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        serializer = JournalBulkSerializer(
+            data=request.data,
+            context={
+                "request": request,
+                "groups": StudentGroup.objects.filter(teacher=request.user.teacher_profile),
+            },
+        )
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
 
 # =========================
 # VIDEO LESSONS
 # =========================
 
-class VideoLessonViewSet(viewsets.ModelViewSet):
+class VideoLessonViewSet(QueryBudgetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = VideoLesson.objects.all()
     serializer_class = VideoLessonSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    query_budget = 3
+    cursor_ordering = ("-created_at", "-id")
 
     def perform_create(self, serializer):
         if not hasattr(self.request.user, 'teacher_profile'):
-            raise permissions.PermissionDenied("Only teachers can upload videos")
+            raise PermissionDenied("Only teachers can upload videos")
 
         serializer.save(teacher=self.request.user.teacher_profile)
+
+    @action(detail=True, methods=["get"], permission_classes=[CanWatchVideo],
+            content_negotiation_class=IgnoreClientContentNegotiation)
+    def stream(self, request, pk=None):
+        """Файл урока с поддержкой Range/If-Range/ETag (см. core/media.py)."""
+        return serve_file(request, self.get_object().video_file.name)
+
+    def hls(self, request, pk=None, name=None):
+        """Плейлисты и сегменты HLS; относительные ссылки в master.m3u8 ведут сюда же."""
+        video = self.get_object()
+        if video.hls_status != 'ready':
+            raise Http404("HLS-версия ещё не готова")
+        return serve_file(request, f"{HLS_DIR}/{video.pk}/{name}")
+
+
+# без завершающего слэша, иначе относительные URI в плейлистах не разрешатся,
+# поэтому маршрут не через router (см. core/urls.py)
+video_hls = VideoLessonViewSet.as_view(
+    {"get": "hls"},
+    permission_classes=[CanWatchVideo],
+    content_negotiation_class=IgnoreClientContentNegotiation,
+)
+
+
+class VideoUploadViewSet(mixins.CreateModelMixin,
+                         mixins.RetrieveModelMixin,
+                         mixins.DestroyModelMixin,
+                         viewsets.GenericViewSet):
+    """Загрузка видео по частям с докачкой, протокол — в core/uploads.py."""
+    serializer_class = VideoUploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_teacher(self):
+        if not hasattr(self.request.user, 'teacher_profile'):
+            raise PermissionDenied("Only teachers can upload videos")
+        return self.request.user.teacher_profile
+
+    def get_queryset(self):
+        return VideoUpload.objects.filter(teacher=self.get_teacher()).select_related("course", "teacher")
+
+    def perform_create(self, serializer):
+        serializer.save(teacher=self.get_teacher())
+
+    def update(self, request, pk=None):
+        upload = self.get_object()
+        offset = request.query_params.get("offset", "")
+        if not (offset.isascii() and offset.isdecimal()):
+            raise ValidationError({"offset": "ожидается число байт"})
+        length = request.META.get("CONTENT_LENGTH")
+        received = append_chunk(
+            upload,
+            request.stream,
+            int(offset),
+            int(length) if length and length.isascii() and length.isdecimal() else None,
+        )
+        return Response({"id": str(upload.pk), "offset": received, "size": upload.size})
+
+    def perform_destroy(self, instance):
+        discard_upload(instance)
+
+    @action(detail=True, methods=["post"])
+    def finalize(self, request, pk=None):
+        video = finalize_upload(self.get_object())
+        return Response(
+            VideoLessonSerializer(video, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+
+# =========================
+# EXPORTS (CSV / XLSX)
+# =========================
+
+class ExportViewSet(viewsets.ViewSet):
+    """Потоковые выгрузки: ?output=csv|xlsx плюс фильтры.
+
+    Общие фильтры: date_from, date_to (YYYY-MM-DD).
+    journal: group, teacher; enrollments: course (slug), active;
+    applications: course (подстрока).
+    """
+    permission_classes = [IsAdmin | IsDirector]
+
+    def get_output(self):
+        output = self.request.query_params.get("output", "csv")
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({"output": f"один из: {', '.join(EXPORT_FORMATS)}"})
+        return output
+
+    def int_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        # isdigit() пропустил бы «²», на котором int() падает
+        if not (value.isascii() and value.isdecimal()):
+            raise ValidationError({name: "ожидается число"})
+        return int(value)
+
+    def filter_dates(self, queryset, field):
+        params = self.request.query_params
+        for param, lookup in (("date_from", "gte"), ("date_to", "lte")):
+            if params.get(param):
+                try:
+                    value = parse_date(params[param])
+                except ValueError:  # формат верный, а даты нет: 2026-02-30
+                    value = None
+                if value is None:
+                    raise ValidationError({param: "ожидается дата YYYY-MM-DD"})
+                queryset = queryset.filter(**{f"{field}__{lookup}": value})
+        return queryset
+
+    @action(detail=False, methods=["get"])
+    def journal(self, request):
+        queryset = self.filter_dates(JournalEntry.objects.order_by("date", "id"), "date")
+        if self.int_param("group"):
+            queryset = queryset.filter(group_id=self.int_param("group"))
+        if self.int_param("teacher"):
+            queryset = queryset.filter(group__teacher_id=self.int_param("teacher"))
+        return export_response("journal", self.get_output(), [
+            ("Дата", "date"),
+            ("Группа", "group__name"),
+            ("Учитель", "group__teacher__user__username"),
+            ("Студент", "student__username"),
+            ("Оценка", "grade"),
+            ("Комментарий", "comment"),
+        ], queryset)
+
+    @action(detail=False, methods=["get"])
+    def enrollments(self, request):
+        queryset = self.filter_dates(Enrollment.objects.order_by("purchased_at", "id"), "purchased_at__date")
+        if request.query_params.get("course"):
+            queryset = queryset.filter(course__slug=request.query_params["course"])
+        if request.query_params.get("active") in ("true", "false"):
+            queryset = queryset.filter(active=request.query_params["active"] == "true")
+        return export_response("enrollments", self.get_output(), [
+            ("Дата покупки", "purchased_at"),
+            ("Студент", "student__username"),
+            ("Email", "student__email"),
+            ("Курс", "course__title"),
+            ("Активна", "active"),
+        ], queryset)
+
+    @action(detail=False, methods=["get"])
+    def applications(self, request):
+        queryset = self.filter_dates(Application.objects.order_by("created_at", "id"), "created_at__date")
+        if request.query_params.get("course"):
+            queryset = queryset.filter(course__icontains=request.query_params["course"])
+        return export_response("applications", self.get_output(), [
+            ("Дата", "created_at"),
+            ("ФИО", "full_name"),
+            ("Email", "email"),
+            ("Телефон", "phone"),
+            ("Курс", "course"),
+            ("Сообщение", "message"),
+        ], queryset)
+
+
+# =========================
+# ANALYTICS (ДАШБОРД ДИРЕКТОРА)
+# =========================
+
+class AnalyticsViewSet(viewsets.ViewSet):
+    """Сводки по оценкам из GroupGradeStat/StudentGradeStat.
+
+    Период: since, until (YYYY-MM-DD, округляются до месяца).
+    """
+    permission_classes = [IsAdmin | IsDirector]
+
+    def date_param(self, name, default=None):
+        raw = self.request.query_params.get(name)
+        if not raw:
+            return default
+        try:
+            value = parse_date(raw)
+        except ValueError:  # формат верный, а даты нет: 2026-13-01
+            value = None
+        if value is None:
+            raise ValidationError({name: "ожидается дата YYYY-MM-DD"})
+        return value
+
+    def period(self):
+        return {"since": self.date_param("since"), "until": self.date_param("until")}
+
+    def group_param(self):
+        raw = self.request.query_params.get("group")
+        if raw and not (raw.isascii() and raw.isdecimal()):
+            raise ValidationError({"group": "ожидается число"})
+        return int(raw) if raw else None
+
+    @action(detail=False, methods=["get"])
+    def groups(self, request):
+        return Response(analytics.group_averages(**self.period()))
+
+    @action(detail=True, methods=["get"])
+    def students(self, request, pk=None):
+        get_object_or_404(StudentGroup, pk=pk)
+        return Response(analytics.student_averages(pk, **self.period()))
+
+    @action(detail=False, methods=["get"])
+    def distribution(self, request):
+        return Response(analytics.grade_distribution(self.group_param(), **self.period()))
+
+    @action(detail=False, methods=["get"])
+    def trends(self, request):
+        return Response(analytics.grade_trend(self.group_param(), **self.period()))
+
+    @action(detail=False, methods=["get"], url_path="at-risk")
+    def at_risk(self, request):
+        # по умолчанию — текущий и прошлый месяц
+        this_month = timezone.localdate().replace(day=1)
+        default_since = (this_month - timedelta(days=1)).replace(day=1)
+        try:
+            threshold = Decimal(request.query_params.get("threshold", "3"))
+        except InvalidOperation:
+            threshold = None
+        if threshold is None or not threshold.is_finite():  # NaN, Infinity
+            raise ValidationError({"threshold": "ожидается число"})
+        min_entries = request.query_params.get("min_entries", "3")
+        if not (min_entries.isascii() and min_entries.isdecimal()):
+            raise ValidationError({"min_entries": "ожидается число"})
+        return Response(analytics.at_risk_students(
+            self.date_param("since", default_since), threshold, int(min_entries)
+        ))
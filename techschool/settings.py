@@ -78,17 +78,75 @@ WSGI_APPLICATION = 'techschool.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=sqlite (по умолчанию) или postgres. Для postgres:
+#   POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT
+#   DB_POOL=1           — пул соединений psycopg 3 (нужен psycopg[pool])
+#   DB_CONN_MAX_AGE=60  — без пула: постоянные соединения, сек
+#   POSTGRES_REPLICA_HOST — реплика для чтения каталога (core/dbrouters.py)
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "postgres":
+    def postgres_database(host):
+        database = {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("POSTGRES_DB", "techschool"),
+            "USER": os.environ.get("POSTGRES_USER", "techschool"),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": host,
+            "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+            # соединение проверяется перед повторным использованием
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
+        if os.environ.get("DB_POOL") == "1":
+            # с пулом постоянные соединения Django не нужны
+            database["CONN_MAX_AGE"] = 0
+            database["OPTIONS"]["pool"] = {
+                "min_size": int(os.environ.get("DB_POOL_MIN", "2")),
+                "max_size": int(os.environ.get("DB_POOL_MAX", "10")),
+                "timeout": 10,
+            }
+        else:
+            database["CONN_MAX_AGE"] = int(os.environ.get("DB_CONN_MAX_AGE", "60"))
+        return database
+
+    DATABASES = {"default": postgres_database(os.environ.get("POSTGRES_HOST", "localhost"))}
+    if os.environ.get("POSTGRES_REPLICA_HOST"):
+        DATABASES["replica"] = postgres_database(os.environ["POSTGRES_REPLICA_HOST"])
+        DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # WAL (читатели не ждут писателя, писатель не ждёт читателей)
+                # включает миграция 0020 — режим хранится в файле базы.
+                # synchronous=NORMAL в режиме WAL безопасен при сбое процесса
+                "init_command": (
+                    "PRAGMA synchronous=NORMAL;"
+                    "PRAGMA temp_store=MEMORY;"
+                    "PRAGMA cache_size=-20000;"
+                    "PRAGMA mmap_size=134217728;"
+                ),
+                # ждать блокировку до 20 с вместо мгновенного "database is locked"
+                "timeout": 20,
+                # запись берёт блокировку в начале транзакции, а не при первом
+                # UPDATE — иначе две транзакции журнала получают SQLITE_BUSY
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
     }
-}
+
+DATABASE_ROUTERS = ["core.dbrouters.ReplicaRouter"]
 
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
+# Пользователь загружается сразу с профилями (core/auth.py)
+AUTHENTICATION_BACKENDS = ["core.auth.RoleModelBackend"]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -122,19 +180,105 @@ LOCALE_PATHS = [BASE_DIR / "locale"]
 
 STATIC_URL = "/static/"
 STATICFILES_DIRS = [BASE_DIR / "core" / "static"]
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# collectstatic минифицирует, добавляет хэш в имена и кладёт рядом .gz/.br
+# (core/staticfiles.py). Имена с хэшем есть только после collectstatic,
+# поэтому в разработке по умолчанию обычное хранилище.
+STATIC_MANIFEST = os.environ.get("STATIC_MANIFEST", "0" if DEBUG else "1") == "1"
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "core.staticfiles.CompressedManifestStaticFilesStorage" if STATIC_MANIFEST
+        else "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+# Раздавать STATIC_ROOT самим Django, если перед ним нет nginx
+STATIC_SERVE = os.environ.get("STATIC_SERVE") == "1"
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Отдача медиа фронт-сервером (core/media.py): None, "nginx" или "apache"
+MEDIA_SENDFILE = os.environ.get("MEDIA_SENDFILE") or None
+MEDIA_SENDFILE_PREFIX = "/protected-media/"
+
+# Фоновые задачи (core/tasks.py, manage.py run_jobs): задача в статусе
+# running дольше этого срока считается брошенной упавшим воркером
+JOB_LOCK_TIMEOUT = 2 * 60 * 60
+
+# Публичная проверка сертификатов (core/certificates.py)
+CERTIFICATE_VERIFY_CACHE_ALIAS = "default"
+CERTIFICATE_VERIFY_CACHE_TIMEOUT = 60 * 60
+CERTIFICATE_VERIFY_NEGATIVE_TIMEOUT = 5 * 60
+
+# Кому писать о новых заявках (core/notifications.py), через запятую
+APPLICATION_NOTIFY_EMAILS = [
+    email.strip() for email in os.environ.get("APPLICATION_NOTIFY_EMAILS", "").split(",") if email.strip()
+]
+
+# HLS-версии видеоуроков (core/transcode.py)
+FFMPEG_BINARY = os.environ.get("FFMPEG_BINARY", "ffmpeg")
+FFPROBE_BINARY = os.environ.get("FFPROBE_BINARY", "ffprobe")
+
+# Загрузка видео по частям (core/uploads.py)
+VIDEO_UPLOAD_MAX_CHUNK = 64 * 1024 * 1024
+VIDEO_UPLOAD_MAX_SIZE = 20 * 1024 * 1024 * 1024
+
+# Кэш. Каталог курсов живёт в отдельном алиасе, бэкенд выбирается
+# переменной окружения CATALOGUE_CACHE: locmem (по умолчанию), file или redis.
+CATALOGUE_CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "catalogue",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "cache" / "catalogue",
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/1"),
+    },
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "catalogue": CATALOGUE_CACHE_BACKENDS[os.environ.get("CATALOGUE_CACHE", "locmem")],
+}
+
+CATALOGUE_CACHE_ALIAS = "catalogue"
+CATALOGUE_CACHE_TIMEOUT = 60 * 60 * 24
+
 # Default primary keys
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # DRF + JWT (simplejwt)
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.auth.StatelessJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ),
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.KeysetPagination",
+    "PAGE_SIZE": 50,
+    "DEFAULT_THROTTLE_RATES": {
+        "certificate_verify": "60/min",
+    },
 }
+
+# Роль и профили зашиты в access-токен (core/auth.py)
+SIMPLE_JWT = {
+    "TOKEN_OBTAIN_SERIALIZER": "core.auth.RoleTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "core.auth.RoleTokenRefreshSerializer",
+}
+# Как часто процесс перечитывает список отозванных токенов
+JWT_REVOCATION_REFRESH_SECONDS = 30
+
+# Бюджет SQL-запросов на один API-запрос (см. core/queryplan.py).
+# В строгом режиме превышение бюджета — ошибка, иначе только warning в лог.
+QUERY_BUDGET_STRICT = False
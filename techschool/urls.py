@@ -15,9 +15,11 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
+
+from core.media import serve_public_media
+from core.staticfiles import serve_static
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -25,4 +27,13 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # как static(), но с Range; видеоуроки — только через /api/videos/<id>/stream/
+    urlpatterns += [
+        re_path(r"^%s(?P<path>.*)$" % settings.MEDIA_URL.lstrip("/"), serve_public_media),
+    ]
+
+if settings.STATIC_SERVE:
+    # сжатые заранее файлы и Cache-Control: immutable для имён с хэшем
+    urlpatterns += [
+        re_path(r"^%s(?P<path>.*)$" % settings.STATIC_URL.lstrip("/"), serve_static),
+    ]